@@ -1,5 +1,6 @@
 from .juego import EstadoJuego
+from .estado_busqueda import EstadoBusqueda
 from .minimax import decision_minimax
 from .poda_alfa_beta import decision_alfa_beta
 
-__all__ = ['EstadoJuego', 'decision_minimax', 'decision_alfa_beta']
\ No newline at end of file
+__all__ = ['EstadoJuego', 'EstadoBusqueda', 'decision_minimax', 'decision_alfa_beta']
\ No newline at end of file
@@ -0,0 +1,121 @@
+"""
+Contexto de una búsqueda: reloj, presupuesto, contadores, opciones y cancelación.
+
+Cada decisión de un motor crea su ContextoBusqueda (o usa el que recibe) y
+lo pasa por toda la recursión en lugar de guardar el estado en variables de
+módulo: dos búsquedas del mismo proceso, en hilos distintos, no comparten
+nada y se pueden ejecutar a la vez.
+
+El reloj no se consulta en cada nodo. sin_presupuesto() compara
+nodos_explorados con la siguiente comprobación y solo cada INTERVALO_RELOJ
+nodos mira el reloj y la cancelación. La siguiente comprobación nunca pasa
+del tope de nodos, así que ese tope sigue siendo exacto.
+
+cancelar() se puede llamar desde otro hilo: la búsqueda lo ve en la
+siguiente comprobación y termina como con un timeout, con la decisión de lo
+ya buscado. Cancelar antes de empezar también vale (la búsqueda sale en el
+primer nodo).
+
+Las búsquedas reanudables (reanudable.py) ceden el control cada
+nodos_por_paso nodos: toca_pausa() lleva la cuenta.
+
+alfa_raiz es una cota de MAX en la raíz que los nodos de alfa-beta usan
+como alfa mínimo. En la búsqueda paralela la publican otros procesos: con
+alfa_compartido, cada comprobación del reloj la vuelve a leer y solo sube.
+"""
+import time
+
+INTERVALO_RELOJ = 256  # Nodos entre dos consultas del reloj (unos milisegundos)
+
+
+class ContextoBusqueda:
+    """Estado de una búsqueda en curso"""
+
+    __slots__ = ('inicio', 'limite_tiempo', 'limite_nodos', 'cancelado', 'presupuesto_agotado',
+                 'nodos_explorados', 'nodos_podados', 'celdas_pacman', 'ramas_omitidas',
+                 'profundidad_raiz', 'profundidad_alcanzada', 'movimientos_raiz', 'estadisticas',
+                 'en_sitio', 'macro', 'relevancia', 'poda', 'tabla', 'ordenador',
+                 'alfa_raiz', 'alfa_compartido', 'nodos_por_paso', 'pausas', '_siguiente_comprobacion', '_siguiente_pausa')
+
+    def __init__(self):
+        self.cancelado = False
+        self.iniciar(float('inf'))
+
+    def iniciar(self, tiempo_maximo, nodos_maximos=None, estadisticas=None, inicio=None):
+        """
+        Pone a cero el reloj y los contadores para una búsqueda nueva (la
+        cancelación se conserva).
+
+        Args:
+            tiempo_maximo: Segundos desde inicio
+            nodos_maximos: Nodos de la búsqueda (None = sin límite)
+            estadisticas: EstadisticasBusqueda a llenar
+            inicio: time.time() desde el que cuenta el reloj (None = ahora; la
+                búsqueda paralela pasa el de la decisión completa)
+        """
+        self.inicio = time.time() if inicio is None else inicio
+        self.limite_tiempo = tiempo_maximo
+        self.limite_nodos = nodos_maximos
+        self.presupuesto_agotado = False
+        self.nodos_explorados = 0
+        self.nodos_podados = 0
+        self.celdas_pacman = 0
+        self.ramas_omitidas = 0
+        self.profundidad_raiz = 0  # Profundidad de la iteración en curso (ply = profundidad_raiz - profundidad)
+        self.profundidad_alcanzada = 0  # Profundidad de la última iteración completa
+        self.movimientos_raiz = 0  # estado.movimientos en la raíz, para calcular el ply de cada nodo
+        self.estadisticas = estadisticas
+        # Opciones de los motores
+        self.en_sitio = False  # Un solo estado con aplicar/deshacer en vez de clonar
+        self.macro = False  # Cada movimiento de Pacman recorre el pasillo hasta el siguiente cruce
+        self.relevancia = False  # Los fantasmas fuera del alcance de Pacman no ramifican
+        self.poda = True  # Expectimax: Star1/Star2
+        self.tabla = None  # Tabla de transposición (None: sin tabla)
+        self.ordenador = None  # Ordenamiento de movimientos (None: orden natural)
+        self.alfa_raiz = float('-inf')  # Alfa-beta: ningún nodo busca con un alfa menor
+        self.alfa_compartido = None  # Función que devuelve una alfa_raiz más alta (None: fija)
+        self.nodos_por_paso = None  # Búsqueda reanudable: nodos entre dos pausas (None: sin pausas)
+        self.pausas = 0
+        self._siguiente_comprobacion = 0  # La primera llamada ya mira el reloj
+        self._siguiente_pausa = float('inf')
+
+    def cancelar(self):
+        """Pide que la búsqueda termine cuanto antes (seguro desde otro hilo)"""
+        self.cancelado = True
+
+    def transcurrido(self):
+        return time.time() - self.inicio
+
+    def sin_presupuesto(self):
+        """True si la búsqueda agotó su tiempo o sus nodos o se canceló (y lo recuerda)"""
+        if self.nodos_explorados < self._siguiente_comprobacion:
+            return False
+        return self._comprobar()
+
+    def activar_pausas(self, nodos_por_paso):
+        """Búsqueda reanudable: una pausa cada nodos_por_paso nodos a partir de ahora"""
+        self.nodos_por_paso = nodos_por_paso
+        self._siguiente_pausa = self.nodos_explorados + nodos_por_paso
+
+    def toca_pausa(self):
+        """True si ya se exploraron nodos_por_paso nodos desde la última pausa (y la cuenta)"""
+        if self.nodos_explorados < self._siguiente_pausa:
+            return False
+        self._siguiente_pausa = self.nodos_explorados + self.nodos_por_paso
+        self.pausas += 1
+        return True
+
+    def _comprobar(self):
+        if not self.presupuesto_agotado:
+            nodos = self.nodos_explorados
+            if (self.cancelado or time.time() - self.inicio > self.limite_tiempo or
+                    (self.limite_nodos is not None and nodos >= self.limite_nodos)):
+                self.presupuesto_agotado = True
+            else:
+                siguiente = nodos + INTERVALO_RELOJ
+                if self.limite_nodos is not None:
+                    siguiente = min(siguiente, self.limite_nodos)
+                self._siguiente_comprobacion = siguiente
+                if self.alfa_compartido is not None:
+                    self.alfa_raiz = max(self.alfa_raiz, self.alfa_compartido())
+        return self.presupuesto_agotado
@@ -0,0 +1,126 @@
+"""
+Estadísticas de una búsqueda y salida de log de los motores.
+
+Cada decisión llena un EstadisticasBusqueda propio (nodos y cortes por ply,
+evaluaciones, clonaciones, iteraciones, timeout, movimiento y valor), que el
+servidor devuelve con el turno y acumula en /api/metricas.
+
+Un ply es un turno completo (Pacman y todos los fantasmas) contado desde la
+raíz, igual que la profundidad de los motores.
+"""
+import contextlib
+import os
+import threading
+import time
+
+# Los print() de los motores se pueden apagar en todo el proceso (PACMAN_LOG=0 o
+# configurar_log(False)) o solo en un hilo (sin_log)
+log_activo = os.environ.get('PACMAN_LOG', '1') != '0'
+_hilo = threading.local()
+
+
+def configurar_log(activo):
+    global log_activo
+    log_activo = bool(activo)
+
+
+def imprimir(mensaje):
+    """print() solo si el log de los motores está activo (en el proceso y en este hilo)"""
+    if log_activo and not getattr(_hilo, 'sin_log', False):
+        print(mensaje)
+
+
+@contextlib.contextmanager
+def sin_log():
+    """
+    Apaga el log de los motores dentro del bloque, solo en el hilo que lo
+    ejecuta: las búsquedas de otros hilos siguen imprimiendo, y los hilos
+    que se lancen dentro del bloque necesitan su propio sin_log().
+    """
+    anterior = getattr(_hilo, 'sin_log', False)
+    _hilo.sin_log = True
+    try:
+        yield
+    finally:
+        _hilo.sin_log = anterior
+
+
+class EstadisticasBusqueda:
+    """Contadores de una decisión de un motor"""
+
+    def __init__(self, algoritmo=None):
+        self.algoritmo = algoritmo
+        self.nodos_explorados = 0
+        self.nodos_podados = 0
+        self.nodos_por_ply = []
+        self.cortes_por_ply = []
+        self.evaluaciones = 0
+        self.clonaciones = 0
+        self.celdas_pacman = 0  # Celdas recorridas por Pacman en todos los nodos MAX (más de una por macro-movimiento)
+        self.ramas_omitidas = 0  # Movimientos de fantasmas fuera de alcance que no se ramificaron
+        self.iteraciones = []  # Una entrada por profundidad buscada
+        self.timeout = False
+        self.cancelada = False  # Se cortó con ContextoBusqueda.cancelar() (también cuenta como timeout)
+        self.profundidad_alcanzada = 0
+        self.movimiento = None
+        self.valor = None
+        self.segundos = 0.0
+        self.extra = {}  # Contadores propios de cada motor (transposición, ordenamiento...)
+        self._inicio_iteracion = None
+
+    def asegurar_plies(self, profundidad):
+        """Garantiza una casilla por ply hasta esa profundidad"""
+        faltan = profundidad - len(self.nodos_por_ply)
+        if faltan > 0:
+            self.nodos_por_ply.extend([0] * faltan)
+            self.cortes_por_ply.extend([0] * faltan)
+
+    def iniciar_iteracion(self, profundidad, nodos_explorados):
+        self.asegurar_plies(profundidad)
+        self._inicio_iteracion = (profundidad, time.perf_counter(), nodos_explorados)
+
+    def terminar_iteracion(self, nodos_explorados, completa):
+        profundidad, inicio, nodos_antes = self._inicio_iteracion
+        self.iteraciones.append({
+            'profundidad': profundidad,
+            'segundos': time.perf_counter() - inicio,
+            'nodos': nodos_explorados - nodos_antes,
+            'completa': completa
+        })
+
+    def fusionar(self, otra):
+        """Suma los contadores de otra búsqueda (p. ej. de un proceso del pool)"""
+        self.nodos_explorados += otra.nodos_explorados
+        self.nodos_podados += otra.nodos_podados
+        self.evaluaciones += otra.evaluaciones
+        self.clonaciones += otra.clonaciones
+        self.celdas_pacman += otra.celdas_pacman
+        self.ramas_omitidas += otra.ramas_omitidas
+        self.timeout = self.timeout or otra.timeout
+        self.asegurar_plies(len(otra.nodos_por_ply))
+        for ply, nodos in enumerate(otra.nodos_por_ply):
+            self.nodos_por_ply[ply] += nodos
+        for ply, cortes in enumerate(otra.cortes_por_ply):
+            self.cortes_por_ply[ply] += cortes
+
+    def a_dict(self):
+        return {
+            'algoritmo': self.algoritmo,
+            'nodos_explorados': self.nodos_explorados,
+            'nodos_podados': self.nodos_podados,
+            'nodos_por_ply': self.nodos_por_ply,
+            'cortes_por_ply': self.cortes_por_ply,
+            'evaluaciones': self.evaluaciones,
+            'clonaciones': self.clonaciones,
+            'celdas_pacman': self.celdas_pacman,
+            'celdas_por_nodo': self.celdas_pacman / self.nodos_explorados if self.nodos_explorados else 0.0,
+            'ramas_omitidas': self.ramas_omitidas,
+            'iteraciones': self.iteraciones,
+            'timeout': self.timeout,
+            'cancelada': self.cancelada,
+            'profundidad_alcanzada': self.profundidad_alcanzada,
+            'movimiento': self.movimiento,
+            'valor': self.valor,
+            'segundos': self.segundos,
+            **self.extra
+        }
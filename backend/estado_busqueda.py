@@ -0,0 +1,265 @@
+import copy
+import sys
+import time
+
+from .juego import EstadoJuego, MOVIMIENTOS
+from .laberinto import LARGO_MAXIMO_PASILLO
+
+# Umbrales de EstadoJuego.evaluar fuera del modo cazador que usa fantasma_relevante:
+# la bonificación de zona segura (15 por casilla, hasta 200) está al máximo desde
+# DISTANCIA_FANTASMA_LEJANO, y la de zona muy segura no cambia mientras la distancia
+# promedio a los fantasmas no baje de PROMEDIO_ZONA_MUY_SEGURA
+DISTANCIA_FANTASMA_LEJANO = 14
+PROMEDIO_ZONA_MUY_SEGURA = 8
+
+
+class EstadoBusqueda:
+    """
+    Estado compacto usado por los motores de búsqueda en lugar de EstadoJuego.
+
+    - __slots__: sin __dict__ por nodo.
+    - El laberinto (paredes en bits) se comparte por referencia.
+    - Cápsulas, power-ups y ocupación de fantasmas son ints: clonar es copiarlos.
+    - pos_fantasmas se comparte entre padre e hijo y solo se copia cuando un
+      movimiento va a modificarla.
+
+    Es intercambiable con EstadoJuego para mover_pacman, mover_fantasma,
+    mover_fantasmas, obtener_movimientos_validos_*, evaluar y la búsqueda en
+    sitio (aplicar_movimiento_* / deshacer).
+    """
+
+    __slots__ = (
+        'laberinto', 'filas', 'columnas', 'tablero',
+        'pos_pacman', 'pos_fantasmas', 'bits_fantasmas',
+        'bits_capsulas', 'bits_power_ups', 'bits_power_ups_colocados',
+        'zobrist', 'clave_capsulas', 'clave_power_ups',
+        'puntuacion', 'capsulas_recogidas', 'movimientos', 'turnos_totales',
+        'juego_terminado', 'mensaje', 'num_fantasmas',
+        'pacman_poderoso', 'turnos_poder_restantes',
+        'algoritmo', 'profundidad_maxima', 'usar_distancia_laberinto', 'huida_por_laberinto',
+        'velocidad_pacman', 'velocidad_fantasma_normal', 'velocidad_fantasma_asustado',
+        '_fantasmas_compartidos', '_pila_deshacer'
+    )
+
+    # Mismas reglas que EstadoJuego
+    capsulas = EstadoJuego.capsulas
+    power_ups = EstadoJuego.power_ups
+    power_ups_consumidos = EstadoJuego.power_ups_consumidos
+    obtener_movimientos_validos_pacman = EstadoJuego.obtener_movimientos_validos_pacman
+    obtener_movimientos_validos_fantasma = EstadoJuego.obtener_movimientos_validos_fantasma
+    mover_fantasmas = EstadoJuego.mover_fantasmas
+    mover_fantasmas_previstos = EstadoJuego.mover_fantasmas_previstos
+    paso_previsto_fantasma = EstadoJuego.paso_previsto_fantasma
+    _colocar_fantasmas = EstadoJuego._colocar_fantasmas
+    mover_pacman_macro = EstadoJuego.mover_pacman_macro
+    _siguiente_paso_hacia_pacman = EstadoJuego._siguiente_paso_hacia_pacman
+    _siguiente_paso_huyendo_pacman = EstadoJuego._siguiente_paso_huyendo_pacman
+    _distancia_manhattan = EstadoJuego._distancia_manhattan
+    _distancia = EstadoJuego._distancia
+    _distancia_minima = EstadoJuego._distancia_minima
+    _evaluar_modo_cazador = EstadoJuego._evaluar_modo_cazador
+    _evaluar_modo_supervivencia = EstadoJuego._evaluar_modo_supervivencia
+    evaluar = EstadoJuego.evaluar
+    aplicar_movimiento_pacman = EstadoJuego.aplicar_movimiento_pacman
+    aplicar_movimiento_fantasma = EstadoJuego.aplicar_movimiento_fantasma
+    aplicar_macro_pacman = EstadoJuego.aplicar_macro_pacman
+    _guardar_deshacer = EstadoJuego._guardar_deshacer
+    deshacer = EstadoJuego.deshacer
+    clave_zobrist = EstadoJuego.clave_zobrist
+
+    @classmethod
+    def desde_estado(cls, estado):
+        """Crea el estado de búsqueda raíz a partir de un EstadoJuego"""
+        nuevo = cls.__new__(cls)
+        nuevo._copiar_desde(estado)
+        nuevo.pos_fantasmas = list(estado.pos_fantasmas)
+        nuevo._fantasmas_compartidos = False
+        return nuevo
+
+    def clonar(self):
+        """Copia de ints y referencias; pos_fantasmas queda compartida hasta que alguien escriba"""
+        nuevo = EstadoBusqueda.__new__(EstadoBusqueda)
+        nuevo._copiar_desde(self)
+        self._fantasmas_compartidos = True
+        nuevo._fantasmas_compartidos = True
+        return nuevo
+
+    def _copiar_desde(self, otro):
+        self.laberinto = otro.laberinto
+        self.filas = otro.filas
+        self.columnas = otro.columnas
+        self.tablero = otro.tablero
+        self.pos_pacman = otro.pos_pacman
+        self.pos_fantasmas = otro.pos_fantasmas
+        self.bits_fantasmas = otro.bits_fantasmas
+        self.bits_capsulas = otro.bits_capsulas
+        self.bits_power_ups = otro.bits_power_ups
+        self.bits_power_ups_colocados = otro.bits_power_ups_colocados
+        self.zobrist = otro.zobrist
+        self.clave_capsulas = otro.clave_capsulas
+        self.clave_power_ups = otro.clave_power_ups
+        self.puntuacion = otro.puntuacion
+        self.capsulas_recogidas = otro.capsulas_recogidas
+        self.movimientos = otro.movimientos
+        self.turnos_totales = otro.turnos_totales
+        self.juego_terminado = otro.juego_terminado
+        self.mensaje = otro.mensaje
+        self.num_fantasmas = otro.num_fantasmas
+        self.pacman_poderoso = otro.pacman_poderoso
+        self.turnos_poder_restantes = otro.turnos_poder_restantes
+        self.algoritmo = otro.algoritmo
+        self.profundidad_maxima = otro.profundidad_maxima
+        self.usar_distancia_laberinto = otro.usar_distancia_laberinto
+        self.huida_por_laberinto = otro.huida_por_laberinto
+        self.velocidad_pacman = otro.velocidad_pacman
+        self.velocidad_fantasma_normal = otro.velocidad_fantasma_normal
+        self.velocidad_fantasma_asustado = otro.velocidad_fantasma_asustado
+        self._pila_deshacer = []
+
+    def _preparar_escritura_fantasmas(self):
+        """Copia pos_fantasmas si está compartida antes de modificarla (copy-on-write)"""
+        if self._fantasmas_compartidos:
+            self.pos_fantasmas = list(self.pos_fantasmas)
+            self._fantasmas_compartidos = False
+
+    def mover_pacman(self, direccion):
+        """Igual que EstadoJuego.mover_pacman; copia pos_fantasmas solo si puede comerse un fantasma"""
+        if self._fantasmas_compartidos and direccion in MOVIMIENTOS:
+            df, dc = MOVIMIENTOS[direccion]
+            if (self.pos_pacman[0] + df, self.pos_pacman[1] + dc) in self.pos_fantasmas:
+                self._preparar_escritura_fantasmas()
+        return EstadoJuego.mover_pacman(self, direccion)
+
+    def mover_fantasma(self, indice_fantasma, nueva_pos):
+        """Igual que EstadoJuego.mover_fantasma sobre una copia propia de pos_fantasmas"""
+        self._preparar_escritura_fantasmas()
+        EstadoJuego.mover_fantasma(self, indice_fantasma, nueva_pos)
+
+    def tamano_bytes(self):
+        """Memoria propia del nodo: el objeto, sus capas de bits y la lista de fantasmas si no la comparte"""
+        total = (sys.getsizeof(self) + sys.getsizeof(self.bits_capsulas)
+                 + sys.getsizeof(self.bits_power_ups) + sys.getsizeof(self.bits_fantasmas))
+        if not self._fantasmas_compartidos:
+            total += sys.getsizeof(self.pos_fantasmas)
+        return total
+
+
+def sucesor_pacman(estado, movimiento, en_sitio, macro=False):
+    """
+    Hijo de un nodo MAX: muta el estado (en sitio) o devuelve un clon movido.
+    Con macro, Pacman recorre todo el pasillo (mover_pacman_macro).
+    """
+    if en_sitio:
+        if macro:
+            estado.aplicar_macro_pacman(movimiento)
+        else:
+            estado.aplicar_movimiento_pacman(movimiento)
+        return estado
+    hijo = estado.clonar()
+    if macro:
+        hijo.mover_pacman_macro(movimiento)
+    else:
+        hijo.mover_pacman(movimiento)
+    return hijo
+
+
+def sucesor_fantasma(estado, indice_fantasma, nueva_pos, en_sitio):
+    """Hijo de un nodo MIN: muta el estado (en sitio) o devuelve un clon movido"""
+    if en_sitio:
+        estado.aplicar_movimiento_fantasma(indice_fantasma, nueva_pos)
+        return estado
+    hijo = estado.clonar()
+    hijo.mover_fantasma(indice_fantasma, nueva_pos)
+    return hijo
+
+
+def volver(estado, en_sitio):
+    """Deshace el último sucesor (solo necesario en modo en sitio)"""
+    if en_sitio:
+        estado.deshacer()
+
+
+def fantasma_relevante(estado, pos_fantasma, profundidad, macro=False):
+    """
+    Si el fantasma puede influir en lo que queda de búsqueda (profundidad turnos).
+
+    Por turno Pacman y el fantasma dan un paso cada uno; con macro, hasta
+    LARGO_MAXIMO_PASILLO cada uno (el fantasma da sus pasos previstos
+    mientras Pacman recorre el pasillo). La distancia de evaluar cambia como
+    mucho una casilla por paso. El fantasma es irrelevante si ni acercándose
+    los dos en todos sus pasos baja de DISTANCIA_FANTASMA_LEJANO (no puede
+    capturar a Pacman ni cambiar la distancia mínima que puntúa evaluar) y
+    si, acercándose así todos los fantasmas, el promedio de evaluar tampoco
+    baja de PROMEDIO_ZONA_MUY_SEGURA (el promedio cuenta su distancia sin tope).
+
+    Con Pacman poderoso, o con un power-up a su alcance en la profundidad
+    restante, todos son relevantes: el modo cazador puntúa la distancia a
+    los fantasmas sin tope.
+    """
+    if estado.pacman_poderoso:
+        return True
+    acercamiento = 2 * profundidad * (LARGO_MAXIMO_PASILLO if macro else 1)
+    distancia = estado._distancia
+    if distancia(estado.pos_pacman, pos_fantasma) - acercamiento < DISTANCIA_FANTASMA_LEJANO:
+        return True
+    minimo_suma = sum(max(distancia(estado.pos_pacman, f) - acercamiento, 0) for f in estado.pos_fantasmas)
+    if minimo_suma < PROMEDIO_ZONA_MUY_SEGURA * len(estado.pos_fantasmas):
+        return True
+    pasos = acercamiento // 2
+    distancia_power_up = estado.laberinto.distancia_minima(estado.pos_pacman, estado.bits_power_ups)
+    return distancia_power_up is not None and distancia_power_up <= pasos
+
+
+def _tamano_profundo(objeto, vistos=None):
+    """Tamaño aproximado de un objeto y todo lo que referencia (para comparar con deepcopy)"""
+    if vistos is None:
+        vistos = set()
+    if id(objeto) in vistos:
+        return 0
+    vistos.add(id(objeto))
+
+    total = sys.getsizeof(objeto)
+    if isinstance(objeto, dict):
+        total += sum(_tamano_profundo(k, vistos) + _tamano_profundo(v, vistos)
+                     for k, v in objeto.items())
+    elif isinstance(objeto, (list, tuple, set, frozenset)):
+        total += sum(_tamano_profundo(x, vistos) for x in objeto)
+    elif hasattr(objeto, '__dict__'):
+        total += _tamano_profundo(vars(objeto), vistos)
+    return total
+
+
+def medir_costo_clonado(estado, repeticiones=1000):
+    """
+    Compara el clonado por deepcopy con EstadoJuego.clonar() y EstadoBusqueda.clonar().
+
+    Args:
+        estado: EstadoJuego de referencia
+        repeticiones: Número de clonados por medición
+
+    Returns:
+        dict: microsegundos por clonado y bytes por nodo de cada variante
+    """
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        copia = copy.deepcopy(estado)
+    us_deepcopy = (time.perf_counter() - inicio) / repeticiones * 1e6
+
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        estado.clonar()
+    us_juego = (time.perf_counter() - inicio) / repeticiones * 1e6
+
+    raiz = EstadoBusqueda.desde_estado(estado)
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        hijo = raiz.clonar()
+    us_busqueda = (time.perf_counter() - inicio) / repeticiones * 1e6
+
+    return {
+        'us_por_clon_deepcopy': us_deepcopy,
+        'us_por_clon_juego': us_juego,
+        'us_por_clon_busqueda': us_busqueda,
+        'bytes_por_nodo_deepcopy': _tamano_profundo(copia),
+        'bytes_por_nodo_busqueda': hijo.tamano_bytes()
+    }
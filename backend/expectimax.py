@@ -0,0 +1,564 @@
+"""
+Expectimax con poda Star1/Star2 sobre el modelo real de los fantasmas.
+
+Minimax y alfa-beta suponen que cada fantasma elige el peor de hasta 4
+movimientos. Los de mover_fantasmas no eligen: cada uno da su paso BFS
+(perseguir, o huir si Pacman tiene poder) con probabilidad
+velocidad_fantasma_normal / velocidad_fantasma_asustado y si no se queda
+quieto. El turno de todos los fantasmas es entonces un nodo de azar con a
+lo sumo 2^fantasmas resultados, el valor esperado de sus hijos. Para que
+eso no explote con muchos fantasmas, solo ramifican los
+FANTASMAS_RAMIFICADOS más cercanos a Pacman; el resto da su resultado más
+probable (como los pasos intermedios de un macro-movimiento).
+
+Star1 poda un nodo de azar cuando, acotando los hijos que faltan con las
+cotas de evaluar [L, U] en su subárbol, su valor esperado ya no puede
+entrar en la ventana (alfa, beta). Star2 además sondea cada hijo (un nodo MAX) con
+solo su primer movimiento: eso es una cota inferior del hijo que permite
+cortar por arriba antes de buscar nada completo.
+
+Las cotas se calculan en cada nodo de azar a partir de su estado y la
+profundidad que le queda (cotas_evaluacion): cerca de las hojas son mucho
+más estrechas que las de la raíz. Si evaluar cambia, hay que revisarlas.
+"""
+from .contexto import ContextoBusqueda
+from .estadisticas import EstadisticasBusqueda, imprimir
+from .estado_busqueda import EstadoBusqueda, sucesor_pacman, sucesor_fantasma, volver
+from .laberinto import LARGO_MAXIMO_PASILLO, contar_bits
+
+# El estado de cada búsqueda va en su ContextoBusqueda (nodos_podados cuenta los
+# cortes Star1/Star2 en nodos de azar y beta en nodos MAX)
+TIEMPO_MAXIMO = 2.5
+PROFUNDIDAD_LIMITE = 64  # Tope de la profundización iterativa
+FANTASMAS_RAMIFICADOS = 6  # Como mucho 2^6 resultados por nodo de azar
+
+def decision_expectimax(estado, profundidad_maxima, modo_en_sitio=False, poda_star=True,
+                        iterativo=False, tiempo_maximo=None, nodos_maximos=None, paralelo=False,
+                        estadisticas_busqueda=None, macro_movimientos=False, contexto=None):
+    """
+    EXPECTIMAX CON PODA STAR1/STAR2
+
+    Retorna el movimiento de Pacman (MAX) con mayor valor esperado frente a
+    los fantasmas tal como se mueven en el juego.
+
+    Args:
+        estado: Estado actual del juego
+        profundidad_maxima: Turnos de Pacman a explorar
+            (con iterativo, tope de la profundización; None = PROFUNDIDAD_LIMITE)
+        modo_en_sitio: Recorrer el árbol mutando un único estado (aplicar/deshacer)
+        poda_star: Podar con Star1/Star2 (mismo resultado, menos nodos)
+        iterativo: Profundización iterativa: busca a profundidad 1, 2, 3...
+            hasta agotar el presupuesto y usa la última iteración completa
+        tiempo_maximo: Segundos por movimiento (None = TIEMPO_MAXIMO)
+        nodos_maximos: Nodos por movimiento (None = sin límite)
+        paralelo: Repartir los hijos de la raíz entre el pool de procesos de paralelo.py
+        estadisticas_busqueda: EstadisticasBusqueda a llenar (None = una nueva
+            que se descarta: quien quiera leerlas tiene que pasarla)
+        macro_movimientos: Cada movimiento de Pacman sigue el pasillo hasta el siguiente
+            cruce (Laberinto.pasillo): más celdas de horizonte por nodo
+        contexto: ContextoBusqueda de esta búsqueda (None = uno nuevo); quien
+            lo pasa puede cancelarla desde otro hilo con contexto.cancelar()
+
+    Returns:
+        str: Mejor movimiento ('arriba', 'abajo', 'izquierda', 'derecha')
+    """
+    if profundidad_maxima is None:
+        profundidad_maxima = PROFUNDIDAD_LIMITE
+    if estadisticas_busqueda is None:
+        estadisticas_busqueda = EstadisticasBusqueda('expectimax')
+    if contexto is None:
+        contexto = ContextoBusqueda()
+    contexto.iniciar(TIEMPO_MAXIMO if tiempo_maximo is None else tiempo_maximo, nodos_maximos,
+                     estadisticas_busqueda)
+    contexto.en_sitio = modo_en_sitio
+    contexto.macro = macro_movimientos
+    contexto.poda = poda_star
+
+    estado = EstadoBusqueda.desde_estado(estado)
+    movimientos_validos = estado.obtener_movimientos_validos_pacman()
+
+    if not movimientos_validos:
+        imprimir(f"[EXPECTIMAX] Sin movimientos válidos")
+        return None
+
+    buscar_raiz = _buscar_raiz_paralela if paralelo else _buscar_raiz
+
+    if not iterativo:
+        imprimir(f"[EXPECTIMAX] Explorando con profundidad: {profundidad_maxima}")
+        mejor_movimiento, mejor_valor = buscar_raiz(contexto, estado, movimientos_validos, profundidad_maxima)
+        contexto.profundidad_alcanzada = profundidad_maxima
+    else:
+        mejor_movimiento, mejor_valor = None, float('-inf')
+        for profundidad in range(1, profundidad_maxima + 1):
+            movimiento, valor = buscar_raiz(contexto, estado, movimientos_validos, profundidad)
+            if contexto.presupuesto_agotado:
+                imprimir(f"[EXPECTIMAX] Iteración {profundidad} incompleta, se descarta")
+                if mejor_movimiento is None:
+                    mejor_movimiento, mejor_valor = movimiento, valor
+                break
+            mejor_movimiento, mejor_valor = movimiento, valor
+            contexto.profundidad_alcanzada = profundidad
+
+            # La siguiente iteración cuesta varias veces esta: no empezarla sin tiempo
+            if contexto.transcurrido() > contexto.limite_tiempo / 2:
+                break
+        imprimir(f"[EXPECTIMAX] Profundidad alcanzada: {contexto.profundidad_alcanzada}")
+
+    tiempo_total = contexto.transcurrido()
+    mejor_movimiento = mejor_movimiento if mejor_movimiento else movimientos_validos[0]
+
+    estadisticas_busqueda.nodos_explorados = contexto.nodos_explorados
+    estadisticas_busqueda.celdas_pacman = contexto.celdas_pacman
+    estadisticas_busqueda.nodos_podados = contexto.nodos_podados
+    if not paralelo:
+        estadisticas_busqueda.clonaciones = 0 if modo_en_sitio else contexto.nodos_explorados
+    estadisticas_busqueda.timeout = contexto.presupuesto_agotado
+    estadisticas_busqueda.cancelada = contexto.cancelado
+    estadisticas_busqueda.profundidad_alcanzada = contexto.profundidad_alcanzada
+    estadisticas_busqueda.movimiento = mejor_movimiento
+    estadisticas_busqueda.valor = mejor_valor
+    estadisticas_busqueda.segundos = tiempo_total
+
+    imprimir(f"[EXPECTIMAX] Nodos explorados: {contexto.nodos_explorados}, Podados: {contexto.nodos_podados} "
+             f"en {tiempo_total:.3f}s")
+    imprimir(f"[EXPECTIMAX] Mejor movimiento: {mejor_movimiento} (valor esperado: {mejor_valor:.2f})")
+
+    return mejor_movimiento
+
+
+def _buscar_raiz(contexto, estado, movimientos_validos, profundidad_maxima):
+    """
+    Una búsqueda completa desde la raíz a profundidad fija.
+
+    Returns:
+        tuple: (mejor_movimiento, mejor_valor)
+    """
+    contexto.profundidad_raiz = profundidad_maxima
+    estadisticas = contexto.estadisticas
+    estadisticas.iniciar_iteracion(profundidad_maxima, contexto.nodos_explorados)
+    en_sitio = contexto.en_sitio
+
+    mejor_valor = float('-inf')
+    mejor_movimiento = None
+    alfa = float('-inf')
+
+    for movimiento in movimientos_validos:
+        turnos = estado.turnos_totales
+        estado_siguiente = sucesor_pacman(estado, movimiento, en_sitio, contexto.macro)
+        contexto.celdas_pacman += estado_siguiente.turnos_totales - turnos
+        contexto.nodos_explorados += 1
+        estadisticas.nodos_por_ply[0] += 1
+
+        if estado_siguiente.juego_terminado:
+            valor = _evaluar(contexto, estado_siguiente)
+        else:
+            # Con poda, un hijo que no supera alfa devuelve solo una cota (y no se elige)
+            valor = valor_azar(contexto, estado_siguiente, profundidad_maxima - 1, alfa, float('inf'))
+        volver(estado, en_sitio)
+
+        if valor > mejor_valor:
+            mejor_valor = valor
+            mejor_movimiento = movimiento
+        if contexto.poda:
+            alfa = max(alfa, mejor_valor)
+
+        if contexto.sin_presupuesto():
+            imprimir(f"[EXPECTIMAX] Timeout alcanzado")
+            break
+
+    estadisticas.terminar_iteracion(contexto.nodos_explorados, not contexto.presupuesto_agotado)
+    return mejor_movimiento, mejor_valor
+
+
+def _buscar_raiz_paralela(contexto, estado, movimientos_validos, profundidad_maxima):
+    """Como _buscar_raiz, pero cada hijo de la raíz se evalúa en el pool de procesos"""
+    from .paralelo import buscar_raiz_paralela
+    estadisticas = contexto.estadisticas
+    estadisticas.iniciar_iteracion(profundidad_maxima, contexto.nodos_explorados)
+
+    limite_nodos = contexto.limite_nodos
+    nodos_restantes = None if limite_nodos is None else max(limite_nodos - contexto.nodos_explorados, 0)
+    mejor_movimiento, mejor_valor, estadisticas_hijos = buscar_raiz_paralela(
+        'expectimax', estado, movimientos_validos, profundidad_maxima,
+        contexto.inicio, contexto.limite_tiempo, nodos_restantes,
+        {'modo_en_sitio': contexto.en_sitio, 'poda_star': contexto.poda, 'macro_movimientos': contexto.macro})
+    contexto.nodos_explorados += estadisticas_hijos.nodos_explorados
+    contexto.celdas_pacman += estadisticas_hijos.celdas_pacman
+    contexto.nodos_podados += estadisticas_hijos.nodos_podados
+    estadisticas.fusionar(estadisticas_hijos)
+    if estadisticas_hijos.timeout:
+        contexto.presupuesto_agotado = True
+        imprimir(f"[EXPECTIMAX] Timeout alcanzado")
+    estadisticas.terminar_iteracion(contexto.nodos_explorados, not contexto.presupuesto_agotado)
+    return mejor_movimiento, mejor_valor
+
+
+def valor_movimiento_raiz(estado, movimiento, profundidad_maxima, alfa, inicio, tiempo_maximo,
+                          nodos_maximos=None, modo_en_sitio=False, poda_star=True, macro_movimientos=False):
+    """
+    Valor de un solo hijo de la raíz (unidad de trabajo de la búsqueda paralela).
+
+    Con poda, solo es exacto si supera alfa (como en alfa-beta).
+
+    Returns:
+        tuple: (valor, EstadisticasBusqueda del hijo)
+    """
+    estadisticas = EstadisticasBusqueda('expectimax')
+    estadisticas.asegurar_plies(profundidad_maxima)
+    contexto = ContextoBusqueda()
+    contexto.iniciar(tiempo_maximo, nodos_maximos, estadisticas, inicio)
+    contexto.en_sitio = modo_en_sitio
+    contexto.macro = macro_movimientos
+    contexto.poda = poda_star
+    contexto.profundidad_raiz = profundidad_maxima
+
+    turnos = estado.turnos_totales
+    estado_siguiente = sucesor_pacman(estado, movimiento, modo_en_sitio, macro_movimientos)
+    contexto.celdas_pacman += estado_siguiente.turnos_totales - turnos
+    contexto.nodos_explorados += 1
+    estadisticas.nodos_por_ply[0] += 1
+    if estado_siguiente.juego_terminado:
+        valor = _evaluar(contexto, estado_siguiente)
+    else:
+        valor = valor_azar(contexto, estado_siguiente, profundidad_maxima - 1,
+                           alfa if poda_star else float('-inf'), float('inf'))
+    volver(estado, modo_en_sitio)
+
+    estadisticas.nodos_explorados = contexto.nodos_explorados
+    estadisticas.celdas_pacman = contexto.celdas_pacman
+    estadisticas.nodos_podados = contexto.nodos_podados
+    estadisticas.clonaciones = 0 if modo_en_sitio else contexto.nodos_explorados
+    estadisticas.timeout = contexto.presupuesto_agotado
+    return valor, estadisticas
+
+
+def _evaluar(contexto, estado):
+    """estado.evaluar() contando la evaluación en las estadísticas"""
+    contexto.estadisticas.evaluaciones += 1
+    return estado.evaluar()
+
+
+def resultados_fantasmas(estado, ramificados=FANTASMAS_RAMIFICADOS):
+    """
+    Resultados posibles de mover_fantasmas desde este estado.
+
+    Cada fantasma da su paso (perseguir o huir) con probabilidad igual a su
+    velocidad, o se queda quieto. Los pasos se aplican del último fantasma
+    al primero: si Pacman se come uno, no se corren los índices pendientes.
+
+    Solo ramifican los `ramificados` fantasmas más cercanos a Pacman (a igual
+    distancia, el de menor índice); los demás dan siempre su resultado más
+    probable: el paso si la velocidad pasa de 0.5, quietos si no.
+
+    Returns:
+        list: [(probabilidad, [(indice_fantasma, destino), ...]), ...], el más probable primero
+    """
+    if estado.pacman_poderoso:
+        velocidad = estado.velocidad_fantasma_asustado
+    else:
+        velocidad = estado.velocidad_fantasma_normal
+
+    num_fantasmas = len(estado.pos_fantasmas)
+    if num_fantasmas > ramificados:
+        distancias = [estado._distancia(estado.pos_pacman, pos_fantasma) for pos_fantasma in estado.pos_fantasmas]
+        cercanos = set(sorted(range(num_fantasmas), key=lambda indice: distancias[indice])[:ramificados])
+    else:
+        cercanos = None
+
+    resultados = [(1.0, [])]
+    for indice in range(num_fantasmas - 1, -1, -1):
+        pos_fantasma = estado.pos_fantasmas[indice]
+        destino = estado.paso_previsto_fantasma(pos_fantasma)
+        if destino == pos_fantasma or velocidad <= 0:
+            continue  # Un único resultado: quieto
+        if cercanos is not None and indice not in cercanos:
+            if velocidad > 0.5:
+                resultados = [(p, pasos + [(indice, destino)]) for p, pasos in resultados]
+            continue
+        if velocidad >= 1:
+            resultados = [(p, pasos + [(indice, destino)]) for p, pasos in resultados]
+            continue
+        resultados = [
+            resultado
+            for p, pasos in resultados
+            for resultado in ((p * velocidad, pasos + [(indice, destino)]), (p * (1 - velocidad), pasos))
+        ]
+
+    # sorted es estable: a igual probabilidad se conserva el orden de generación
+    return sorted(resultados, key=lambda resultado: -resultado[0])
+
+
+def cotas_evaluacion(estado, profundidad):
+    """
+    Cotas [L, U] de evaluar() en cualquier nodo a `profundidad` turnos de
+    Pacman o menos desde `estado`.
+
+    Star1/Star2 solo son correctas si ninguna hoja sale de [L, U]: cada
+    término de evaluar se acota con lo máximo que puede cambiar en esos
+    turnos (puntuación, cápsulas, turnos de poder, distancias). En cada
+    turno Pacman y un fantasma se acercan a lo sumo 2 casillas, así que solo
+    los fantasmas a distancia Manhattan <= 2 * profundidad pueden chocar.
+
+    Returns:
+        tuple: (L, U)
+    """
+    laberinto = estado.laberinto
+    if estado.usar_distancia_laberinto:
+        distancia_maxima = laberinto.cota_distancias()
+    else:
+        distancia_maxima = estado.filas + estado.columnas - 2
+    num_fantasmas = len(estado.pos_fantasmas)
+    hay_power_ups = bool(estado.bits_power_ups)
+    hay_capsulas = bool(estado.bits_capsulas)
+
+    fila, columna = estado.pos_pacman
+    distancias_fantasmas = [abs(fila - f) + abs(columna - c) for f, c in estado.pos_fantasmas]
+    alcance = 2 * profundidad
+    alcanzables = sum(1 for d in distancias_fantasmas if d <= alcance)
+    distancia_fantasma_minima = max(min(distancias_fantasmas, default=0) - alcance, 0)
+
+    # ¿Puede llegar a tener poder (y comerse a alguien) dentro del horizonte?
+    puede_tener_poder = estado.pacman_poderoso or (
+        hay_power_ups and
+        laberinto.distancia_manhattan_minima(estado.pos_pacman, estado.bits_power_ups) <= profundidad)
+    puede_cazar = puede_tener_poder and alcanzables > 0
+    comibles = alcanzables if puede_cazar else 0
+    puede_ganar = (comibles == num_fantasmas or
+                   contar_bits(estado.bits_capsulas | estado.bits_power_ups) <= profundidad)
+    # Con poder para todo el horizonte un choque se come al fantasma
+    puede_perder = alcanzables > 0 and not (
+        estado.pacman_poderoso and estado.turnos_poder_restantes > profundidad)
+
+    # Fuera de los estados terminales, la puntuación solo sube: +10 cápsula, +50 power-up, +200 fantasma
+    puntuacion_maxima = estado.puntuacion + 60 * profundidad + 200 * comibles
+
+    supervivencia_maxima = 200 + (3900 if hay_power_ups else 0) + (10 * distancia_maxima if hay_capsulas else 0) + 200
+    supervivencia_minima = (_peligro_minimo(distancia_fantasma_minima)
+                            + (min(0, (8 - distancia_maxima) * 300, (6 - distancia_maxima) * 150)
+                               if hay_power_ups else 0)
+                            - (35 * distancia_maxima if hay_capsulas else 0))
+    modo_maximo = supervivencia_maxima
+    modo_minimo = supervivencia_minima
+    if puede_tener_poder:
+        turnos_poder_maximos = estado.turnos_poder_restantes + 18 + 10 * profundidad
+        # El bono de 60000 del último fantasma solo si pueden quedar en pie uno o ninguno
+        bono_maximo = 60000 if num_fantasmas - comibles <= 1 else 3500
+        modo_maximo = max(modo_maximo, 80 * turnos_poder_maximos + bono_maximo + 200 * num_fantasmas)
+        modo_minimo = min(modo_minimo, -50 * distancia_maxima)
+
+    superior = (puntuacion_maxima * 10 + modo_maximo
+                + (estado.capsulas_recogidas + profundidad) * 120 - estado.turnos_totales * 0.5)
+    inferior = (estado.puntuacion * 10 + modo_minimo
+                + estado.capsulas_recogidas * 120 - (estado.turnos_totales + profundidad) * 0.5)
+
+    # Terminales: -15000 (capturado) y 60000 (ganó)
+    if puede_perder:
+        inferior = min(inferior, -15000)
+    if puede_ganar:
+        superior = max(superior, 60000)
+    return inferior, superior
+
+
+def _peligro_minimo(distancia_fantasma):
+    """Término de evasión más bajo de _evaluar_modo_supervivencia con el fantasma más cercano a esa distancia o más"""
+    if distancia_fantasma <= 2:
+        return -5000
+    if distancia_fantasma == 3:
+        return -2000
+    if distancia_fantasma == 4:
+        return -800
+    if distancia_fantasma == 5:
+        return -300
+    if distancia_fantasma <= 7:
+        return -50
+    return 0
+
+
+def valor_max_expectimax(contexto, estado, profundidad, alfa, beta, sonda=False, valor_primero=None):
+    """
+    Nodo MAX (Pacman). Dentro de la ventana (alfa, beta) es exacto; fuera,
+    una cota (fail-soft, como alfa-beta).
+
+    Args:
+        contexto: ContextoBusqueda de la búsqueda
+        estado: Estado actual del juego
+        profundidad: Profundidad restante
+        alfa, beta: Ventana
+        sonda: Star2: explorar solo el primer movimiento (da una cota inferior del nodo)
+        valor_primero: Valor ya sondeado del primer movimiento (no se vuelve a buscar)
+
+    Returns:
+        float: Valor del nodo
+    """
+    if contexto.sin_presupuesto():
+        return _evaluar(contexto, estado)
+
+    if estado.juego_terminado or profundidad == 0:
+        return _evaluar(contexto, estado)
+
+    movimientos_validos = estado.obtener_movimientos_validos_pacman()
+    if not movimientos_validos:
+        return _evaluar(contexto, estado)
+    if sonda:
+        movimientos_validos = movimientos_validos[:1]
+
+    valor = float('-inf')
+    indice_ply = contexto.profundidad_raiz - profundidad
+    estadisticas = contexto.estadisticas
+    if valor_primero is not None:
+        valor = valor_primero
+        movimientos_validos = movimientos_validos[1:]
+        if valor >= beta:
+            contexto.nodos_podados += 1
+            estadisticas.cortes_por_ply[indice_ply] += 1
+            return valor
+    en_sitio = contexto.en_sitio
+    for movimiento in movimientos_validos:
+        turnos = estado.turnos_totales
+        estado_siguiente = sucesor_pacman(estado, movimiento, en_sitio, contexto.macro)
+        contexto.celdas_pacman += estado_siguiente.turnos_totales - turnos
+        contexto.nodos_explorados += 1
+        estadisticas.nodos_por_ply[indice_ply] += 1
+
+        if estado_siguiente.juego_terminado:
+            valor_hijo = _evaluar(contexto, estado_siguiente)
+        else:
+            valor_hijo = valor_azar(contexto, estado_siguiente, profundidad - 1, max(alfa, valor), beta)
+        volver(estado, en_sitio)
+
+        if valor_hijo > valor:
+            valor = valor_hijo
+        if valor >= beta:
+            contexto.nodos_podados += 1
+            estadisticas.cortes_por_ply[indice_ply] += 1
+            break
+
+    return valor
+
+
+def valor_azar(contexto, estado, profundidad, alfa, beta):
+    """
+    Nodo de azar: el turno de todos los fantasmas, valor esperado de sus resultados.
+
+    Sin poda, alfa y beta se ignoran. Con poda, Star2 (sondeo) y luego Star1;
+    si el valor cae fuera de (alfa, beta) se devuelve una cota del lado correcto.
+    Si el presupuesto se agota a mitad de los resultados, el nodo se evalúa
+    como una hoja sin recorrer los que faltan.
+
+    Args:
+        contexto: ContextoBusqueda de la búsqueda
+        estado: Estado tras el movimiento de Pacman
+        profundidad: Profundidad restante
+        alfa, beta: Ventana
+
+    Returns:
+        float: Valor esperado del nodo (o una cota fuera de la ventana)
+    """
+    if contexto.sin_presupuesto():
+        return _evaluar(contexto, estado)
+
+    if estado.juego_terminado or profundidad == 0:
+        return _evaluar(contexto, estado)
+
+    resultados = resultados_fantasmas(estado)
+    indice_ply = contexto.profundidad_raiz - profundidad - 1  # Los fantasmas cierran el turno de Pacman
+
+    if not contexto.poda:
+        valor = 0.0
+        for probabilidad, pasos in resultados:
+            valor += probabilidad * _valor_resultado(contexto, estado, pasos, profundidad, indice_ply,
+                                                     float('-inf'), float('inf'))
+            if contexto.presupuesto_agotado:
+                return _evaluar(contexto, estado)
+        return valor
+
+    # Con macro-movimientos cada turno de la búsqueda puede ser un pasillo entero
+    inferior, superior = cotas_evaluacion(
+        estado, profundidad * LARGO_MAXIMO_PASILLO if contexto.macro else profundidad)
+    cortes_ply = contexto.estadisticas.cortes_por_ply
+    cotas = [inferior] * len(resultados)  # Cota inferior de cada resultado (Star2 la sube)
+
+    # Probabilidad de los resultados posteriores a cada uno
+    posteriores = [0.0] * len(resultados)
+    for i in range(len(resultados) - 2, -1, -1):
+        posteriores[i] = posteriores[i + 1] + resultados[i + 1][0]
+
+    # Star2: sondear cada resultado con el primer movimiento de Pacman
+    # (solo si el sondeo puede cortar: un hijo nunca vale más que superior)
+    sondeados = [None] * len(resultados)  # Valor exacto del primer movimiento de cada resultado
+    resto_inferior = inferior  # Suma de probabilidad * cota de los resultados sin buscar
+    for i, (probabilidad, pasos) in enumerate(resultados):
+        sin_este = resto_inferior - probabilidad * cotas[i]
+        beta_hijo = (beta - sin_este) / probabilidad
+        if beta_hijo >= superior:
+            continue
+        sondeo = _valor_resultado(contexto, estado, pasos, profundidad, indice_ply, inferior, beta_hijo, sonda=True)
+        if contexto.presupuesto_agotado:
+            return _evaluar(contexto, estado)
+        if sondeo >= beta_hijo:
+            contexto.nodos_podados += 1
+            cortes_ply[indice_ply] += 1
+            return sin_este + probabilidad * sondeo
+        sondeados[i] = sondeo
+        if sondeo > cotas[i]:
+            cotas[i] = sondeo
+            resto_inferior = sin_este + probabilidad * sondeo
+
+    # Star1: búsqueda completa acotando lo que falta con [cotas, superior]
+    suma = 0.0
+    for i, (probabilidad, pasos) in enumerate(resultados):
+        resto_inferior -= probabilidad * cotas[i]
+        resto_superior = posteriores[i] * superior
+        alfa_hijo = (alfa - suma - resto_superior) / probabilidad
+        beta_hijo = (beta - suma - resto_inferior) / probabilidad
+        if alfa_hijo >= superior:
+            # Ni con el máximo posible supera alfa
+            contexto.nodos_podados += 1
+            cortes_ply[indice_ply] += 1
+            return suma + probabilidad * superior + resto_superior
+        if beta_hijo <= cotas[i]:
+            contexto.nodos_podados += 1
+            cortes_ply[indice_ply] += 1
+            return suma + probabilidad * cotas[i] + resto_inferior
+
+        # El primer movimiento ya sondeado no se vuelve a buscar
+        valor = _valor_resultado(contexto, estado, pasos, profundidad, indice_ply,
+                                 max(alfa_hijo, inferior), min(beta_hijo, superior), valor_primero=sondeados[i])
+        if contexto.presupuesto_agotado:
+            return _evaluar(contexto, estado)
+        if valor <= alfa_hijo:
+            contexto.nodos_podados += 1
+            cortes_ply[indice_ply] += 1
+            return suma + probabilidad * valor + resto_superior
+        if valor >= beta_hijo:
+            contexto.nodos_podados += 1
+            cortes_ply[indice_ply] += 1
+            return suma + probabilidad * valor + resto_inferior
+        suma += probabilidad * valor
+
+    return suma
+
+
+def _valor_resultado(contexto, estado, pasos, profundidad, indice_ply, alfa, beta, sonda=False,
+                     valor_primero=None):
+    """Aplica un resultado de los fantasmas, valora el nodo MAX siguiente y lo deshace"""
+    en_sitio = contexto.en_sitio
+    nodos_ply = contexto.estadisticas.nodos_por_ply
+    actual = estado
+    aplicados = 0
+    for indice_fantasma, destino in pasos:
+        actual = sucesor_fantasma(actual, indice_fantasma, destino, en_sitio)
+        contexto.nodos_explorados += 1
+        nodos_ply[indice_ply] += 1
+        aplicados += 1
+        if actual.juego_terminado:
+            break
+
+    if actual.juego_terminado:
+        valor = _evaluar(contexto, actual)
+    else:
+        valor = valor_max_expectimax(contexto, actual, profundidad, alfa, beta, sonda, valor_primero)
+
+    for _ in range(aplicados):
+        volver(estado, en_sitio)
+    return valor
@@ -1,22 +1,53 @@
 import random
 import copy
 
+from .laberinto import obtener_laberinto, contar_bits
+from .transposicion import claves_zobrist
+
+# Desplazamientos de cada dirección de Pacman (fila, columna)
+MOVIMIENTOS = {
+    'arriba': (-1, 0),
+    'abajo': (1, 0),
+    'izquierda': (0, -1),
+    'derecha': (0, 1)
+}
+DIRECCIONES = tuple(MOVIMIENTOS)
+INDICE_DIRECCION = {nombre: i for i, nombre in enumerate(DIRECCIONES)}
+NUM_FANTASMAS = 3
+
 class EstadoJuego:
-    def __init__(self):
-        self.filas = 15
-        self.columnas = 19
-        
-        # Crear laberinto predefinido
-        self.tablero = self._crear_laberinto()
+    def __init__(self, tablero=None, num_fantasmas=NUM_FANTASMAS):
+        """
+        Args:
+            tablero: Filas de 1 (pasillo) y 0 (pared); None = el laberinto
+                clásico. Ver mapas.py para layouts y laberintos generados
+            num_fantasmas: Fantasmas al empezar
+        """
+        if tablero is None:
+            tablero = self._crear_laberinto()
+        self.filas = len(tablero)
+        self.columnas = len(tablero[0])
+        
+        # Compilar el laberinto a bitboards (compartido entre partidas con el mismo mapa)
+        self.laberinto = obtener_laberinto(tablero)
+        self.tablero = self.laberinto.tablero
+        self.zobrist = claves_zobrist(self.laberinto)
+        if num_fantasmas < 1:
+            raise ValueError("Hace falta al menos un fantasma")
+        if len(self.laberinto.indices_libres) <= num_fantasmas:
+            raise ValueError(f"El tablero tiene {len(self.laberinto.indices_libres)} pasillos: "
+                             f"no caben Pacman y {num_fantasmas} fantasmas")
         
         # Generar posiciones aleatorias
         self.pos_pacman = self._generar_posicion_aleatoria()
-        self.pos_fantasmas = self._generar_posiciones_fantasmas(3)
+        self.pos_fantasmas = self._generar_posiciones_fantasmas(num_fantasmas)
+        self.num_fantasmas_total = num_fantasmas
+        self.bits_fantasmas = self.laberinto.mascara(self.pos_fantasmas)
         
-        # Generar cápsulas en espacios vacíos
+        # Generar cápsulas en espacios vacíos (capa bits_capsulas)
         self.capsulas = self._generar_capsulas()
         
-        # Generar power-ups (cápsulas especiales)
+        # Generar power-ups (cápsulas especiales, capa bits_power_ups)
         self.power_ups = self._generar_power_ups()
         
         # Estado del juego
@@ -37,11 +68,48 @@ class EstadoJuego:
         self.algoritmo = 'minimax'
         self.profundidad_maxima = 2
         
+        # Presupuesto por movimiento: con alguno fijado se busca por
+        # profundización iterativa y profundidad_maxima es solo el tope
+        self.tiempo_por_movimiento = None  # segundos
+        self.nodos_por_movimiento = None
+        
+        # Distancias reales por el laberinto en vez de Manhattan (opcionales)
+        self.usar_distancia_laberinto = False  # en evaluar
+        self.huida_por_laberinto = False  # en la huida de los fantasmas asustados
+        
+        # Tabla de transposición de la poda alfa-beta (dura entre turnos)
+        self.usar_transposicion = False
+        self.tabla_transposicion = None
+        
+        # Ordenamiento de movimientos de la poda alfa-beta (aprende entre turnos)
+        self.usar_ordenamiento = False
+        self.ordenador_movimientos = None
+        
+        # Repartir la raíz entre procesos (paralelo.py)
+        self.usar_paralelo = False
+        
+        # Poda Star1/Star2 de expectimax (mismo resultado, menos nodos)
+        self.poda_star = True
+        
+        # Macro-movimientos: la búsqueda recorre pasillos enteros (Laberinto.pasillo)
+        self.usar_macro_movimientos = False
+        
+        # Poda por relevancia: los fantasmas fuera de alcance no ramifican (minimax y alfa-beta)
+        self.usar_relevancia_fantasmas = False
+        
         # Sistema de velocidad
         self.velocidad_pacman = 1.0
         self.velocidad_fantasma_normal = 0.92
         self.velocidad_fantasma_asustado = 0.60
         
+        # Pila de deshacer para la búsqueda en sitio (aplicar/deshacer)
+        self._pila_deshacer = []
+        
+        # Protocolo de deltas con el cliente: versión del último estado enviado
+        # y lo necesario para calcular qué cambió desde entonces
+        self.version_estado = 0
+        self._instantanea_enviada = None
+        
     def _crear_laberinto(self):
         """Crea un laberinto estilo Pacman clásico"""
         mapa = [
@@ -63,6 +131,39 @@ class EstadoJuego:
         ]
         return mapa
     
+    # --- Vistas como conjuntos de las capas de bits (API de posiciones) ---
+    
+    @property
+    def capsulas(self):
+        """Posiciones con cápsula"""
+        return frozenset(self.laberinto.posiciones(self.bits_capsulas))
+    
+    @capsulas.setter
+    def capsulas(self, posiciones):
+        self.bits_capsulas = self.laberinto.mascara(posiciones)
+        self.clave_capsulas = self.zobrist.de_mascara(self.zobrist.capsulas, self.bits_capsulas)
+    
+    @property
+    def power_ups(self):
+        """Posiciones donde se colocaron power-ups (consumidos o no)"""
+        return frozenset(self.laberinto.posiciones(self.bits_power_ups_colocados))
+    
+    @power_ups.setter
+    def power_ups(self, posiciones):
+        self.bits_power_ups_colocados = self.laberinto.mascara(posiciones)
+        self.bits_power_ups = self.bits_power_ups_colocados
+        self.clave_power_ups = self.zobrist.de_mascara(self.zobrist.power_ups, self.bits_power_ups)
+    
+    @property
+    def power_ups_consumidos(self):
+        """Posiciones de power-ups ya consumidos"""
+        return frozenset(self.laberinto.posiciones(self.bits_power_ups_colocados & ~self.bits_power_ups))
+    
+    @power_ups_consumidos.setter
+    def power_ups_consumidos(self, posiciones):
+        self.bits_power_ups = self.bits_power_ups_colocados & ~self.laberinto.mascara(posiciones)
+        self.clave_power_ups = self.zobrist.de_mascara(self.zobrist.power_ups, self.bits_power_ups)
+    
     def _generar_posicion_aleatoria(self):
         """Genera una posición aleatoria válida en el tablero"""
         espacios_libres = []
@@ -160,60 +261,28 @@ class EstadoJuego:
     
     def obtener_movimientos_validos_pacman(self):
         """Retorna lista de movimientos válidos para Pacman"""
-        movimientos = []
-        direcciones = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        nombres = ['arriba', 'abajo', 'izquierda', 'derecha']
-        
-        fila, columna = self.pos_pacman
-        
-        for i, (df, dc) in enumerate(direcciones):
-            nueva_fila = fila + df
-            nueva_columna = columna + dc
-            
-            if (0 <= nueva_fila < self.filas and 
-                0 <= nueva_columna < self.columnas and 
-                self.tablero[nueva_fila][nueva_columna] == 1):
-                movimientos.append(nombres[i])
-        
-        return movimientos
+        vecinos = self.laberinto.vecinos(self.laberinto.indice(self.pos_pacman))
+        return [nombre for nombre, bit in zip(DIRECCIONES, vecinos) if bit]
     
     def obtener_movimientos_validos_fantasma(self, pos_fantasma):
         """Retorna lista de movimientos válidos para un fantasma"""
-        movimientos = []
-        direcciones = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        
-        fila, columna = pos_fantasma
-        
-        for df, dc in direcciones:
-            nueva_fila = fila + df
-            nueva_columna = columna + dc
-            
-            if (0 <= nueva_fila < self.filas and 
-                0 <= nueva_columna < self.columnas and 
-                self.tablero[nueva_fila][nueva_columna] == 1):
-                movimientos.append((nueva_fila, nueva_columna))
-        
-        return movimientos
+        coordenadas = self.laberinto.coordenadas
+        vecinos = self.laberinto.vecinos(self.laberinto.indice(pos_fantasma))
+        return [coordenadas[bit.bit_length() - 1] for bit in vecinos if bit]
     
     def mover_pacman(self, direccion):
         """Mueve a Pacman en la dirección especificada"""
-        movimientos_mapa = {
-            'arriba': (-1, 0),
-            'abajo': (1, 0),
-            'izquierda': (0, -1),
-            'derecha': (0, 1)
-        }
-
-        if direccion not in movimientos_mapa:
+        if direccion not in MOVIMIENTOS:
             return False
 
-        df, dc = movimientos_mapa[direccion]
+        df, dc = MOVIMIENTOS[direccion]
         nueva_fila = self.pos_pacman[0] + df
         nueva_columna = self.pos_pacman[1] + dc
 
+        bit = 1 << (nueva_fila * self.columnas + nueva_columna)
         if not (0 <= nueva_fila < self.filas and
                 0 <= nueva_columna < self.columnas and
-                self.tablero[nueva_fila][nueva_columna] == 1):
+                self.laberinto.libres & bit):
             return False
 
         # Mover Pacman
@@ -229,18 +298,18 @@ class EstadoJuego:
                 self.turnos_poder_restantes = 0
 
         # Recoger cápsula normal
-        if self.pos_pacman in self.capsulas:
-            self.capsulas.remove(self.pos_pacman)
+        if self.bits_capsulas & bit:
+            self.bits_capsulas ^= bit
+            self.clave_capsulas ^= self.zobrist.capsulas[bit.bit_length() - 1]
             self.puntuacion += 10
             self.capsulas_recogidas += 1
 
         # --- POWER-UP: consumo y acumulación de duración ---
         # Solo procesamos si la posición tiene un power-up disponible (no consumido)
-        if self.pos_pacman in self.power_ups and self.pos_pacman not in self.power_ups_consumidos:
+        if self.bits_power_ups & bit:
             # marcar como consumido
-            self.power_ups_consumidos.add(self.pos_pacman)
-            # opcional: removerlo de self.power_ups para que no siga apareciendo
-            # self.power_ups.remove(self.pos_pacman)
+            self.bits_power_ups ^= bit
+            self.clave_power_ups ^= self.zobrist.power_ups[bit.bit_length() - 1]
 
             # Si ya está poderoso, sumamos turnos; si no, lo activamos
             DURACION_POWERUP_BASE = 18   # <- cambia este número si quieres otra duración inicial
@@ -259,20 +328,23 @@ class EstadoJuego:
 
         # Verificar colisión con fantasmas (tras el movimiento y eventuales efectos del power-up)
         fantasmas_a_eliminar = []
-        for fantasma in list(self.pos_fantasmas):  # lista para evitar problemas al eliminar mientras iteramos
-            if self.pos_pacman == fantasma:
-                if self.pacman_poderoso:
-                    fantasmas_a_eliminar.append(fantasma)
-                    self.puntuacion += 200
-                else:
-                    self.juego_terminado = True
-                    self.mensaje = "¡Pacman fue capturado!"
-                    self.puntuacion -= 100
-                    return True
+        if self.bits_fantasmas & bit:
+            for fantasma in list(self.pos_fantasmas):  # lista para evitar problemas al eliminar mientras iteramos
+                if self.pos_pacman == fantasma:
+                    if self.pacman_poderoso:
+                        fantasmas_a_eliminar.append(fantasma)
+                        self.puntuacion += 200
+                    else:
+                        self.juego_terminado = True
+                        self.mensaje = "¡Pacman fue capturado!"
+                        self.puntuacion -= 100
+                        return True
 
         for fantasma in fantasmas_a_eliminar:
             if fantasma in self.pos_fantasmas:
                 self.pos_fantasmas.remove(fantasma)
+        if fantasmas_a_eliminar:
+            self.bits_fantasmas = self.laberinto.mascara(self.pos_fantasmas)
 
         self.num_fantasmas = len(self.pos_fantasmas)
 
@@ -282,8 +354,7 @@ class EstadoJuego:
             self.puntuacion += 500
             return True
 
-        power_ups_disponibles = self.power_ups - self.power_ups_consumidos
-        if len(self.capsulas) == 0 and len(power_ups_disponibles) == 0:
+        if not (self.bits_capsulas | self.bits_power_ups):
             self.juego_terminado = True
             self.mensaje = "¡Pacman ganó! ¡Todas las cápsulas recogidas!"
             self.puntuacion += 500
@@ -314,7 +385,29 @@ class EstadoJuego:
             else:
                 nuevas_posiciones.append(pos_fantasma)
         
+        self._colocar_fantasmas(nuevas_posiciones)
+    
+    def mover_fantasmas_previstos(self):
+        """
+        mover_fantasmas sin azar: todos dan su paso a la vez. Es el resultado
+        más probable mientras las velocidades pasen de 0.5 (los pasos
+        intermedios de un macro-movimiento).
+        """
+        if len(self.pos_fantasmas) == 0:
+            return
+        self._colocar_fantasmas([self.paso_previsto_fantasma(pos_fantasma)
+                                 for pos_fantasma in self.pos_fantasmas])
+    
+    def paso_previsto_fantasma(self, pos_fantasma):
+        """Paso que da el fantasma cuando se mueve: hacia Pacman, o huyendo si Pacman tiene poder"""
+        if self.pacman_poderoso:
+            return self._siguiente_paso_huyendo_pacman(pos_fantasma)
+        return self._siguiente_paso_hacia_pacman(pos_fantasma)
+    
+    def _colocar_fantasmas(self, nuevas_posiciones):
+        """Pone los fantasmas en sus nuevas posiciones y resuelve los choques con Pacman"""
         self.pos_fantasmas = nuevas_posiciones
+        self.bits_fantasmas = self.laberinto.mascara(self.pos_fantasmas)
         
         fantasmas_a_eliminar = []
         for fantasma in self.pos_fantasmas:
@@ -331,6 +424,8 @@ class EstadoJuego:
         for fantasma in fantasmas_a_eliminar:
             if fantasma in self.pos_fantasmas:
                 self.pos_fantasmas.remove(fantasma)
+        if fantasmas_a_eliminar:
+            self.bits_fantasmas = self.laberinto.mascara(self.pos_fantasmas)
         
         self.num_fantasmas = len(self.pos_fantasmas)
         
@@ -339,28 +434,109 @@ class EstadoJuego:
             self.mensaje = "¡Pacman ganó! ¡Comió todos los fantasmas!"
             self.puntuacion += 500
     
-    def _siguiente_paso_hacia_pacman(self, pos_fantasma):
-        """Calcula el siguiente paso del fantasma hacia Pacman usando BFS"""
-        from collections import deque
+    def mover_fantasma(self, indice_fantasma, nueva_pos):
+        """Mueve un solo fantasma (turno MIN de la búsqueda) y resuelve la colisión con Pacman"""
+        self.pos_fantasmas[indice_fantasma] = nueva_pos
+        self.bits_fantasmas = self.laberinto.mascara(self.pos_fantasmas)
         
-        if pos_fantasma == self.pos_pacman:
-            return pos_fantasma
-        
-        cola = deque([(pos_fantasma, [pos_fantasma])])
-        visitados = {pos_fantasma}
+        if self.bits_fantasmas >> self.laberinto.indice(self.pos_pacman) & 1:
+            if self.pacman_poderoso:
+                # Pacman come a todos los fantasmas de su celda (puede haber varios, como en _colocar_fantasmas)
+                fantasmas_a_eliminar = [fantasma for fantasma in self.pos_fantasmas if fantasma == self.pos_pacman]
+                for fantasma in fantasmas_a_eliminar:
+                    self.pos_fantasmas.remove(fantasma)
+                self.bits_fantasmas = self.laberinto.mascara(self.pos_fantasmas)
+                self.puntuacion += 200 * len(fantasmas_a_eliminar)
+                self.num_fantasmas = len(self.pos_fantasmas)
+                
+                if len(self.pos_fantasmas) == 0:
+                    self.juego_terminado = True
+                    self.mensaje = "¡Pacman ganó! ¡Comió todos los fantasmas!"
+                    self.puntuacion += 500
+            else:
+                # Pacman es capturado
+                self.juego_terminado = True
+                self.mensaje = "¡Pacman fue capturado!"
+                self.puntuacion -= 100
+    
+    def mover_pacman_macro(self, direccion):
+        """
+        Macro-movimiento: Pacman sale en `direccion` y sigue el pasillo hasta
+        el siguiente cruce (Laberinto.pasillo). Entre paso y paso los
+        fantasmas hacen su movimiento previsto, así que cápsulas, power-ups,
+        poder y choques se resuelven celda a celda como en la partida. Se
+        detiene si el juego termina. El último turno de los fantasmas queda
+        para quien llama (la capa MIN o de azar de la búsqueda).
+        """
+        laberinto = self.laberinto
+        pasos = laberinto.pasillo(laberinto.indice(self.pos_pacman), INDICE_DIRECCION[direccion])
+        self.mover_pacman(direccion)
+        for paso in pasos[1:]:
+            if self.juego_terminado:
+                break
+            self.mover_fantasmas_previstos()
+            if self.juego_terminado:
+                break
+            self.mover_pacman(DIRECCIONES[paso])
+    
+    def aplicar_movimiento_pacman(self, direccion):
+        """
+        Igual que mover_pacman, pero guarda lo necesario para deshacerlo.
+        
+        Cubre cápsulas, power-ups, temporizador de poder y colisiones.
+        Se revierte con deshacer().
+        """
+        df, dc = MOVIMIENTOS.get(direccion, (0, 0))
+        destino = (self.pos_pacman[0] + df, self.pos_pacman[1] + dc)
+        
+        fantasmas_anteriores = self.pos_fantasmas
+        if destino in fantasmas_anteriores:
+            # Puede comerse un fantasma: trabajar sobre una lista nueva
+            self.pos_fantasmas = list(fantasmas_anteriores)
+        
+        self._guardar_deshacer(fantasmas_anteriores)
+        return self.mover_pacman(direccion)
+    
+    def aplicar_movimiento_fantasma(self, indice_fantasma, nueva_pos):
+        """Igual que mover_fantasma, pero guarda lo necesario para deshacerlo"""
+        fantasmas_anteriores = self.pos_fantasmas
+        self.pos_fantasmas = list(fantasmas_anteriores)
         
-        while cola:
-            pos_actual, camino = cola.popleft()
-            
-            if pos_actual == self.pos_pacman:
-                return camino[1] if len(camino) > 1 else pos_fantasma
-            
-            for nueva_pos in self.obtener_movimientos_validos_fantasma(pos_actual):
-                if nueva_pos not in visitados:
-                    visitados.add(nueva_pos)
-                    cola.append((nueva_pos, camino + [nueva_pos]))
+        self._guardar_deshacer(fantasmas_anteriores)
+        self.mover_fantasma(indice_fantasma, nueva_pos)
+    
+    def aplicar_macro_pacman(self, direccion):
+        """Igual que mover_pacman_macro; un solo deshacer() revierte el pasillo entero"""
+        fantasmas_anteriores = self.pos_fantasmas
+        self.pos_fantasmas = list(fantasmas_anteriores)
         
-        return pos_fantasma
+        self._guardar_deshacer(fantasmas_anteriores)
+        self.mover_pacman_macro(direccion)
+    
+    def _guardar_deshacer(self, fantasmas_anteriores):
+        """
+        Apila lo que un aplicar_* puede cambiar; deshacer() lo restaura en el
+        mismo orden (un campo nuevo se añade en los dos sitios, y solo aquí).
+        """
+        self._pila_deshacer.append((
+            self.pos_pacman, fantasmas_anteriores, self.bits_fantasmas,
+            self.bits_capsulas, self.bits_power_ups, self.clave_capsulas, self.clave_power_ups,
+            self.puntuacion, self.capsulas_recogidas,
+            self.movimientos, self.turnos_totales, self.juego_terminado, self.mensaje,
+            self.num_fantasmas, self.pacman_poderoso, self.turnos_poder_restantes
+        ))
+    
+    def deshacer(self):
+        """Revierte el último aplicar_movimiento_pacman / aplicar_movimiento_fantasma / aplicar_macro_pacman"""
+        (self.pos_pacman, self.pos_fantasmas, self.bits_fantasmas,
+         self.bits_capsulas, self.bits_power_ups, self.clave_capsulas, self.clave_power_ups,
+         self.puntuacion, self.capsulas_recogidas,
+         self.movimientos, self.turnos_totales, self.juego_terminado, self.mensaje,
+         self.num_fantasmas, self.pacman_poderoso, self.turnos_poder_restantes) = self._pila_deshacer.pop()
+    
+    def _siguiente_paso_hacia_pacman(self, pos_fantasma):
+        """Siguiente paso del fantasma hacia Pacman por el camino más corto (mismo que daría un BFS)"""
+        return self.laberinto.paso_hacia(pos_fantasma, self.pos_pacman)
     
     def _siguiente_paso_huyendo_pacman(self, pos_fantasma):
         """Calcula el siguiente paso del fantasma alejándose de Pacman"""
@@ -369,8 +545,13 @@ class EstadoJuego:
         if not movimientos:
             return pos_fantasma
         
+        if self.huida_por_laberinto:
+            distancia = self.laberinto.distancia
+        else:
+            distancia = self._distancia_manhattan
+        
         mejor_movimiento = max(movimientos, 
-            key=lambda pos: self._distancia_manhattan(pos, self.pos_pacman))
+            key=lambda pos: distancia(pos, self.pos_pacman))
         
         return mejor_movimiento
     
@@ -378,6 +559,18 @@ class EstadoJuego:
         """Calcula distancia Manhattan entre dos posiciones"""
         return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
     
+    def _distancia(self, pos1, pos2):
+        """Distancia usada por evaluar: Manhattan, o real por el laberinto si usar_distancia_laberinto"""
+        if self.usar_distancia_laberinto:
+            return self.laberinto.distancia(pos1, pos2)
+        return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
+    
+    def _distancia_minima(self, pos, mascara):
+        """Distancia de evaluar a la celda más cercana de una máscara"""
+        if self.usar_distancia_laberinto:
+            return self.laberinto.distancia_minima(pos, mascara)
+        return self.laberinto.distancia_manhattan_minima(pos, mascara)
+    
     def _evaluar_modo_cazador(self, distancia_min_fantasma, distancias_fantasmas):
         """Evaluación cuando Pacman tiene poder - CAZAR FANTASMAS"""
         puntos = 0
@@ -441,9 +634,7 @@ class EstadoJuego:
         
         # 💊 POWER-UPS - SEGUNDA PRIORIDAD (para ganar poder)
         if power_ups_disponibles:
-            distancias_power = [self._distancia_manhattan(self.pos_pacman, p) 
-                                for p in power_ups_disponibles]
-            distancia_min_power = min(distancias_power)
+            distancia_min_power = self._distancia_minima(self.pos_pacman, power_ups_disponibles)
             
             # Prioridad ALTA de power-ups cuando hay peligro
             if distancia_min_fantasma <= 5:
@@ -456,10 +647,8 @@ class EstadoJuego:
                 puntos += (6 - distancia_min_power) * 150
         
         # 🍪 CÁPSULAS - TERCERA PRIORIDAD (recolección segura)
-        if self.capsulas:
-            distancias_capsulas = [self._distancia_manhattan(self.pos_pacman, c) 
-                                   for c in self.capsulas]
-            distancia_min_capsula = min(distancias_capsulas)
+        if self.bits_capsulas:
+            distancia_min_capsula = self._distancia_minima(self.pos_pacman, self.bits_capsulas)
             
             # Solo recolectar cápsulas si estamos en zona SEGURA
             if distancia_min_fantasma >= 6:
@@ -492,12 +681,12 @@ class EstadoJuego:
         
         # Calcular distancias importantes
         if len(self.pos_fantasmas) > 0:
-            distancias_fantasmas = [self._distancia_manhattan(self.pos_pacman, f) 
+            distancias_fantasmas = [self._distancia(self.pos_pacman, f) 
                                     for f in self.pos_fantasmas]
             distancia_min_fantasma = min(distancias_fantasmas)
             distancia_promedio_fantasmas = sum(distancias_fantasmas) / len(distancias_fantasmas)
         
-        power_ups_disponibles = self.power_ups - self.power_ups_consumidos
+        power_ups_disponibles = self.bits_power_ups
         
         # 🎯 ESTRATEGIA PRINCIPAL: 3 FASES CLARAS
         
@@ -519,34 +708,109 @@ class EstadoJuego:
         
         return puntos
     
+    def clave_zobrist(self, indice_fantasma=None):
+        """
+        Clave Zobrist del nodo para la tabla de transposición.
+        
+        Args:
+            indice_fantasma: Fantasma al que le toca mover (None: turno de Pacman)
+        """
+        z = self.zobrist
+        laberinto = self.laberinto
+        clave = (self.clave_capsulas ^ self.clave_power_ups
+                 ^ z.pacman[laberinto.indice(self.pos_pacman)]
+                 ^ z.poder[min(self.turnos_poder_restantes, len(z.poder) - 1)]
+                 ^ z.trayectoria(self.puntuacion, self.turnos_totales))
+        for i, pos in enumerate(self.pos_fantasmas):
+            clave ^= z.fantasma(i)[laberinto.indice(pos)]
+        if indice_fantasma is None:
+            return clave ^ z.turno_pacman
+        return clave ^ z.turno_fantasma(indice_fantasma)
+    
     def clonar(self):
-        """Crea una copia profunda del estado"""
-        nuevo_estado = copy.deepcopy(self)
+        """Crea una copia del estado (las capas son ints y el laberinto se comparte)"""
+        nuevo_estado = copy.copy(self)
+        nuevo_estado.pos_fantasmas = list(self.pos_fantasmas)
+        nuevo_estado._pila_deshacer = []
         return nuevo_estado
     
     def obtener_estado_json(self):
         """Retorna el estado en formato JSON para el frontend"""
-        power_ups_visibles = [p for p in self.power_ups if p not in self.power_ups_consumidos]
-        
         return {
             'filas': self.filas,
             'columnas': self.columnas,
             'tablero': self.tablero,
+            'capsulas': self.laberinto.posiciones(self.bits_capsulas),
+            'power_ups': self.laberinto.posiciones(self.bits_power_ups),
+            **self._campos_dinamicos()
+        }
+    
+    def _campos_dinamicos(self):
+        """Campos del estado JSON que cambian turno a turno (sin tablero ni listas de cápsulas)"""
+        return {
             'pos_pacman': self.pos_pacman,
-            'pos_fantasmas': self.pos_fantasmas,
-            'capsulas': list(self.capsulas),
-            'power_ups': power_ups_visibles,
+            'pos_fantasmas': list(self.pos_fantasmas),
             'puntuacion': self.puntuacion,
             'capsulas_recogidas': self.capsulas_recogidas,
-            'total_capsulas': self.capsulas_recogidas + len(self.capsulas) + len(power_ups_visibles),
+            'total_capsulas': (self.capsulas_recogidas + contar_bits(self.bits_capsulas)
+                               + contar_bits(self.bits_power_ups)),
             'movimientos': self.movimientos,
             'juego_terminado': self.juego_terminado,
             'mensaje': self.mensaje,
             'algoritmo': self.algoritmo,
             'pacman_poderoso': self.pacman_poderoso,
             'turnos_poder_restantes': self.turnos_poder_restantes,
-            'num_fantasmas_total': 3,
+            'num_fantasmas_total': self.num_fantasmas_total,
             'num_fantasmas_restantes': len(self.pos_fantasmas),
-            'fantasmas_comidos': 3 - len(self.pos_fantasmas),
+            'fantasmas_comidos': self.num_fantasmas_total - len(self.pos_fantasmas),
             'velocidad_fantasmas': self.velocidad_fantasma_asustado if self.pacman_poderoso else self.velocidad_fantasma_normal
-        }
\ No newline at end of file
+        }
+    
+    def obtener_estado_versionado(self):
+        """
+        Estado completo con su versión: inicio de partida y resincronización.
+        
+        Los deltas siguientes se calculan a partir de este estado.
+        
+        Returns:
+            tuple: (estado JSON completo, versión)
+        """
+        campos = self._campos_dinamicos()
+        self._instantanea_enviada = (campos, self.bits_capsulas, self.bits_power_ups)
+        return {
+            'filas': self.filas,
+            'columnas': self.columnas,
+            'tablero': self.tablero,
+            'capsulas': self.laberinto.posiciones(self.bits_capsulas),
+            'power_ups': self.laberinto.posiciones(self.bits_power_ups),
+            **campos
+        }, self.version_estado
+    
+    def obtener_delta(self):
+        """
+        Lo que cambió desde el último estado enviado, y avanza la versión.
+        
+        El delta trae solo los campos de _campos_dinamicos que cambiaron, más
+        'capsulas_comidas' y 'power_ups_consumidos' (posiciones a quitar).
+        Debe aplicarse sobre el estado de versión - 1.
+        
+        Returns:
+            tuple: (delta, versión nueva), o None si hace falta un estado
+                completo (nunca se envió uno, o reaparecieron cápsulas)
+        """
+        if self._instantanea_enviada is None:
+            return None
+        campos_anteriores, capsulas_anteriores, power_ups_anteriores = self._instantanea_enviada
+        if self.bits_capsulas & ~capsulas_anteriores or self.bits_power_ups & ~power_ups_anteriores:
+            return None
+        campos = self._campos_dinamicos()
+        
+        delta = {clave: valor for clave, valor in campos.items() if campos_anteriores[clave] != valor}
+        if capsulas_anteriores != self.bits_capsulas:
+            delta['capsulas_comidas'] = self.laberinto.posiciones(capsulas_anteriores & ~self.bits_capsulas)
+        if power_ups_anteriores != self.bits_power_ups:
+            delta['power_ups_consumidos'] = self.laberinto.posiciones(power_ups_anteriores & ~self.bits_power_ups)
+        
+        self._instantanea_enviada = (campos, self.bits_capsulas, self.bits_power_ups)
+        self.version_estado += 1
+        return delta, self.version_estado
\ No newline at end of file
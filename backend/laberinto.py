@@ -0,0 +1,539 @@
+"""
+Laberinto compilado en bitboards.
+
+Cada celda (fila, columna) es el bit fila * columnas + columna de un int de
+Python, así que paredes, cápsulas, power-ups y fantasmas de todo el tablero
+caben en un solo número por capa. Un Laberinto es inmutable y se comparte
+entre todas las partidas (y sus clones) que usan el mismo mapa.
+
+Además guarda las distancias reales entre todo par de celdas y el siguiente
+paso del camino más corto, calculados una vez por mapa y cacheados en disco
+(PACMAN_CACHE_DIR) con la huella del mapa como clave. El archivo es una
+cabecera fija (magia, versión, huella, celdas) y las dos tablas en crudo;
+uno que no cuadra (de otra versión, truncado, de otro tamaño) se recalcula
+y se sobrescribe. En mapas de más de
+LIMITE_TABLA_DENSA celdas las tablas n*n no caben (100x100 son 400 MB):
+cada fila de distancias (desde una celda) se calcula con un BFS al primer
+uso y se guarda en una caché acotada, y el siguiente paso hacia una celda
+sale de la fila de esa celda (el primer vecino, en orden, un paso más cerca:
+el mismo que elige el BFS de la tabla densa).
+
+Para la celda más cercana de una máscara (cápsulas, power-ups) cada celda
+tiene sus "bolas": bolas[d] es la máscara de las celdas libres a distancia
+<= d. La distancia mínima es el menor d con bolas[d] & máscara, que se
+encuentra con unos pocos AND (búsqueda galopante), sin recorrer la máscara.
+Como dependen solo del mapa, los estados y sus clones no guardan nada.
+En mapas grandes también las bolas van a una caché acotada.
+
+Los pasillos (celdas libres con exactamente dos vecinas) no tienen nada que
+decidir: el grafo de pasillos los comprime en aristas con peso entre cruces
+(celdas de cualquier otro grado), y pasillo() da el recorrido desde una
+celda hasta el siguiente cruce para los macro-movimientos de los motores.
+"""
+import hashlib
+import os
+import struct
+import sys
+import threading
+from array import array
+from collections import deque
+
+INALCANZABLE = 0xFFFF
+RADIO_BOLAS = 64  # Radio máximo de las bolas por celda; más lejos se recorre la máscara
+LARGO_MAXIMO_PASILLO = 8  # Pasos máximos de un macro-movimiento (un pasillo más largo se corta)
+LIMITE_TABLA_DENSA = 4096  # Celdas hasta las que se calcula la tabla de distancias completa
+FILAS_EN_CACHE = 512  # Filas de distancias por laberinto en mapas grandes (2 bytes por celda cada una)
+BOLAS_EN_CACHE = 256  # Celdas con bolas por laberinto y tipo en mapas grandes
+LABERINTOS_EN_CACHE = 32  # Mapas compilados por proceso (con laberintos generados hay muchos)
+_VERSION_CACHE = 2
+_MAGIA_CACHE = b'PMDS'
+_CABECERA_CACHE = struct.Struct('<4sI20sI')  # Magia, versión, huella (sha1), celdas
+DIRECTORIO_CACHE = os.environ.get(
+    'PACMAN_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'pacman'))
+
+
+if hasattr(int, 'bit_count'):
+    def contar_bits(mascara):
+        """Popcount de una máscara"""
+        return mascara.bit_count()
+else:  # Python < 3.10
+    def contar_bits(mascara):
+        """Popcount de una máscara"""
+        return bin(mascara).count('1')
+
+
+class Laberinto:
+    """Mapa inmutable con sus máscaras precalculadas"""
+
+    def __init__(self, tablero):
+        self.tablero = tablero
+        self.filas = len(tablero)
+        self.columnas = len(tablero[0])
+
+        # Coordenadas de cada índice de bit
+        self.coordenadas = [divmod(i, self.columnas) for i in range(self.filas * self.columnas)]
+
+        self.libres = 0
+        for fila in range(self.filas):
+            for columna in range(self.columnas):
+                if tablero[fila][columna] == 1:
+                    self.libres |= 1 << (fila * self.columnas + columna)
+        self.indices_libres = [i for i in range(self.filas * self.columnas) if self.libres >> i & 1]
+
+        # Máscaras para que los desplazamientos de 1 bit no salten de fila
+        columna_0 = 0
+        columna_ultima = 0
+        for fila in range(self.filas):
+            columna_0 |= 1 << (fila * self.columnas)
+            columna_ultima |= 1 << (fila * self.columnas + self.columnas - 1)
+        self._destino_izquierda = self.libres & ~columna_ultima
+        self._destino_derecha = self.libres & ~columna_0
+
+        # Índices de las celdas vecinas libres, en el orden arriba, abajo, izquierda, derecha
+        self.adyacencia = [
+            [bit.bit_length() - 1 for bit in self.vecinos(i) if bit] if self.libres >> i & 1 else []
+            for i in range(self.filas * self.columnas)
+        ]
+
+        # Cruces: celdas libres que no son de pasillo (grado distinto de 2)
+        self.cruces = 0
+        for i in self.indices_libres:
+            if len(self.adyacencia[i]) != 2:
+                self.cruces |= 1 << i
+        self._pasillos = {}  # indice * 4 + direccion -> direcciones hasta el cruce
+        self._grafo_pasillos = None
+
+        self.huella = hashlib.sha1(
+            f"{self.filas}x{self.columnas}:".encode()
+            + bytes(celda for fila in tablero for celda in fila)
+        ).hexdigest()
+
+        # Tablas de distancias (se cargan o calculan al primer uso); en mapas
+        # grandes, solo las filas que se usan
+        n = self.filas * self.columnas
+        self.distancias_por_fila = n > LIMITE_TABLA_DENSA
+        self._distancias = None
+        self._siguiente = None
+        self._lock_distancias = threading.Lock()
+        self._filas_distancias = CacheAcotada(FILAS_EN_CACHE) if self.distancias_por_fila else None
+        self._cota_distancias = None
+
+        # Bolas por celda, Manhattan y por el laberinto (se calculan al primer uso de cada celda)
+        capacidad_bolas = BOLAS_EN_CACHE if self.distancias_por_fila else n
+        self._bolas_manhattan = CacheAcotada(capacidad_bolas)
+        self._bolas_laberinto = CacheAcotada(capacidad_bolas)
+
+    def __reduce__(self):
+        # Al deserializar se reutiliza el laberinto ya compilado en ese proceso
+        return (obtener_laberinto, (self.tablero,))
+
+    def indice(self, pos):
+        """Índice de bit de una posición (fila, columna)"""
+        return pos[0] * self.columnas + pos[1]
+
+    def mascara(self, posiciones):
+        """Máscara con los bits de un iterable de posiciones"""
+        mascara = 0
+        for fila, columna in posiciones:
+            mascara |= 1 << (fila * self.columnas + columna)
+        return mascara
+
+    def posiciones(self, mascara):
+        """Lista de posiciones (en orden de celda) de los bits de una máscara"""
+        coordenadas = self.coordenadas
+        resultado = []
+        while mascara:
+            bit = mascara & -mascara
+            resultado.append(coordenadas[bit.bit_length() - 1])
+            mascara ^= bit
+        return resultado
+
+    def distancia_manhattan_minima(self, pos, mascara):
+        """Distancia Manhattan de pos a la celda más cercana de la máscara (None si está vacía)"""
+        if not mascara:
+            return None
+        radio = _radio_minimo(self.bolas_manhattan(self.indice(pos)), mascara)
+        if radio is not None:
+            return radio
+        return self._recorrer_filas_manhattan(pos, mascara)
+
+    def _recorrer_filas_manhattan(self, pos, mascara):
+        """
+        Distancia Manhattan mínima sin bolas (celdas fuera de RADIO_BOLAS o no libres).
+
+        Recorre las filas hacia afuera desde la de pos y en cada fila busca la
+        columna más cercana con desplazamientos; termina en cuanto la distancia
+        vertical ya no puede mejorar el mínimo. Devuelve None si la máscara está vacía.
+        """
+        if not mascara:
+            return None
+
+        fila, columna = pos
+        columnas = self.columnas
+        fila_llena = (1 << columnas) - 1
+        hasta_columna = (1 << (columna + 1)) - 1
+        mejor = None
+
+        for dy in range(max(fila, self.filas - 1 - fila) + 1):
+            if mejor is not None and dy >= mejor:
+                break
+            for f in ((fila,) if dy == 0 else (fila - dy, fila + dy)):
+                if not 0 <= f < self.filas:
+                    continue
+                bits = (mascara >> (f * columnas)) & fila_llena
+                if not bits:
+                    continue
+                # Bit más bajo a la derecha (o en) columna y más alto a la izquierda
+                derecha = bits >> columna
+                if derecha:
+                    dx = (derecha & -derecha).bit_length() - 1
+                    if mejor is None or dy + dx < mejor:
+                        mejor = dy + dx
+                izquierda = bits & hasta_columna
+                if izquierda:
+                    dx = columna - (izquierda.bit_length() - 1)
+                    if mejor is None or dy + dx < mejor:
+                        mejor = dy + dx
+        return mejor
+
+    def distancia_minima(self, pos, mascara):
+        """Distancia real (por el laberinto) de pos a la celda más cercana de la máscara"""
+        if not mascara:
+            return None
+        radio = _radio_minimo(self.bolas_laberinto(self.indice(pos)), mascara)
+        if radio is not None:
+            return radio
+        # Más lejos que RADIO_BOLAS, o inalcanzable
+        distancias, base = self._distancias_desde(self.indice(pos))
+        mejor = INALCANZABLE
+        while mascara:
+            bit = mascara & -mascara
+            d = distancias[base + bit.bit_length() - 1]
+            if d < mejor:
+                mejor = d
+            mascara ^= bit
+        return mejor
+
+    def bolas_manhattan(self, indice):
+        """bolas[d]: celdas libres a distancia Manhattan <= d de la celda indice"""
+        bolas = self._bolas_manhattan.get(indice)
+        if bolas is None:
+            fila, columna = self.coordenadas[indice]
+            coordenadas = self.coordenadas
+            bolas = self._bolas_manhattan.guardar(indice, self._construir_bolas(
+                (i, abs(coordenadas[i][0] - fila) + abs(coordenadas[i][1] - columna))
+                for i in self.indices_libres))
+        return bolas
+
+    def bolas_laberinto(self, indice):
+        """bolas[d]: celdas libres a distancia real <= d de la celda indice"""
+        bolas = self._bolas_laberinto.get(indice)
+        if bolas is None:
+            distancias, base = self._distancias_desde(indice)
+            bolas = self._bolas_laberinto.guardar(indice, self._construir_bolas(
+                (i, distancias[base + i]) for i in self.indices_libres))
+        return bolas
+
+    @staticmethod
+    def _construir_bolas(distancias_por_celda):
+        anillos = [0] * (RADIO_BOLAS + 1)
+        for i, d in distancias_por_celda:
+            if d <= RADIO_BOLAS:
+                anillos[d] |= 1 << i
+        while len(anillos) > 1 and not anillos[-1]:
+            anillos.pop()
+
+        bolas = []
+        acumulada = 0
+        for anillo in anillos:
+            acumulada |= anillo
+            bolas.append(acumulada)
+        return bolas
+
+    # --- Tablas de caminos más cortos ---
+
+    @property
+    def distancias(self):
+        """
+        Tabla densa n*n: distancias[a * n + b] = pasos de la celda a a la b.
+        En mapas grandes no se usa: distancia() y compañía van por filas.
+        """
+        if self._distancias is None:
+            self._compilar_distancias()
+        return self._distancias
+
+    @property
+    def siguiente(self):
+        """Tabla densa n*n: siguiente[a * n + b] = primera celda del camino más corto de a a b"""
+        if self._siguiente is None:
+            self._compilar_distancias()
+        return self._siguiente
+
+    def cota_distancias(self):
+        """
+        Cota superior de la distancia real entre dos celdas libres: dos veces
+        la excentricidad de una celda (desigualdad triangular), o INALCANZABLE
+        si el laberinto no es conexo.
+        """
+        if self._cota_distancias is None:
+            if not self.indices_libres:
+                self._cota_distancias = 0
+            else:
+                distancias, base = self._distancias_desde(self.indices_libres[0])
+                excentricidad = max(distancias[base + i] for i in self.indices_libres)
+                self._cota_distancias = (INALCANZABLE if excentricidad == INALCANZABLE
+                                         else 2 * excentricidad)
+        return self._cota_distancias
+
+    def distancia(self, pos1, pos2):
+        """Distancia real entre dos posiciones (INALCANZABLE si no hay camino)"""
+        if not self.distancias_por_fila:
+            return self.distancias[self.indice(pos1) * len(self.coordenadas) + self.indice(pos2)]
+        return self._fila_distancias(self.indice(pos1))[self.indice(pos2)]
+
+    def paso_hacia(self, origen, destino):
+        """Siguiente posición desde origen por el camino más corto a destino (origen si no hay camino)"""
+        if not self.distancias_por_fila:
+            siguiente = self.siguiente[self.indice(origen) * len(self.coordenadas) + self.indice(destino)]
+            if siguiente == INALCANZABLE:
+                return origen
+            return self.coordenadas[siguiente]
+
+        # Mapa grande: con la fila del destino (la de Pacman, compartida por todos los fantasmas)
+        distancias = self._fila_distancias(self.indice(destino))
+        d = distancias[self.indice(origen)]
+        if d == INALCANZABLE or d == 0:
+            return origen
+        for vecino in self.adyacencia[self.indice(origen)]:
+            if distancias[vecino] == d - 1:
+                return self.coordenadas[vecino]
+
+    def _distancias_desde(self, indice):
+        """(distancias, base): las distancias desde indice; la de la celda i está en base + i"""
+        if not self.distancias_por_fila:
+            return self.distancias, indice * len(self.coordenadas)
+        return self._fila_distancias(indice), 0
+
+    def _fila_distancias(self, indice):
+        """Distancias desde indice en un mapa grande: un BFS al primer uso"""
+        fila = self._filas_distancias.get(indice)
+        if fila is None:
+            fila = array('H', [INALCANZABLE]) * len(self.coordenadas)
+            if self.libres >> indice & 1:
+                self._bfs(indice, fila, None, 0)
+            self._filas_distancias.guardar(indice, fila)
+        return fila
+
+    def _compilar_distancias(self):
+        # Un solo hilo compila; los demás esperan y usan sus tablas
+        with self._lock_distancias:
+            if self._distancias is None:
+                self._compilar_distancias_sin_lock()
+
+    def _compilar_distancias_sin_lock(self):
+        ruta = os.path.join(DIRECTORIO_CACHE, f"laberinto-{self.huella}.bin")
+        if self._cargar_distancias(ruta):
+            return
+
+        n = len(self.coordenadas)
+        distancias = array('H', [INALCANZABLE]) * (n * n)
+        siguiente = array('H', [INALCANZABLE]) * (n * n)
+        for origen in self.indices_libres:
+            self._bfs(origen, distancias, siguiente, origen * n)
+
+        # Se publican ya completas y _distancias la última: es la que mira _compilar_distancias
+        self._siguiente = siguiente
+        self._distancias = distancias
+        self._guardar_distancias(ruta)
+
+    def _bfs(self, origen, distancias, siguiente, base):
+        """
+        Caminos más cortos desde origen, escritos en distancias (y siguiente,
+        si no es None) a partir de base. El primer paso se hereda del padre,
+        con el mismo orden de vecinos que el BFS de los fantasmas.
+        """
+        adyacencia = self.adyacencia
+        if siguiente is None:
+            distancias[base + origen] = 0
+            cola = deque([origen])
+            while cola:
+                actual = cola.popleft()
+                d = distancias[base + actual] + 1
+                for vecino in adyacencia[actual]:
+                    if distancias[base + vecino] == INALCANZABLE:
+                        distancias[base + vecino] = d
+                        cola.append(vecino)
+            return
+
+        distancias[base + origen] = 0
+        siguiente[base + origen] = origen
+        cola = deque()
+        for vecino in adyacencia[origen]:
+            distancias[base + vecino] = 1
+            siguiente[base + vecino] = vecino
+            cola.append(vecino)
+        while cola:
+            actual = cola.popleft()
+            d = distancias[base + actual] + 1
+            paso = siguiente[base + actual]
+            for vecino in adyacencia[actual]:
+                if distancias[base + vecino] == INALCANZABLE:
+                    distancias[base + vecino] = d
+                    siguiente[base + vecino] = paso
+                    cola.append(vecino)
+
+    def _cabecera_cache(self):
+        return _CABECERA_CACHE.pack(_MAGIA_CACHE, _VERSION_CACHE, bytes.fromhex(self.huella),
+                                    len(self.coordenadas))
+
+    def _cargar_distancias(self, ruta):
+        """Carga las tablas del disco; False (y se recalculan) si el archivo falta o no cuadra"""
+        total = len(self.coordenadas) ** 2
+        # Se llenan antes de publicarlas: otro hilo no puede ver una tabla a medias
+        distancias = array('H')
+        siguiente = array('H')
+        try:
+            with open(ruta, 'rb') as archivo:
+                if archivo.read(_CABECERA_CACHE.size) != self._cabecera_cache():
+                    return False
+                distancias.fromfile(archivo, total)
+                siguiente.fromfile(archivo, total)
+                if archivo.read(1):
+                    return False  # Sobra algo: no es un archivo de esta versión
+        except (OSError, EOFError, ValueError):
+            return False
+        if not len(distancias) == len(siguiente) == total:
+            return False
+        if sys.byteorder == 'big':
+            distancias.byteswap()
+            siguiente.byteswap()
+        self._siguiente = siguiente
+        self._distancias = distancias
+        return True
+
+    def _guardar_distancias(self, ruta):
+        distancias, siguiente = self._distancias, self._siguiente
+        if sys.byteorder == 'big':  # En disco siempre little-endian, como la cabecera
+            distancias, siguiente = array('H', distancias), array('H', siguiente)
+            distancias.byteswap()
+            siguiente.byteswap()
+        try:
+            os.makedirs(DIRECTORIO_CACHE, exist_ok=True)
+            temporal = f"{ruta}.{os.getpid()}.tmp"
+            with open(temporal, 'wb') as archivo:
+                archivo.write(self._cabecera_cache())
+                distancias.tofile(archivo)
+                siguiente.tofile(archivo)
+            os.replace(temporal, ruta)
+        except OSError:
+            pass  # Sin caché en disco: se recalcula en el próximo proceso
+
+    def pasillo(self, indice, direccion):
+        """
+        Direcciones (0-3, en el orden de vecinos) que sigue Pacman al salir de
+        indice por direccion hasta el siguiente cruce, con a lo sumo
+        LARGO_MAXIMO_PASILLO pasos. La dirección tiene que ser válida.
+        """
+        clave = indice * 4 + direccion
+        pasos = self._pasillos.get(clave)
+        if pasos is None:
+            pasos = self._pasillos[clave] = self._recorrer_pasillo(indice, direccion, LARGO_MAXIMO_PASILLO)[0]
+        return pasos
+
+    @property
+    def grafo_pasillos(self):
+        """Grafo comprimido: cruce -> [(direccion, cruce destino, largo del pasillo), ...]"""
+        if self._grafo_pasillos is None:
+            grafo = {}
+            for i in self.indices_libres:
+                if self.cruces >> i & 1:
+                    grafo[i] = [(direccion, *self._destino_pasillo(i, direccion))
+                                for direccion, bit in enumerate(self.vecinos(i)) if bit]
+            self._grafo_pasillos = grafo
+        return self._grafo_pasillos
+
+    def _destino_pasillo(self, indice, direccion):
+        pasos, destino = self._recorrer_pasillo(indice, direccion)
+        return destino, len(pasos)
+
+    def _recorrer_pasillo(self, indice, direccion, largo_maximo=None):
+        """(direcciones, celda final) del recorrido hasta un cruce, la celda de partida o largo_maximo"""
+        pasos = [direccion]
+        actual = self.vecinos(indice)[direccion].bit_length() - 1
+        while (actual != indice and not self.cruces >> actual & 1
+               and (largo_maximo is None or len(pasos) < largo_maximo)):
+            vecinos = self.vecinos(actual)
+            # Celda de pasillo: la única salida que no es volver atrás
+            direccion = next(d for d in range(4) if vecinos[d] and d != direccion ^ 1)
+            pasos.append(direccion)
+            actual = vecinos[direccion].bit_length() - 1
+        return tuple(pasos), actual
+
+    def vecinos(self, indice):
+        """
+        Máscaras de las celdas libres vecinas: (arriba, abajo, izquierda, derecha).
+        Cada una vale 0 si hay pared o borde.
+        """
+        bit = 1 << indice
+        return (
+            (bit >> self.columnas) & self.libres,
+            (bit << self.columnas) & self.libres,
+            (bit >> 1) & self._destino_izquierda,
+            (bit << 1) & self._destino_derecha
+        )
+
+
+class CacheAcotada(dict):
+    """
+    dict que descarta la entrada más antigua al llegar a su capacidad.
+
+    Se comparte entre las búsquedas de todos los hilos: get() no necesita
+    nada, pero guardar() descarta y escribe con un lock. Si dos hilos
+    calculan la misma clave, se queda el primer valor y los dos lo usan.
+    """
+
+    def __init__(self, capacidad):
+        super().__init__()
+        self.capacidad = capacidad
+        self._lock = threading.Lock()
+
+    def guardar(self, clave, valor):
+        with self._lock:
+            existente = self.get(clave)
+            if existente is not None:
+                return existente
+            if len(self) >= self.capacidad:
+                del self[next(iter(self))]
+            self[clave] = valor
+            return valor
+
+
+def _radio_minimo(bolas, mascara):
+    """Menor d con bolas[d] & mascara (None si ni la mayor la toca): galope y bisección"""
+    ultimo = len(bolas) - 1
+    if not bolas[ultimo] & mascara:
+        return None
+    bajo, alto, paso = -1, 0, 1  # bolas[bajo] no toca la máscara; se busca un alto que sí
+    while not bolas[alto] & mascara:
+        bajo = alto
+        alto = min(alto + paso, ultimo)
+        paso *= 2
+    while alto - bajo > 1:
+        medio = (bajo + alto) // 2
+        if bolas[medio] & mascara:
+            alto = medio
+        else:
+            bajo = medio
+    return alto
+
+
+_laberintos = CacheAcotada(LABERINTOS_EN_CACHE)
+
+
+def obtener_laberinto(tablero):
+    """Laberinto compilado para un tablero (uno por mapa y proceso)"""
+    clave = tuple(tuple(fila) for fila in tablero)
+    laberinto = _laberintos.get(clave)
+    if laberinto is None:
+        laberinto = _laberintos.guardar(clave, Laberinto(tablero))
+    return laberinto
@@ -0,0 +1,143 @@
+"""
+Mapas para EstadoJuego: layouts en archivos de texto y laberintos generados.
+
+Un layout es un archivo de layouts/ (o cualquier ruta) con una línea por
+fila: '%' o '#' son pared y cualquier otro carácter es pasillo ('.', ' ',
+o las marcas P/G/o de otros formatos, que se ignoran). Todas las filas
+tienen el mismo largo.
+
+generar_laberinto crea un laberinto con semilla: un árbol recorrido en
+profundidad sobre las celdas impares, y después se abren los callejones sin
+salida para que haya ciclos, como en los mapas de Pacman. La misma semilla
+da siempre el mismo mapa, en cualquier proceso.
+
+Los tableros son listas de filas con 1 (pasillo) y 0 (pared), el formato
+que usan EstadoJuego y Laberinto.
+"""
+import os
+import random
+
+DIRECTORIO_LAYOUTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'layouts')
+EXTENSION_LAYOUT = '.txt'
+PAREDES = '%#'
+LADO_MINIMO = 5
+PROPORCION_CICLOS = 1.0  # Callejones sin salida que se abren en los laberintos generados
+
+
+def leer_layout(texto):
+    """
+    Tablero de un layout en texto.
+
+    Raises:
+        ValueError: Sin filas, filas de distinto largo o sin ningún pasillo
+    """
+    lineas = [linea.rstrip('\r\n') for linea in texto.splitlines()]
+    lineas = [linea for linea in lineas if linea.strip()]
+    if not lineas:
+        raise ValueError("Layout vacío")
+    columnas = len(lineas[0])
+    for numero, linea in enumerate(lineas, 1):
+        if len(linea) != columnas:
+            raise ValueError(f"Layout no rectangular: la fila {numero} tiene {len(linea)} "
+                             f"columnas y la primera {columnas}")
+    tablero = [[0 if caracter in PAREDES else 1 for caracter in linea] for linea in lineas]
+    if not any(any(fila) for fila in tablero):
+        raise ValueError("Layout sin pasillos")
+    return tablero
+
+
+def listar_layouts():
+    """Nombres (sin extensión) de los layouts de DIRECTORIO_LAYOUTS"""
+    try:
+        archivos = os.listdir(DIRECTORIO_LAYOUTS)
+    except OSError:
+        return []
+    return sorted(archivo[:-len(EXTENSION_LAYOUT)] for archivo in archivos
+                  if archivo.endswith(EXTENSION_LAYOUT))
+
+
+def cargar_layout(nombre_o_ruta):
+    """
+    Tablero de un layout por nombre (layouts/<nombre>.txt) o, si no hay
+    ninguno con ese nombre, por ruta.
+
+    Raises:
+        FileNotFoundError: Si no existe
+        ValueError: Si el layout no es válido
+    """
+    ruta = os.path.join(DIRECTORIO_LAYOUTS, nombre_o_ruta + EXTENSION_LAYOUT)
+    if not os.path.isfile(ruta):
+        ruta = nombre_o_ruta
+    with open(ruta, encoding='utf-8') as archivo:
+        return leer_layout(archivo.read())
+
+
+def generar_laberinto(filas, columnas, semilla=0, proporcion_ciclos=PROPORCION_CICLOS):
+    """
+    Laberinto procedural con semilla.
+
+    Args:
+        filas, columnas: Tamaño del tablero (al menos LADO_MINIMO); con un
+            lado par, la última fila o columna queda de pared
+        semilla: Misma semilla, mismo laberinto
+        proporcion_ciclos: Fracción de callejones sin salida que se abren
+            (0 = árbol perfecto, 1 = ninguno)
+
+    Returns:
+        list: Tablero (filas de 1 y 0) con borde de pared y todos los pasillos conectados
+    """
+    if filas < LADO_MINIMO or columnas < LADO_MINIMO:
+        raise ValueError(f"El laberinto necesita al menos {LADO_MINIMO}x{LADO_MINIMO} celdas")
+    generador = random.Random(semilla)
+    tablero = [[0] * columnas for _ in range(filas)]
+    # Celdas del árbol en las posiciones impares; las paredes entre ellas se abren al visitarlas
+    ultima_fila = filas - 2 if filas % 2 else filas - 3
+    ultima_columna = columnas - 2 if columnas % 2 else columnas - 3
+
+    tablero[1][1] = 1
+    pila = [(1, 1)]
+    while pila:
+        fila, columna = pila[-1]
+        vecinas = [(fila + df, columna + dc) for df, dc in ((-2, 0), (2, 0), (0, -2), (0, 2))
+                   if 1 <= fila + df <= ultima_fila and 1 <= columna + dc <= ultima_columna
+                   and not tablero[fila + df][columna + dc]]
+        if not vecinas:
+            pila.pop()
+            continue
+        nueva_fila, nueva_columna = generador.choice(vecinas)
+        tablero[(fila + nueva_fila) // 2][(columna + nueva_columna) // 2] = 1
+        tablero[nueva_fila][nueva_columna] = 1
+        pila.append((nueva_fila, nueva_columna))
+
+    _abrir_callejones(tablero, ultima_fila, ultima_columna, generador, proporcion_ciclos)
+    return tablero
+
+
+def _abrir_callejones(tablero, ultima_fila, ultima_columna, generador, proporcion_ciclos):
+    """Abre una pared de cada callejón sin salida (con probabilidad proporcion_ciclos) hacia otro pasillo"""
+    for fila in range(1, ultima_fila + 1, 2):
+        for columna in range(1, ultima_columna + 1, 2):
+            direcciones = ((-1, 0), (1, 0), (0, -1), (0, 1))
+            abiertas = sum(tablero[fila + df][columna + dc] for df, dc in direcciones)
+            if abiertas != 1 or generador.random() >= proporcion_ciclos:
+                continue
+            paredes = [(fila + df, columna + dc) for df, dc in direcciones
+                       if not tablero[fila + df][columna + dc]
+                       and 1 <= fila + 2 * df <= ultima_fila and 1 <= columna + 2 * dc <= ultima_columna]
+            if paredes:
+                pared_fila, pared_columna = generador.choice(paredes)
+                tablero[pared_fila][pared_columna] = 1
+
+
+def tablero_de_configuracion(configuracion):
+    """
+    Tablero de una configuración de partida (petición del servidor, torneo):
+    'layout' (nombre o ruta), o 'filas' y 'columnas' con 'semilla_laberinto'
+    para uno generado. None si no pide ninguno (el laberinto clásico).
+    """
+    if configuracion.get('layout'):
+        return cargar_layout(configuracion['layout'])
+    if configuracion.get('filas') is not None or configuracion.get('columnas') is not None:
+        return generar_laberinto(int(configuracion['filas']), int(configuracion['columnas']),
+                                 configuracion.get('semilla_laberinto', 0))
+    return None
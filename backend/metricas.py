@@ -0,0 +1,179 @@
+"""
+Métricas acumuladas del servidor para /api/metricas.
+
+Suma las EstadisticasBusqueda de cada turno (contadores por algoritmo) y
+la latencia de las búsquedas y de cada endpoint en histogramas de cubetas
+fijas. De la cola de trabajos, cuántos terminan, fallan, se degradan o se
+rechazan, y el tiempo que pasan en cola y ejecutándose; y los segundos de
+presupuesto que recibió cada búsqueda (cuántas con el presupuesto recortado
+por la carga). Se exporta como JSON o en el formato de texto de Prometheus.
+"""
+import bisect
+import threading
+from collections import defaultdict
+
+# Límites superiores de las cubetas, en segundos
+CUBETAS_SEGUNDOS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTADORES_BUSQUEDA = ('busquedas', 'nodos_explorados', 'nodos_podados', 'evaluaciones',
+                       'clonaciones', 'timeouts')
+
+RESULTADOS_TRABAJO = ('terminado', 'fallido', 'degradado', 'rechazado')
+FASES_TRABAJO = ('en_cola', 'ejecucion')
+
+
+class Histograma:
+    """Cuenta de observaciones por cubeta, más su suma (no es seguro entre hilos por sí solo)"""
+
+    def __init__(self, limites=CUBETAS_SEGUNDOS):
+        self.limites = limites
+        self.cubetas = [0] * (len(limites) + 1)  # La última es +Inf
+        self.suma = 0.0
+        self.cuenta = 0
+
+    def observar(self, valor):
+        self.cubetas[bisect.bisect_left(self.limites, valor)] += 1
+        self.suma += valor
+        self.cuenta += 1
+
+    def acumuladas(self):
+        """Cuentas acumuladas por límite (como las cubetas 'le' de Prometheus)"""
+        total = 0
+        resultado = []
+        for limite, cuenta in zip(self.limites + (float('inf'),), self.cubetas):
+            total += cuenta
+            resultado.append((limite, total))
+        return resultado
+
+    def a_dict(self):
+        return {
+            'cubetas': {_formato_limite(limite): cuenta for limite, cuenta in self.acumuladas()},
+            'suma': self.suma,
+            'cuenta': self.cuenta
+        }
+
+
+class MetricasServidor:
+    """Contadores e histogramas del proceso servidor, seguros entre hilos"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.busqueda = defaultdict(lambda: dict.fromkeys(CONTADORES_BUSQUEDA, 0))  # por algoritmo
+        self.latencia_busqueda = defaultdict(Histograma)  # por algoritmo
+        self.peticiones = defaultdict(int)  # (endpoint, código) -> cuenta
+        self.latencia_peticiones = defaultdict(Histograma)  # por endpoint
+        self.trabajos = dict.fromkeys(RESULTADOS_TRABAJO, 0)
+        self.latencia_trabajos = {fase: Histograma() for fase in FASES_TRABAJO}
+        self.presupuesto = Histograma()
+        self.presupuestos_reducidos = 0
+
+    def registrar_busqueda(self, estadisticas):
+        """Suma una EstadisticasBusqueda terminada"""
+        algoritmo = estadisticas.algoritmo or 'desconocido'
+        with self._lock:
+            contadores = self.busqueda[algoritmo]
+            contadores['busquedas'] += 1
+            contadores['nodos_explorados'] += estadisticas.nodos_explorados
+            contadores['nodos_podados'] += estadisticas.nodos_podados
+            contadores['evaluaciones'] += estadisticas.evaluaciones
+            contadores['clonaciones'] += estadisticas.clonaciones
+            contadores['timeouts'] += estadisticas.timeout
+            self.latencia_busqueda[algoritmo].observar(estadisticas.segundos)
+
+    def registrar_trabajo(self, estado, degradado, segundos_en_cola, segundos_ejecucion):
+        """Un trabajo de la cola terminado ('terminado') o fallido ('fallido')"""
+        with self._lock:
+            self.trabajos[estado] += 1
+            self.trabajos['degradado'] += degradado
+            self.latencia_trabajos['en_cola'].observar(segundos_en_cola)
+            self.latencia_trabajos['ejecucion'].observar(segundos_ejecucion)
+
+    def registrar_rechazo(self):
+        """Un trabajo que no se admitió por cola llena"""
+        with self._lock:
+            self.trabajos['rechazado'] += 1
+
+    def registrar_presupuesto(self, asignado):
+        """Presupuesto dado a una búsqueda (PoliticaPresupuesto.asignar)"""
+        with self._lock:
+            self.presupuesto.observar(asignado['tiempo_maximo'])
+            self.presupuestos_reducidos += asignado['reducido']
+
+    def registrar_peticion(self, endpoint, codigo, segundos):
+        with self._lock:
+            self.peticiones[(endpoint, codigo)] += 1
+            self.latencia_peticiones[endpoint].observar(segundos)
+
+    def a_dict(self, medidores=None):
+        """
+        Todas las métricas como un dict serializable.
+
+        Args:
+            medidores: dict nombre -> valor instantáneo (p. ej. sesiones en curso)
+        """
+        with self._lock:
+            peticiones = defaultdict(dict)
+            for (endpoint, codigo), cuenta in self.peticiones.items():
+                peticiones[endpoint][str(codigo)] = cuenta
+            return {
+                'busqueda': {algoritmo: dict(contadores) for algoritmo, contadores in self.busqueda.items()},
+                'latencia_busqueda': {algoritmo: histograma.a_dict()
+                                      for algoritmo, histograma in self.latencia_busqueda.items()},
+                'peticiones': dict(peticiones),
+                'latencia_peticiones': {endpoint: histograma.a_dict()
+                                        for endpoint, histograma in self.latencia_peticiones.items()},
+                'trabajos': dict(self.trabajos),
+                'latencia_trabajos': {fase: histograma.a_dict()
+                                      for fase, histograma in self.latencia_trabajos.items()},
+                'presupuesto': self.presupuesto.a_dict(),
+                'presupuestos_reducidos': self.presupuestos_reducidos,
+                **(medidores or {})
+            }
+
+    def a_prometheus(self, medidores=None):
+        """Las mismas métricas en el formato de texto de Prometheus (prefijo pacman_)"""
+        lineas = []
+        with self._lock:
+            for nombre in CONTADORES_BUSQUEDA:
+                lineas.append(f'# TYPE pacman_{nombre}_total counter')
+                for algoritmo, contadores in sorted(self.busqueda.items()):
+                    lineas.append(f'pacman_{nombre}_total{{algoritmo="{algoritmo}"}} {contadores[nombre]}')
+            _histogramas_prometheus(lineas, 'pacman_busqueda_segundos', 'algoritmo',
+                                    self.latencia_busqueda)
+
+            lineas.append('# TYPE pacman_peticiones_total counter')
+            for (endpoint, codigo), cuenta in sorted(self.peticiones.items()):
+                lineas.append(f'pacman_peticiones_total{{endpoint="{endpoint}",codigo="{codigo}"}} {cuenta}')
+            _histogramas_prometheus(lineas, 'pacman_peticion_segundos', 'endpoint',
+                                    self.latencia_peticiones)
+
+            lineas.append('# TYPE pacman_trabajos_total counter')
+            for resultado in RESULTADOS_TRABAJO:
+                lineas.append(f'pacman_trabajos_total{{resultado="{resultado}"}} {self.trabajos[resultado]}')
+            _histogramas_prometheus(lineas, 'pacman_trabajo_segundos', 'fase', self.latencia_trabajos)
+
+            lineas.append('# TYPE pacman_presupuestos_reducidos_total counter')
+            lineas.append(f'pacman_presupuestos_reducidos_total {self.presupuestos_reducidos}')
+            lineas.append('# TYPE pacman_presupuesto_segundos histogram')
+            for limite, cuenta in self.presupuesto.acumuladas():
+                lineas.append(f'pacman_presupuesto_segundos_bucket{{le="{_formato_limite(limite)}"}} {cuenta}')
+            lineas.append(f'pacman_presupuesto_segundos_sum {self.presupuesto.suma}')
+            lineas.append(f'pacman_presupuesto_segundos_count {self.presupuesto.cuenta}')
+
+        for nombre, valor in sorted((medidores or {}).items()):
+            lineas.append(f'# TYPE pacman_{nombre} gauge')
+            lineas.append(f'pacman_{nombre} {valor}')
+        return '\n'.join(lineas) + '\n'
+
+
+def _histogramas_prometheus(lineas, nombre, etiqueta, histogramas):
+    lineas.append(f'# TYPE {nombre} histogram')
+    for valor_etiqueta, histograma in sorted(histogramas.items()):
+        for limite, cuenta in histograma.acumuladas():
+            lineas.append(f'{nombre}_bucket{{{etiqueta}="{valor_etiqueta}",le="{_formato_limite(limite)}"}} {cuenta}')
+        lineas.append(f'{nombre}_sum{{{etiqueta}="{valor_etiqueta}"}} {histograma.suma}')
+        lineas.append(f'{nombre}_count{{{etiqueta}="{valor_etiqueta}"}} {histograma.cuenta}')
+
+
+def _formato_limite(limite):
+    return '+Inf' if limite == float('inf') else repr(limite)
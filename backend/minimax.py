@@ -1,11 +1,16 @@
-import time
+from .contexto import ContextoBusqueda
+from .estadisticas import EstadisticasBusqueda, imprimir
+from .estado_busqueda import EstadoBusqueda, fantasma_relevante, sucesor_pacman, sucesor_fantasma, volver
+from .reanudable import NODOS_POR_PASO, completar, sin_pausas
 
-# Variables globales para control
-tiempo_inicio = 0
+# El estado de cada búsqueda (reloj, contadores, opciones) va en su ContextoBusqueda
 TIEMPO_MAXIMO = 2.5  # Más tiempo para explorar
-nodos_explorados = 0  # Contador de nodos
+PROFUNDIDAD_LIMITE = 64  # Tope de la profundización iterativa
 
-def decision_minimax(estado, profundidad_maxima):
+def decision_minimax(estado, profundidad_maxima, modo_en_sitio=False,
+                     iterativo=False, tiempo_maximo=None, nodos_maximos=None, paralelo=False,
+                     estadisticas_busqueda=None, macro_movimientos=False, relevancia_fantasmas=False,
+                     contexto=None):
     """
     ALGORITMO MINIMAX CLÁSICO
     
@@ -17,56 +22,230 @@ def decision_minimax(estado, profundidad_maxima):
     Args:
         estado: Estado actual del juego
         profundidad_maxima: Profundidad máxima del árbol a explorar
+            (con iterativo, tope de la profundización; None = PROFUNDIDAD_LIMITE)
+        modo_en_sitio: Recorrer el árbol mutando un único estado (aplicar/deshacer)
+        iterativo: Profundización iterativa: busca a profundidad 1, 2, 3...
+            hasta agotar el presupuesto y usa la última iteración completa
+        tiempo_maximo: Segundos por movimiento (None = TIEMPO_MAXIMO)
+        nodos_maximos: Nodos por movimiento (None = sin límite)
+        paralelo: Repartir los hijos de la raíz entre el pool de procesos de
+            paralelo.py (mismo resultado que la búsqueda secuencial)
+        estadisticas_busqueda: EstadisticasBusqueda a llenar (None = una nueva
+            que se descarta: quien quiera leerlas tiene que pasarla)
+        macro_movimientos: Cada movimiento de Pacman sigue el pasillo hasta el siguiente
+            cruce (Laberinto.pasillo): más celdas de horizonte por nodo
+        relevancia_fantasmas: Solo ramificar los fantasmas que pueden alcanzar a
+            Pacman en la profundidad restante (fantasma_relevante); los demás dan
+            su paso previsto en un único hijo
+        contexto: ContextoBusqueda de esta búsqueda (None = uno nuevo); quien
+            lo pasa puede cancelarla desde otro hilo con contexto.cancelar()
     
     Returns:
         str: Mejor movimiento ('arriba', 'abajo', 'izquierda', 'derecha')
     """
-    global tiempo_inicio, nodos_explorados
-    tiempo_inicio = time.time()
-    nodos_explorados = 0
+    return completar(busqueda_minimax(
+        estado, profundidad_maxima, modo_en_sitio, iterativo, tiempo_maximo, nodos_maximos, paralelo,
+        estadisticas_busqueda, macro_movimientos, relevancia_fantasmas, contexto, nodos_por_paso=None))
+
+
+def busqueda_minimax(estado, profundidad_maxima, modo_en_sitio=False,
+                     iterativo=False, tiempo_maximo=None, nodos_maximos=None, paralelo=False,
+                     estadisticas_busqueda=None, macro_movimientos=False, relevancia_fantasmas=False,
+                     contexto=None, nodos_por_paso=NODOS_POR_PASO):
+    """
+    decision_minimax como búsqueda reanudable (ver reanudable.py): un
+    generador que cede el control cada nodos_por_paso nodos y devuelve el
+    mismo movimiento al terminar. Con nodos_por_paso=None no hace pausas.
     
-    mejor_valor = float('-inf')
-    mejor_movimiento = None
+    Raises:
+        ValueError: Con paralelo y pausas (el pool no se puede pausar)
+    """
+    if paralelo and nodos_por_paso is not None:
+        raise ValueError("La búsqueda paralela no admite pausas")
+    if profundidad_maxima is None:
+        profundidad_maxima = PROFUNDIDAD_LIMITE
+    if estadisticas_busqueda is None:
+        estadisticas_busqueda = EstadisticasBusqueda('minimax')
+    if contexto is None:
+        contexto = ContextoBusqueda()
+    contexto.iniciar(TIEMPO_MAXIMO if tiempo_maximo is None else tiempo_maximo, nodos_maximos,
+                     estadisticas_busqueda)
+    contexto.en_sitio = modo_en_sitio
+    contexto.macro = macro_movimientos
+    contexto.relevancia = relevancia_fantasmas
     
+    # La búsqueda trabaja sobre un estado compacto (sin deepcopy por nodo)
+    estado = EstadoBusqueda.desde_estado(estado)
     movimientos_validos = estado.obtener_movimientos_validos_pacman()
     
     if not movimientos_validos:
-        print(f"[MINIMAX] Sin movimientos válidos")
+        imprimir(f"[MINIMAX] Sin movimientos válidos")
         return None
     
-    # MINIMAX: NO reduce profundidad - explora completamente
-    print(f"[MINIMAX] Explorando con profundidad: {profundidad_maxima}")
+    if nodos_por_paso is not None:
+        contexto.activar_pausas(nodos_por_paso)
+    buscar_raiz = sin_pausas(_buscar_raiz_paralela) if paralelo else _buscar_raiz
+    
+    if not iterativo:
+        # MINIMAX: NO reduce profundidad - explora completamente
+        imprimir(f"[MINIMAX] Explorando con profundidad: {profundidad_maxima}")
+        mejor_movimiento, mejor_valor = yield from buscar_raiz(contexto, estado, movimientos_validos,
+                                                               profundidad_maxima)
+        contexto.profundidad_alcanzada = profundidad_maxima
+    else:
+        mejor_movimiento, mejor_valor = None, float('-inf')
+        for profundidad in range(1, profundidad_maxima + 1):
+            movimiento, valor = yield from buscar_raiz(contexto, estado, movimientos_validos, profundidad)
+            if contexto.presupuesto_agotado:
+                # Iteración a medias: solo sirve si no hay ninguna completa
+                imprimir(f"[MINIMAX] Iteración {profundidad} incompleta, se descarta")
+                if mejor_movimiento is None:
+                    mejor_movimiento, mejor_valor = movimiento, valor
+                break
+            mejor_movimiento, mejor_valor = movimiento, valor
+            contexto.profundidad_alcanzada = profundidad
+            
+            # La siguiente iteración cuesta varias veces esta: no empezarla sin tiempo
+            if contexto.transcurrido() > contexto.limite_tiempo / 2:
+                break
+        imprimir(f"[MINIMAX] Profundidad alcanzada: {contexto.profundidad_alcanzada}")
+    
+    tiempo_total = contexto.transcurrido()
+    mejor_movimiento = mejor_movimiento if mejor_movimiento else movimientos_validos[0]
+    
+    estadisticas_busqueda.nodos_explorados = contexto.nodos_explorados
+    estadisticas_busqueda.celdas_pacman = contexto.celdas_pacman
+    estadisticas_busqueda.ramas_omitidas = contexto.ramas_omitidas
+    if not paralelo:
+        estadisticas_busqueda.clonaciones = 0 if contexto.en_sitio else contexto.nodos_explorados
+    estadisticas_busqueda.timeout = contexto.presupuesto_agotado
+    estadisticas_busqueda.cancelada = contexto.cancelado
+    estadisticas_busqueda.profundidad_alcanzada = contexto.profundidad_alcanzada
+    estadisticas_busqueda.movimiento = mejor_movimiento
+    estadisticas_busqueda.valor = mejor_valor
+    estadisticas_busqueda.segundos = tiempo_total
+    
+    imprimir(f"[MINIMAX] Nodos explorados: {contexto.nodos_explorados} en {tiempo_total:.3f}s")
+    if contexto.relevancia:
+        imprimir(f"[MINIMAX] Ramas de fantasmas fuera de alcance omitidas: {contexto.ramas_omitidas}")
+    imprimir(f"[MINIMAX] Mejor movimiento: {mejor_movimiento} (valor: {mejor_valor:.2f})")
+    
+    return mejor_movimiento
+
+
+def _buscar_raiz(contexto, estado, movimientos_validos, profundidad_maxima):
+    """
+    Una búsqueda completa desde la raíz a profundidad fija (generador, como
+    valor_max_minimax).
+    
+    Returns:
+        tuple: (mejor_movimiento, mejor_valor)
+    """
+    contexto.profundidad_raiz = profundidad_maxima
+    estadisticas = contexto.estadisticas
+    estadisticas.iniciar_iteracion(profundidad_maxima, contexto.nodos_explorados)
+    en_sitio = contexto.en_sitio
+    
+    mejor_valor = float('-inf')
+    mejor_movimiento = None
     
     for movimiento in movimientos_validos:
         # Simular el movimiento de Pacman
-        estado_siguiente = estado.clonar()
-        estado_siguiente.mover_pacman(movimiento)
-        nodos_explorados += 1
+        turnos = estado.turnos_totales
+        estado_siguiente = sucesor_pacman(estado, movimiento, en_sitio, contexto.macro)
+        contexto.celdas_pacman += estado_siguiente.turnos_totales - turnos
+        contexto.nodos_explorados += 1
+        estadisticas.nodos_por_ply[0] += 1
         
         # Si el juego terminó inmediatamente, evaluar
         if estado_siguiente.juego_terminado:
-            valor = estado_siguiente.evaluar()
+            valor = _evaluar(contexto, estado_siguiente)
         else:
             # Llamar a MIN (turno de fantasmas)
-            valor = valor_min_minimax(estado_siguiente, profundidad_maxima - 1, 0)
+            valor = yield from valor_min_minimax(contexto, estado_siguiente, profundidad_maxima - 1, 0)
+        volver(estado, en_sitio)
         
         if valor > mejor_valor:
             mejor_valor = valor
             mejor_movimiento = movimiento
         
         # Timeout de seguridad
-        if time.time() - tiempo_inicio > TIEMPO_MAXIMO:
-            print(f"[MINIMAX] Timeout alcanzado")
+        if contexto.sin_presupuesto():
+            imprimir(f"[MINIMAX] Timeout alcanzado")
             break
     
-    tiempo_total = time.time() - tiempo_inicio
-    print(f"[MINIMAX] Nodos explorados: {nodos_explorados} en {tiempo_total:.3f}s")
-    print(f"[MINIMAX] Mejor movimiento: {mejor_movimiento} (valor: {mejor_valor:.2f})")
+    estadisticas.terminar_iteracion(contexto.nodos_explorados, not contexto.presupuesto_agotado)
+    return mejor_movimiento, mejor_valor
+
+
+def _buscar_raiz_paralela(contexto, estado, movimientos_validos, profundidad_maxima):
+    """Como _buscar_raiz, pero cada hijo de la raíz se evalúa en el pool de procesos"""
+    from .paralelo import buscar_raiz_paralela
+    estadisticas = contexto.estadisticas
+    estadisticas.iniciar_iteracion(profundidad_maxima, contexto.nodos_explorados)
     
-    return mejor_movimiento if mejor_movimiento else movimientos_validos[0]
+    limite_nodos = contexto.limite_nodos
+    nodos_restantes = None if limite_nodos is None else max(limite_nodos - contexto.nodos_explorados, 0)
+    mejor_movimiento, mejor_valor, estadisticas_hijos = buscar_raiz_paralela(
+        'minimax', estado, movimientos_validos, profundidad_maxima,
+        contexto.inicio, contexto.limite_tiempo, nodos_restantes,
+        {'modo_en_sitio': contexto.en_sitio, 'macro_movimientos': contexto.macro,
+         'relevancia_fantasmas': contexto.relevancia})
+    contexto.nodos_explorados += estadisticas_hijos.nodos_explorados
+    contexto.celdas_pacman += estadisticas_hijos.celdas_pacman
+    contexto.ramas_omitidas += estadisticas_hijos.ramas_omitidas
+    estadisticas.fusionar(estadisticas_hijos)
+    if estadisticas_hijos.timeout:
+        contexto.presupuesto_agotado = True
+        imprimir(f"[MINIMAX] Timeout alcanzado")
+    estadisticas.terminar_iteracion(contexto.nodos_explorados, not contexto.presupuesto_agotado)
+    return mejor_movimiento, mejor_valor
 
 
-def valor_max_minimax(estado, profundidad, indice_fantasma):
+def valor_movimiento_raiz(estado, movimiento, profundidad_maxima, inicio, tiempo_maximo,
+                          nodos_maximos=None, modo_en_sitio=False, macro_movimientos=False,
+                          relevancia_fantasmas=False):
+    """
+    Valor de un solo hijo de la raíz (unidad de trabajo de la búsqueda paralela).
+    
+    Returns:
+        tuple: (valor, EstadisticasBusqueda del hijo)
+    """
+    estadisticas = EstadisticasBusqueda('minimax')
+    estadisticas.asegurar_plies(profundidad_maxima)
+    contexto = ContextoBusqueda()
+    contexto.iniciar(tiempo_maximo, nodos_maximos, estadisticas, inicio)
+    contexto.en_sitio = modo_en_sitio
+    contexto.macro = macro_movimientos
+    contexto.relevancia = relevancia_fantasmas
+    contexto.profundidad_raiz = profundidad_maxima
+    
+    turnos = estado.turnos_totales
+    estado_siguiente = sucesor_pacman(estado, movimiento, modo_en_sitio, macro_movimientos)
+    contexto.celdas_pacman += estado_siguiente.turnos_totales - turnos
+    contexto.nodos_explorados += 1
+    estadisticas.nodos_por_ply[0] += 1
+    if estado_siguiente.juego_terminado:
+        valor = _evaluar(contexto, estado_siguiente)
+    else:
+        valor = completar(valor_min_minimax(contexto, estado_siguiente, profundidad_maxima - 1, 0))
+    volver(estado, modo_en_sitio)
+    
+    estadisticas.nodos_explorados = contexto.nodos_explorados
+    estadisticas.celdas_pacman = contexto.celdas_pacman
+    estadisticas.ramas_omitidas = contexto.ramas_omitidas
+    estadisticas.clonaciones = 0 if modo_en_sitio else contexto.nodos_explorados
+    estadisticas.timeout = contexto.presupuesto_agotado
+    return valor, estadisticas
+
+
+def _evaluar(contexto, estado):
+    """estado.evaluar() contando la evaluación en las estadísticas"""
+    contexto.estadisticas.evaluaciones += 1
+    return estado.evaluar()
+
+
+def valor_max_minimax(contexto, estado, profundidad, indice_fantasma):
     """
     Función MAX del algoritmo Minimax
     
@@ -74,71 +253,85 @@ def valor_max_minimax(estado, profundidad, indice_fantasma):
     Explora TODOS los movimientos posibles sin podar.
     
     Args:
+        contexto: ContextoBusqueda de la búsqueda
         estado: Estado actual del juego
         profundidad: Profundidad restante
         indice_fantasma: Índice del fantasma actual (no usado en MAX)
     
     Returns:
-        float: Valor de utilidad del estado
+        float: Valor de utilidad del estado (con return: es un generador que
+        cede el control cada contexto.nodos_por_paso nodos; ver reanudable.py)
     """
-    global nodos_explorados
+    if contexto.toca_pausa():
+        yield
     
     # Condición de término
-    if time.time() - tiempo_inicio > TIEMPO_MAXIMO:
-        return estado.evaluar()
+    if contexto.sin_presupuesto():
+        return _evaluar(contexto, estado)
     
     if estado.juego_terminado or profundidad == 0:
-        return estado.evaluar()
+        return _evaluar(contexto, estado)
     
     valor = float('-inf')
     movimientos_validos = estado.obtener_movimientos_validos_pacman()
     
     if not movimientos_validos:
-        return estado.evaluar()
+        return _evaluar(contexto, estado)
     
     # EXPLORAR TODOS LOS MOVIMIENTOS (sin podar)
+    indice_ply = contexto.profundidad_raiz - profundidad
+    nodos_ply = contexto.estadisticas.nodos_por_ply
+    en_sitio = contexto.en_sitio
     for movimiento in movimientos_validos:
-        estado_siguiente = estado.clonar()
-        estado_siguiente.mover_pacman(movimiento)
-        nodos_explorados += 1
+        turnos = estado.turnos_totales
+        estado_siguiente = sucesor_pacman(estado, movimiento, en_sitio, contexto.macro)
+        contexto.celdas_pacman += estado_siguiente.turnos_totales - turnos
+        contexto.nodos_explorados += 1
+        nodos_ply[indice_ply] += 1
         
         if estado_siguiente.juego_terminado:
-            valor = max(valor, estado_siguiente.evaluar())
+            valor = max(valor, _evaluar(contexto, estado_siguiente))
         else:
             # Después de MAX viene MIN (fantasmas)
-            valor = max(valor, valor_min_minimax(estado_siguiente, profundidad - 1, 0))
+            valor_hijo = yield from valor_min_minimax(contexto, estado_siguiente, profundidad - 1, 0)
+            valor = max(valor, valor_hijo)
+        volver(estado, en_sitio)
     
     return valor
 
 
-def valor_min_minimax(estado, profundidad, indice_fantasma):
+def valor_min_minimax(contexto, estado, profundidad, indice_fantasma):
     """
     Función MIN del algoritmo Minimax
     
     Los fantasmas (jugadores MIN) buscan MINIMIZAR la utilidad de Pacman.
     Se procesan secuencialmente (multi-agente).
-    Explora TODOS los movimientos sin podar.
+    Explora TODOS los movimientos sin podar (con relevancia, salvo los de
+    fantasmas fuera de alcance).
     
     Args:
+        contexto: ContextoBusqueda de la búsqueda
         estado: Estado actual del juego
         profundidad: Profundidad restante
         indice_fantasma: Índice del fantasma actual (0, 1, 2...)
     
     Returns:
-        float: Valor de utilidad del estado
+        float: Valor de utilidad del estado (con return: es un generador que
+        cede el control cada contexto.nodos_por_paso nodos; ver reanudable.py)
     """
-    global nodos_explorados
+    if contexto.toca_pausa():
+        yield
     
     # Condición de término
-    if time.time() - tiempo_inicio > TIEMPO_MAXIMO:
-        return estado.evaluar()
+    if contexto.sin_presupuesto():
+        return _evaluar(contexto, estado)
     
     if estado.juego_terminado or profundidad == 0:
-        return estado.evaluar()
+        return _evaluar(contexto, estado)
     
     # Si ya procesamos todos los fantasmas, vuelve a MAX
     if indice_fantasma >= len(estado.pos_fantasmas):
-        return valor_max_minimax(estado, profundidad, 0)
+        return (yield from valor_max_minimax(contexto, estado, profundidad, 0))
     
     valor = float('inf')
     pos_fantasma = estado.pos_fantasmas[indice_fantasma]
@@ -146,32 +339,27 @@ def valor_min_minimax(estado, profundidad, indice_fantasma):
     
     if not movimientos_validos:
         # Si este fantasma no puede moverse, pasar al siguiente
-        return valor_min_minimax(estado, profundidad, indice_fantasma + 1)
+        return (yield from valor_min_minimax(contexto, estado, profundidad, indice_fantasma + 1))
+    
+    # Fantasma lejos de Pacman: no llega a tocarlo en lo que queda de búsqueda,
+    # así que da su paso previsto en vez de ramificar
+    if contexto.relevancia and not fantasma_relevante(estado, pos_fantasma, profundidad, contexto.macro):
+        contexto.ramas_omitidas += len(movimientos_validos) - 1
+        movimientos_validos = [estado.paso_previsto_fantasma(pos_fantasma)]
     
     # EXPLORAR TODOS LOS MOVIMIENTOS DEL FANTASMA (sin podar)
+    indice_ply = contexto.profundidad_raiz - profundidad - 1  # Los fantasmas cierran el turno de Pacman
+    nodos_ply = contexto.estadisticas.nodos_por_ply
+    en_sitio = contexto.en_sitio
     for nueva_pos in movimientos_validos:
-        estado_siguiente = estado.clonar()
-        estado_siguiente.pos_fantasmas[indice_fantasma] = nueva_pos
-        nodos_explorados += 1
-        
-        # Verificar colisión después de mover el fantasma
-        if estado_siguiente.pos_pacman in estado_siguiente.pos_fantasmas:
-            if estado_siguiente.pacman_poderoso:
-                # Pacman come al fantasma
-                estado_siguiente.pos_fantasmas.remove(estado_siguiente.pos_pacman)
-                estado_siguiente.puntuacion += 200
-                
-                if len(estado_siguiente.pos_fantasmas) == 0:
-                    estado_siguiente.juego_terminado = True
-                    estado_siguiente.mensaje = "¡Pacman ganó! ¡Comió todos los fantasmas!"
-                    estado_siguiente.puntuacion += 500
-            else:
-                # Pacman es capturado
-                estado_siguiente.juego_terminado = True
-                estado_siguiente.mensaje = "¡Pacman fue capturado!"
-                estado_siguiente.puntuacion -= 100
+        # Mover el fantasma (resuelve la colisión con Pacman)
+        estado_siguiente = sucesor_fantasma(estado, indice_fantasma, nueva_pos, en_sitio)
+        contexto.nodos_explorados += 1
+        nodos_ply[indice_ply] += 1
         
         # Procesar el siguiente fantasma
-        valor = min(valor, valor_min_minimax(estado_siguiente, profundidad, indice_fantasma + 1))
+        valor_hijo = yield from valor_min_minimax(contexto, estado_siguiente, profundidad, indice_fantasma + 1)
+        valor = min(valor, valor_hijo)
+        volver(estado, en_sitio)
     
-    return valor
\ No newline at end of file
+    return valor
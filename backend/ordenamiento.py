@@ -0,0 +1,118 @@
+"""
+Ordenamiento de movimientos para la poda alfa-beta.
+
+La poda corta más cuanto antes aparece el mejor movimiento de cada nodo.
+El orden se decide, de mayor a menor prioridad, por:
+
+1. El movimiento guardado en la tabla de transposición para ese nodo.
+2. La variante principal de la iteración anterior (profundización iterativa).
+3. Los movimientos asesinos (killer moves) del mismo ply: los que cortaron
+   en nodos hermanos.
+4. Para los fantasmas, el paso hacia Pacman (o el contrario si está asustado).
+5. La tabla de historia: movimientos que han cortado en cualquier parte del
+   árbol, pesados por la profundidad restante.
+
+Un ply se identifica por (turnos de Pacman desde la raíz, índice del
+fantasma), con -1 para el turno de Pacman.
+"""
+
+NUM_ASESINOS = 2
+
+_PRIORIDAD_TABLA = 4
+_PRIORIDAD_PV = 3
+_PRIORIDAD_ASESINO = 2
+_PRIORIDAD_ESTATICA = 1
+
+
+class OrdenadorMovimientos:
+    """Heurísticas de orden con memoria entre iteraciones y turnos de una partida"""
+
+    def __init__(self, usar_pv=True, usar_asesinos=True, usar_historia=True, usar_estatico=True):
+        self.usar_pv = usar_pv
+        self.usar_asesinos = usar_asesinos
+        self.usar_historia = usar_historia
+        self.usar_estatico = usar_estatico
+
+        self.asesinos = {}  # ply -> [movimiento, ...] (el más reciente primero)
+        self.historia = {}  # (origen, movimiento) -> peso
+        self.pv = {}  # ply -> movimiento de la variante principal anterior
+        self.ultima_linea = ()  # Variante principal del último nodo que retornó
+        self.reiniciar_contadores()
+
+    def reiniciar_contadores(self):
+        self.cortes = 0
+        self.cortes_primer_movimiento = 0
+
+    def nueva_busqueda(self):
+        """Inicio de una decisión: olvida asesinos y variante, envejece la historia"""
+        self.asesinos = {}
+        self.pv = {}
+        self.ultima_linea = ()
+        self.historia = {clave: peso // 2 for clave, peso in self.historia.items() if peso > 1}
+        self.reiniciar_contadores()
+
+    def nueva_iteracion(self, linea):
+        """La variante principal de la iteración que terminó guía la siguiente"""
+        self.pv = dict(linea)
+        self.ultima_linea = ()
+
+    def ordenar_pacman(self, estado, movimientos, ply, movimiento_tabla=None):
+        """Movimientos de Pacman (direcciones) del más al menos prometedor"""
+        return self._ordenar(estado.pos_pacman, movimientos, ply, movimiento_tabla)
+
+    def ordenar_fantasma(self, estado, indice_fantasma, movimientos, ply, movimiento_tabla=None):
+        """Movimientos de un fantasma (posiciones destino) del más al menos prometedor"""
+        pos_fantasma = estado.pos_fantasmas[indice_fantasma]
+        if not self.usar_estatico:
+            return self._ordenar(pos_fantasma, movimientos, ply, movimiento_tabla)
+        hacia_pacman = estado.laberinto.paso_hacia(pos_fantasma, estado.pos_pacman)
+        if estado.pacman_poderoso:
+            # Asustado: acercarse es lo peor para MIN, va al final
+            return self._ordenar(pos_fantasma, movimientos, ply, movimiento_tabla, evitar=hacia_pacman)
+        return self._ordenar(pos_fantasma, movimientos, ply, movimiento_tabla, preferido=hacia_pacman)
+
+    def _ordenar(self, origen, movimientos, ply, movimiento_tabla, preferido=None, evitar=None):
+        pv = self.pv.get(ply) if self.usar_pv else None
+        asesinos = self.asesinos.get(ply, ()) if self.usar_asesinos else ()
+        historia = self.historia if self.usar_historia else {}
+
+        def prioridad(movimiento):
+            if movimiento == movimiento_tabla:
+                base = _PRIORIDAD_TABLA
+            elif movimiento == pv:
+                base = _PRIORIDAD_PV
+            elif movimiento in asesinos:
+                base = _PRIORIDAD_ASESINO
+            elif movimiento == preferido:
+                base = _PRIORIDAD_ESTATICA
+            elif movimiento == evitar:
+                base = -1
+            else:
+                base = 0
+            return (-base, -historia.get((origen, movimiento), 0))
+
+        # sorted es estable: sin información se conserva el orden original
+        return sorted(movimientos, key=prioridad)
+
+    def registrar_corte(self, ply, origen, movimiento, profundidad, fue_primero):
+        """Un movimiento produjo un corte: pasa a asesino de su ply y gana historia"""
+        self.cortes += 1
+        if fue_primero:
+            self.cortes_primer_movimiento += 1
+
+        if self.usar_asesinos:
+            asesinos = self.asesinos.setdefault(ply, [])
+            if movimiento in asesinos:
+                asesinos.remove(movimiento)
+            asesinos.insert(0, movimiento)
+            del asesinos[NUM_ASESINOS:]
+
+        if self.usar_historia:
+            clave = (origen, movimiento)
+            self.historia[clave] = self.historia.get(clave, 0) + profundidad * profundidad
+
+    def porcentaje_primer_movimiento(self):
+        """Porcentaje de cortes producidos por el primer movimiento probado"""
+        if not self.cortes:
+            return 0.0
+        return 100.0 * self.cortes_primer_movimiento / self.cortes
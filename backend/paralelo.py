@@ -0,0 +1,245 @@
+"""
+Búsqueda paralela en la raíz con un pool de procesos persistente.
+
+Los hijos de la raíz (un movimiento de Pacman cada uno) se evalúan en
+procesos distintos, así que no compiten por el GIL. El pool se crea una vez
+por proceso servidor (iniciar_pool) y se reutiliza en todos los movimientos.
+
+Para alfa-beta y expectimax se usa "young brothers wait" en la raíz: el primer hijo se
+evalúa solo y su valor sirve de cota para los demás, que salen en paralelo.
+Los valores exactos se publican en un array compartido y cada tarea toma
+como alfa el mejor valor ya publicado de los hijos anteriores a ella. En
+alfa-beta la tarea lo vuelve a leer cada INTERVALO_RELOJ nodos (con la
+comprobación del reloj de ContextoBusqueda), así que un hermano anterior
+que termina mientras ella busca le sube el alfa a media búsqueda.
+Expectimax lo lee una sola vez, al empezar: sus hermanos en curso no le
+estrechan la ventana. Con eso cada hijo se busca con una cota no mayor que
+la que tendría en la búsqueda secuencial, y el mejor movimiento (y su
+valor) es el mismo que daría la búsqueda secuencial a igual profundidad,
+empates incluidos. Con
+ordenamiento de movimientos el valor también coincide, pero el orden de la
+raíz (y con él qué movimiento gana un empate) depende de lo aprendido por
+cada proceso.
+
+El reloj es el de la búsqueda completa: todos los procesos cortan en el
+mismo instante. El presupuesto de nodos se reparte a partes iguales entre
+los hijos de la raíz.
+
+Varias búsquedas paralelas a la vez (hilos del servidor) comparten el pool
+y el array de valores, que es de la última que empezó: las anteriores ven
+otro id_busqueda y sus hijos se buscan con alfa -inf. El resultado sigue
+siendo el mismo, solo se poda menos.
+"""
+import atexit
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from . import expectimax, minimax, poda_alfa_beta
+from .estadisticas import EstadisticasBusqueda
+from .laberinto import LABERINTOS_EN_CACHE, CacheAcotada
+from .ordenamiento import OrdenadorMovimientos
+from .transposicion import TablaTransposicion
+
+MAX_MOVIMIENTOS_RAIZ = 8
+
+# En el proceso servidor
+_pool = None
+_valores = None  # Valores exactos publicados de los hijos de la raíz (NaN: sin valor)
+_id_busqueda = None  # Búsqueda a la que pertenecen los valores del array
+
+# En cada proceso trabajador
+_ultima_busqueda = None
+# Una tabla de transposición y un ordenador por configuración de evaluación; con
+# laberintos generados hay una por mapa, así que se descartan las más antiguas
+_tablas = CacheAcotada(LABERINTOS_EN_CACHE)
+_ordenadores = CacheAcotada(LABERINTOS_EN_CACHE)
+
+
+def iniciar_pool(num_procesos=None):
+    """
+    Crea (una sola vez) el pool de procesos y arranca todos sus trabajadores.
+
+    Args:
+        num_procesos: Procesos del pool (None = os.cpu_count())
+
+    Returns:
+        ProcessPoolExecutor: El pool compartido
+    """
+    global _pool, _valores, _id_busqueda
+    if _pool is not None:
+        return _pool
+
+    num_procesos = num_procesos or os.cpu_count() or 1
+    contexto = multiprocessing.get_context('spawn')
+    _valores = contexto.Array('d', [math.nan] * MAX_MOVIMIENTOS_RAIZ)
+    _id_busqueda = contexto.Value('q', 0, lock=False)  # Protegido por el lock de _valores
+    _pool = ProcessPoolExecutor(num_procesos, mp_context=contexto,
+                                initializer=_inicializar_trabajador,
+                                initargs=(_valores, _id_busqueda))
+
+    # Arrancar los procesos ahora y no en el primer movimiento
+    for futuro in [_pool.submit(os.getpid) for _ in range(num_procesos)]:
+        futuro.result()
+    print(f"[PARALELO] Pool iniciado con {num_procesos} procesos")
+    return _pool
+
+
+def cerrar_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+        _pool = None
+
+
+atexit.register(cerrar_pool)
+
+
+def buscar_raiz_paralela(motor, estado, movimientos_validos, profundidad_maxima,
+                         inicio, tiempo_maximo, nodos_maximos=None, opciones=None):
+    """
+    Evalúa los hijos de la raíz en el pool y elige como la búsqueda secuencial.
+
+    Args:
+        motor: 'minimax', 'alfa-beta' o 'expectimax'
+        estado: EstadoBusqueda raíz
+        movimientos_validos: Movimientos de Pacman en el orden secuencial
+        profundidad_maxima: Profundidad de la búsqueda
+        inicio: time.time() del inicio de la decisión
+        tiempo_maximo: Segundos de la decisión completa
+        nodos_maximos: Nodos restantes (None = sin límite)
+        opciones: kwargs del motor (modo_en_sitio, macro_movimientos, relevancia_fantasmas,
+            usar_transposicion, ordenamiento, poda_star)
+
+    Returns:
+        tuple: (mejor_movimiento, mejor_valor, EstadisticasBusqueda con la suma de los hijos)
+    """
+    pool = iniciar_pool()
+    opciones = opciones or {}
+    num_movimientos = len(movimientos_validos)
+    if num_movimientos > MAX_MOVIMIENTOS_RAIZ:
+        raise ValueError(f"Más de {MAX_MOVIMIENTOS_RAIZ} movimientos en la raíz")
+    nodos_por_hijo = None if nodos_maximos is None else max(nodos_maximos // num_movimientos, 1)
+
+    with _valores.get_lock():
+        _id_busqueda.value += 1
+        id_busqueda = _id_busqueda.value
+        for i in range(MAX_MOVIMIENTOS_RAIZ):
+            _valores[i] = math.nan
+
+    def enviar(indice):
+        return pool.submit(_evaluar_hijo, motor, estado, indice, movimientos_validos[indice],
+                           profundidad_maxima, id_busqueda, inicio, tiempo_maximo,
+                           nodos_por_hijo, opciones)
+
+    resultados = [None] * num_movimientos
+    if motor != 'minimax':
+        # Young brothers wait: el hermano mayor fija la primera cota
+        resultados[0] = enviar(0).result()
+        futuros = [(i, enviar(i)) for i in range(1, num_movimientos)]
+    else:
+        futuros = [(i, enviar(i)) for i in range(num_movimientos)]
+    for i, futuro in futuros:
+        resultados[i] = futuro.result()
+
+    # Mismo criterio que el bucle secuencial: el primero con el mayor valor
+    mejor_valor = float('-inf')
+    mejor_movimiento = None
+    for movimiento, (valor, _) in zip(movimientos_validos, resultados):
+        if valor > mejor_valor:
+            mejor_valor = valor
+            mejor_movimiento = movimiento
+
+    estadisticas = EstadisticasBusqueda(motor)
+    for _, estadisticas_hijo in resultados:
+        estadisticas.fusionar(estadisticas_hijo)
+    return mejor_movimiento, mejor_valor, estadisticas
+
+
+# --- Lado del trabajador ---
+
+def _inicializar_trabajador(valores, id_busqueda):
+    global _valores, _id_busqueda
+    _valores = valores
+    _id_busqueda = id_busqueda
+
+
+def _evaluar_hijo(motor, estado, indice, movimiento, profundidad_maxima, id_busqueda,
+                  inicio, tiempo_maximo, nodos_maximos, opciones):
+    """Tarea del pool: valor de un hijo de la raíz"""
+    modo_en_sitio = opciones.get('modo_en_sitio', False)
+    macro_movimientos = opciones.get('macro_movimientos', False)
+    relevancia_fantasmas = opciones.get('relevancia_fantasmas', False)
+    if motor == 'minimax':
+        return minimax.valor_movimiento_raiz(
+            estado, movimiento, profundidad_maxima, inicio, tiempo_maximo, nodos_maximos, modo_en_sitio,
+            macro_movimientos, relevancia_fantasmas)
+
+    alfa = _alfa_publicado(id_busqueda, indice)
+    if motor == 'expectimax':
+        valor, estadisticas = expectimax.valor_movimiento_raiz(
+            estado, movimiento, profundidad_maxima, alfa, inicio, tiempo_maximo, nodos_maximos,
+            modo_en_sitio, opciones.get('poda_star', True), macro_movimientos)
+        _publicar(id_busqueda, indice, valor, alfa, estadisticas)
+        return valor, estadisticas
+
+    tabla, ordenador = _estructuras_trabajador(estado, id_busqueda, opciones)
+    valor, estadisticas = poda_alfa_beta.valor_movimiento_raiz(
+        estado, movimiento, profundidad_maxima, alfa, inicio, tiempo_maximo, nodos_maximos,
+        modo_en_sitio, tabla, ordenador, macro_movimientos, relevancia_fantasmas,
+        lambda: _alfa_publicado(id_busqueda, indice))
+    _publicar(id_busqueda, indice, valor, alfa, estadisticas)
+    return valor, estadisticas
+
+
+def _publicar(id_busqueda, indice, valor, alfa, estadisticas):
+    """
+    Solo un valor por encima de alfa es exacto y sirve de cota a los demás.
+    alfa-beta pudo subir su alfa con lo publicado por los hijos anteriores:
+    se compara también con eso (lo publicado solo sube).
+    """
+    if estadisticas.timeout:
+        return
+    with _valores.get_lock():
+        if _id_busqueda.value != id_busqueda:
+            return
+        cota = max([alfa] + [v for v in _valores[:indice] if not math.isnan(v)])
+        if valor > cota:
+            _valores[indice] = valor
+
+
+def _alfa_publicado(id_busqueda, indice):
+    """Mejor valor exacto ya publicado de los hijos anteriores a indice"""
+    with _valores.get_lock():
+        if _id_busqueda.value != id_busqueda:
+            return float('-inf')
+        previos = [v for v in _valores[:indice] if not math.isnan(v)]
+    return max(previos, default=float('-inf'))
+
+
+def _estructuras_trabajador(estado, id_busqueda, opciones):
+    """Tabla de transposición y ordenador propios del proceso (duran entre búsquedas)"""
+    global _ultima_busqueda
+    nueva = id_busqueda != _ultima_busqueda
+    _ultima_busqueda = id_busqueda
+
+    # La evaluación (y con macro-movimientos o relevancia, el árbol) depende de la
+    # configuración: tablas separadas para no mezclar valores
+    configuracion = (estado.laberinto.huella, estado.usar_distancia_laberinto, estado.huida_por_laberinto,
+                     opciones.get('macro_movimientos', False), opciones.get('relevancia_fantasmas', False))
+    tabla = None
+    if opciones.get('usar_transposicion'):
+        tabla = _tablas.get(configuracion)
+        if tabla is None:
+            tabla = _tablas.guardar(configuracion, TablaTransposicion())
+        if nueva:
+            tabla.nueva_busqueda()
+    ordenador = None
+    if opciones.get('ordenamiento'):
+        ordenador = _ordenadores.get(configuracion)
+        if ordenador is None:
+            ordenador = _ordenadores.guardar(configuracion, OrdenadorMovimientos())
+        if nueva:
+            ordenador.nueva_busqueda()
+    return tabla, ordenador
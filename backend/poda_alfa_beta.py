@@ -1,12 +1,18 @@
-import time
+from .contexto import ContextoBusqueda
+from .estadisticas import EstadisticasBusqueda, imprimir
+from .estado_busqueda import EstadoBusqueda, fantasma_relevante, sucesor_pacman, sucesor_fantasma, volver
+from .ordenamiento import OrdenadorMovimientos
+from .reanudable import NODOS_POR_PASO, completar, sin_pausas
+from .transposicion import TablaTransposicion, EXACTA, COTA_INFERIOR, COTA_SUPERIOR
 
-# Variables globales para control
-tiempo_inicio = 0
+# El estado de cada búsqueda (reloj, contadores, tabla, ordenador) va en su ContextoBusqueda
 TIEMPO_MAXIMO = 2.5
-nodos_explorados = 0
-nodos_podados = 0  # Contador de podas
+PROFUNDIDAD_LIMITE = 64  # Tope de la profundización iterativa
 
-def decision_alfa_beta(estado, profundidad_maxima):
+def decision_alfa_beta(estado, profundidad_maxima, modo_en_sitio=False, usar_transposicion=False,
+                       iterativo=False, tiempo_maximo=None, nodos_maximos=None, ordenamiento=False,
+                       paralelo=False, estadisticas_busqueda=None, macro_movimientos=False,
+                       relevancia_fantasmas=False, contexto=None):
     """
     ALGORITMO MINIMAX CON PODA ALFA-BETA
     
@@ -18,61 +24,313 @@ def decision_alfa_beta(estado, profundidad_maxima):
     Args:
         estado: Estado actual del juego
         profundidad_maxima: Profundidad máxima del árbol a explorar
+            (con iterativo, tope de la profundización; None = PROFUNDIDAD_LIMITE)
+        modo_en_sitio: Recorrer el árbol mutando un único estado (aplicar/deshacer)
+        usar_transposicion: Reutilizar resultados de posiciones repetidas; la
+            tabla se guarda en estado.tabla_transposicion y dura toda la partida
+        iterativo: Profundización iterativa: busca a profundidad 1, 2, 3...
+            hasta agotar el presupuesto y usa la última iteración completa
+        tiempo_maximo: Segundos por movimiento (None = TIEMPO_MAXIMO)
+        nodos_maximos: Nodos por movimiento (None = sin límite)
+        ordenamiento: Ordenar los movimientos para podar antes. True usa el
+            OrdenadorMovimientos de estado.ordenador_movimientos (dura toda la
+            partida); también se puede pasar un OrdenadorMovimientos propio
+        paralelo: Repartir los hijos de la raíz entre el pool de procesos de
+            paralelo.py (mismo resultado que la búsqueda secuencial)
+        estadisticas_busqueda: EstadisticasBusqueda a llenar (None = una nueva
+            que se descarta: quien quiera leerlas tiene que pasarla)
+        macro_movimientos: Cada movimiento de Pacman sigue el pasillo hasta el siguiente
+            cruce (Laberinto.pasillo): más celdas de horizonte por nodo
+        relevancia_fantasmas: Solo ramificar los fantasmas que pueden alcanzar a
+            Pacman en la profundidad restante (fantasma_relevante); los demás dan
+            su paso previsto en un único hijo
+        contexto: ContextoBusqueda de esta búsqueda (None = uno nuevo); quien
+            lo pasa puede cancelarla desde otro hilo con contexto.cancelar()
     
     Returns:
         str: Mejor movimiento ('arriba', 'abajo', 'izquierda', 'derecha')
     """
-    global tiempo_inicio, nodos_explorados, nodos_podados
-    tiempo_inicio = time.time()
-    nodos_explorados = 0
-    nodos_podados = 0
+    return completar(busqueda_alfa_beta(
+        estado, profundidad_maxima, modo_en_sitio, usar_transposicion, iterativo, tiempo_maximo,
+        nodos_maximos, ordenamiento, paralelo, estadisticas_busqueda, macro_movimientos,
+        relevancia_fantasmas, contexto, nodos_por_paso=None))
+
+
+def busqueda_alfa_beta(estado, profundidad_maxima, modo_en_sitio=False, usar_transposicion=False,
+                       iterativo=False, tiempo_maximo=None, nodos_maximos=None, ordenamiento=False,
+                       paralelo=False, estadisticas_busqueda=None, macro_movimientos=False,
+                       relevancia_fantasmas=False, contexto=None, nodos_por_paso=NODOS_POR_PASO):
+    """
+    decision_alfa_beta como búsqueda reanudable (ver reanudable.py): un
+    generador que cede el control cada nodos_por_paso nodos y devuelve el
+    mismo movimiento al terminar. Con nodos_por_paso=None no hace pausas.
     
-    mejor_valor = float('-inf')
-    mejor_movimiento = None
-    alfa = float('-inf')  # Mejor valor garantizado para MAX
-    beta = float('inf')   # Mejor valor garantizado para MIN
+    Raises:
+        ValueError: Con paralelo y pausas (el pool no se puede pausar)
+    """
+    if paralelo and nodos_por_paso is not None:
+        raise ValueError("La búsqueda paralela no admite pausas")
+    if profundidad_maxima is None:
+        profundidad_maxima = PROFUNDIDAD_LIMITE
+    if estadisticas_busqueda is None:
+        estadisticas_busqueda = EstadisticasBusqueda('alfa-beta')
+    if contexto is None:
+        contexto = ContextoBusqueda()
+    contexto.iniciar(TIEMPO_MAXIMO if tiempo_maximo is None else tiempo_maximo, nodos_maximos,
+                     estadisticas_busqueda)
+    contexto.en_sitio = modo_en_sitio
+    contexto.macro = macro_movimientos
+    contexto.relevancia = relevancia_fantasmas
     
+    tabla = None
+    if usar_transposicion:
+        if estado.tabla_transposicion is None:
+            estado.tabla_transposicion = TablaTransposicion()
+        tabla = estado.tabla_transposicion
+        tabla.nueva_busqueda()
+    
+    ordenador = None
+    if isinstance(ordenamiento, OrdenadorMovimientos):
+        ordenador = ordenamiento
+    elif ordenamiento:
+        if estado.ordenador_movimientos is None:
+            estado.ordenador_movimientos = OrdenadorMovimientos()
+        ordenador = estado.ordenador_movimientos
+    if ordenador is not None:
+        ordenador.nueva_busqueda()
+    contexto.tabla = tabla
+    contexto.ordenador = ordenador
+    contexto.movimientos_raiz = estado.movimientos
+    
+    # La búsqueda trabaja sobre un estado compacto (sin deepcopy por nodo)
+    estado = EstadoBusqueda.desde_estado(estado)
     movimientos_validos = estado.obtener_movimientos_validos_pacman()
     
     if not movimientos_validos:
-        print(f"[ALFA-BETA] Sin movimientos válidos")
+        imprimir(f"[ALFA-BETA] Sin movimientos válidos")
         return None
     
-    print(f"[ALFA-BETA] Explorando con profundidad: {profundidad_maxima}")
+    if nodos_por_paso is not None:
+        contexto.activar_pausas(nodos_por_paso)
+    buscar_raiz = sin_pausas(_buscar_raiz_paralela) if paralelo else _buscar_raiz
+    
+    if not iterativo:
+        imprimir(f"[ALFA-BETA] Explorando con profundidad: {profundidad_maxima}")
+        mejor_movimiento, mejor_valor = yield from buscar_raiz(contexto, estado, movimientos_validos,
+                                                               profundidad_maxima)
+        contexto.profundidad_alcanzada = profundidad_maxima
+    else:
+        mejor_movimiento, mejor_valor = None, float('-inf')
+        for profundidad in range(1, profundidad_maxima + 1):
+            movimiento, valor = yield from buscar_raiz(contexto, estado, movimientos_validos, profundidad)
+            if contexto.presupuesto_agotado:
+                # Iteración a medias: solo sirve si no hay ninguna completa
+                imprimir(f"[ALFA-BETA] Iteración {profundidad} incompleta, se descarta")
+                if mejor_movimiento is None:
+                    mejor_movimiento, mejor_valor = movimiento, valor
+                break
+            mejor_movimiento, mejor_valor = movimiento, valor
+            contexto.profundidad_alcanzada = profundidad
+            if ordenador is not None:
+                ordenador.nueva_iteracion(ordenador.ultima_linea)
+            
+            # La siguiente iteración cuesta varias veces esta: no empezarla sin tiempo
+            if contexto.transcurrido() > contexto.limite_tiempo / 2:
+                break
+        imprimir(f"[ALFA-BETA] Profundidad alcanzada: {contexto.profundidad_alcanzada}")
+    
+    tiempo_total = contexto.transcurrido()
+    mejor_movimiento = mejor_movimiento if mejor_movimiento else movimientos_validos[0]
+    
+    estadisticas_busqueda.nodos_explorados = contexto.nodos_explorados
+    estadisticas_busqueda.celdas_pacman = contexto.celdas_pacman
+    estadisticas_busqueda.nodos_podados = contexto.nodos_podados
+    estadisticas_busqueda.ramas_omitidas = contexto.ramas_omitidas
+    if not paralelo:
+        estadisticas_busqueda.clonaciones = 0 if modo_en_sitio else contexto.nodos_explorados
+    estadisticas_busqueda.timeout = contexto.presupuesto_agotado
+    estadisticas_busqueda.cancelada = contexto.cancelado
+    estadisticas_busqueda.profundidad_alcanzada = contexto.profundidad_alcanzada
+    estadisticas_busqueda.movimiento = mejor_movimiento
+    estadisticas_busqueda.valor = mejor_valor
+    estadisticas_busqueda.segundos = tiempo_total
+    if tabla is not None:
+        estadisticas_busqueda.extra['transposicion'] = {
+            'consultas': tabla.consultas, 'aciertos': tabla.aciertos,
+            'guardados': tabla.guardados, 'colisiones': tabla.colisiones
+        }
+    if ordenador is not None:
+        estadisticas_busqueda.extra['ordenamiento'] = {
+            'cortes': ordenador.cortes, 'cortes_primer_movimiento': ordenador.cortes_primer_movimiento
+        }
+    
+    imprimir(f"[ALFA-BETA] Nodos explorados: {contexto.nodos_explorados}, Podados: {contexto.nodos_podados} "
+             f"en {tiempo_total:.3f}s")
+    if contexto.relevancia:
+        imprimir(f"[ALFA-BETA] Ramas de fantasmas fuera de alcance omitidas: {contexto.ramas_omitidas}")
+    if tabla is not None:
+        imprimir(f"[ALFA-BETA] Transposición: aciertos {tabla.aciertos}/{tabla.consultas}, "
+                 f"guardados {tabla.guardados}, colisiones {tabla.colisiones}")
+    if ordenador is not None:
+        imprimir(f"[ALFA-BETA] Cortes con el primer movimiento: {ordenador.cortes_primer_movimiento}/"
+                 f"{ordenador.cortes} ({ordenador.porcentaje_primer_movimiento():.1f}%)")
+    imprimir(f"[ALFA-BETA] Mejor movimiento: {mejor_movimiento} (valor: {mejor_valor:.2f})")
+    
+    return mejor_movimiento
+
+
+def _buscar_raiz(contexto, estado, movimientos_validos, profundidad_maxima):
+    """
+    Una búsqueda completa desde la raíz a profundidad fija (generador, como
+    valor_max_alfa_beta).
+    
+    Returns:
+        tuple: (mejor_movimiento, mejor_valor)
+    """
+    contexto.profundidad_raiz = profundidad_maxima
+    estadisticas = contexto.estadisticas
+    estadisticas.iniciar_iteracion(profundidad_maxima, contexto.nodos_explorados)
+    en_sitio = contexto.en_sitio
+    ordenador = contexto.ordenador
+    
+    mejor_valor = float('-inf')
+    mejor_movimiento = None
+    alfa = float('-inf')  # Mejor valor garantizado para MAX
+    beta = float('inf')   # Mejor valor garantizado para MIN
+    
+    if ordenador is not None:
+        ply = (0, -1)
+        movimientos_validos = ordenador.ordenar_pacman(estado, movimientos_validos, ply)
+        linea = ()
     
     for movimiento in movimientos_validos:
         # Simular el movimiento de Pacman
-        estado_siguiente = estado.clonar()
-        estado_siguiente.mover_pacman(movimiento)
-        nodos_explorados += 1
+        turnos = estado.turnos_totales
+        estado_siguiente = sucesor_pacman(estado, movimiento, en_sitio, contexto.macro)
+        contexto.celdas_pacman += estado_siguiente.turnos_totales - turnos
+        contexto.nodos_explorados += 1
+        estadisticas.nodos_por_ply[0] += 1
+        if ordenador is not None:
+            ordenador.ultima_linea = ()
         
         # Si el juego terminó, evaluar directamente
         if estado_siguiente.juego_terminado:
-            valor = estado_siguiente.evaluar()
+            valor = _evaluar(contexto, estado_siguiente)
         else:
             # Llamar a MIN con alfa y beta
-            valor = valor_min_alfa_beta(estado_siguiente, profundidad_maxima - 1, 0, alfa, beta)
+            valor = yield from valor_min_alfa_beta(contexto, estado_siguiente, profundidad_maxima - 1, 0,
+                                                   alfa, beta)
+        volver(estado, en_sitio)
         
         if valor > mejor_valor:
             mejor_valor = valor
             mejor_movimiento = movimiento
+            if ordenador is not None:
+                linea = ((ply, movimiento),) + ordenador.ultima_linea
         
         # Actualizar alfa (mejor valor para MAX)
         alfa = max(alfa, mejor_valor)
         
         # Timeout de seguridad
-        if time.time() - tiempo_inicio > TIEMPO_MAXIMO:
-            print(f"[ALFA-BETA] Timeout alcanzado")
+        if contexto.sin_presupuesto():
+            imprimir(f"[ALFA-BETA] Timeout alcanzado")
             break
     
-    tiempo_total = time.time() - tiempo_inicio
-    print(f"[ALFA-BETA] Nodos explorados: {nodos_explorados}, Podados: {nodos_podados} en {tiempo_total:.3f}s")
-    print(f"[ALFA-BETA] Mejor movimiento: {mejor_movimiento} (valor: {mejor_valor:.2f})")
+    if ordenador is not None:
+        ordenador.ultima_linea = linea
+    estadisticas.terminar_iteracion(contexto.nodos_explorados, not contexto.presupuesto_agotado)
+    return mejor_movimiento, mejor_valor
+
+
+def _buscar_raiz_paralela(contexto, estado, movimientos_validos, profundidad_maxima):
+    """Como _buscar_raiz, pero cada hijo de la raíz se evalúa en el pool de procesos"""
+    from .paralelo import buscar_raiz_paralela
+    estadisticas = contexto.estadisticas
+    estadisticas.iniciar_iteracion(profundidad_maxima, contexto.nodos_explorados)
+    
+    ordenador = contexto.ordenador
+    if ordenador is not None:
+        # La historia la aprenden los trabajadores: aquí solo cuenta la variante principal
+        movimientos_validos = ordenador.ordenar_pacman(estado, movimientos_validos, (0, -1))
+    limite_nodos = contexto.limite_nodos
+    nodos_restantes = None if limite_nodos is None else max(limite_nodos - contexto.nodos_explorados, 0)
+    mejor_movimiento, mejor_valor, estadisticas_hijos = buscar_raiz_paralela(
+        'alfa-beta', estado, movimientos_validos, profundidad_maxima,
+        contexto.inicio, contexto.limite_tiempo, nodos_restantes,
+        {'modo_en_sitio': contexto.en_sitio, 'usar_transposicion': contexto.tabla is not None,
+         'ordenamiento': ordenador is not None, 'macro_movimientos': contexto.macro,
+         'relevancia_fantasmas': contexto.relevancia})
+    contexto.nodos_explorados += estadisticas_hijos.nodos_explorados
+    contexto.celdas_pacman += estadisticas_hijos.celdas_pacman
+    contexto.nodos_podados += estadisticas_hijos.nodos_podados
+    contexto.ramas_omitidas += estadisticas_hijos.ramas_omitidas
+    estadisticas.fusionar(estadisticas_hijos)
+    if estadisticas_hijos.timeout:
+        contexto.presupuesto_agotado = True
+        imprimir(f"[ALFA-BETA] Timeout alcanzado")
+    estadisticas.terminar_iteracion(contexto.nodos_explorados, not contexto.presupuesto_agotado)
+    return mejor_movimiento, mejor_valor
+
+
+def valor_movimiento_raiz(estado, movimiento, profundidad_maxima, alfa, inicio, tiempo_maximo,
+                          nodos_maximos=None, modo_en_sitio=False, tabla_transposicion=None,
+                          ordenador_movimientos=None, macro_movimientos=False, relevancia_fantasmas=False,
+                          alfa_compartido=None):
+    """
+    Valor de un solo hijo de la raíz con ventana (alfa, +inf).
+    
+    Es la unidad de trabajo de la búsqueda paralela: cada proceso evalúa
+    hijos de la raíz con el reloj de la búsqueda completa (inicio). Con
+    alfa_compartido, una función que devuelve una cota de la raíz (los
+    valores de otros hermanos), alfa sube a media búsqueda cada vez que
+    ContextoBusqueda mira el reloj. Un valor <= al último alfa es solo una
+    cota superior del valor real.
+    
+    Returns:
+        tuple: (valor, EstadisticasBusqueda del hijo)
+    """
+    estadisticas = EstadisticasBusqueda('alfa-beta')
+    estadisticas.asegurar_plies(profundidad_maxima)
+    contexto = ContextoBusqueda()
+    contexto.iniciar(tiempo_maximo, nodos_maximos, estadisticas, inicio)
+    contexto.en_sitio = modo_en_sitio
+    contexto.macro = macro_movimientos
+    contexto.relevancia = relevancia_fantasmas
+    contexto.tabla = tabla_transposicion
+    contexto.ordenador = ordenador_movimientos
+    contexto.movimientos_raiz = estado.movimientos
+    contexto.profundidad_raiz = profundidad_maxima
+    contexto.alfa_raiz = alfa
+    contexto.alfa_compartido = alfa_compartido
+    
+    turnos = estado.turnos_totales
+    estado_siguiente = sucesor_pacman(estado, movimiento, modo_en_sitio, macro_movimientos)
+    contexto.celdas_pacman += estado_siguiente.turnos_totales - turnos
+    contexto.nodos_explorados += 1
+    estadisticas.nodos_por_ply[0] += 1
+    if estado_siguiente.juego_terminado:
+        valor = _evaluar(contexto, estado_siguiente)
+    else:
+        valor = completar(valor_min_alfa_beta(contexto, estado_siguiente, profundidad_maxima - 1, 0,
+                                              alfa, float('inf')))
+    volver(estado, modo_en_sitio)
     
-    return mejor_movimiento if mejor_movimiento else movimientos_validos[0]
+    estadisticas.nodos_explorados = contexto.nodos_explorados
+    estadisticas.celdas_pacman = contexto.celdas_pacman
+    estadisticas.nodos_podados = contexto.nodos_podados
+    estadisticas.ramas_omitidas = contexto.ramas_omitidas
+    estadisticas.clonaciones = 0 if modo_en_sitio else contexto.nodos_explorados
+    estadisticas.timeout = contexto.presupuesto_agotado
+    return valor, estadisticas
 
 
-def valor_max_alfa_beta(estado, profundidad, indice_fantasma, alfa, beta):
+def _evaluar(contexto, estado):
+    """estado.evaluar() contando la evaluación en las estadísticas"""
+    contexto.estadisticas.evaluaciones += 1
+    return estado.evaluar()
+
+
+def valor_max_alfa_beta(contexto, estado, profundidad, indice_fantasma, alfa, beta):
     """
     Función MAX con Poda Alfa-Beta
     
@@ -80,6 +338,7 @@ def valor_max_alfa_beta(estado, profundidad, indice_fantasma, alfa, beta):
     PODA: Si valor >= beta, no explorar más (poda beta).
     
     Args:
+        contexto: ContextoBusqueda de la búsqueda
         estado: Estado actual
         profundidad: Profundidad restante
         indice_fantasma: No usado en MAX
@@ -87,44 +346,99 @@ def valor_max_alfa_beta(estado, profundidad, indice_fantasma, alfa, beta):
         beta: Mejor valor garantizado para MIN
     
     Returns:
-        float: Valor de utilidad
+        float: Valor de utilidad (con return: es un generador que cede el
+        control cada contexto.nodos_por_paso nodos; ver reanudable.py)
     """
-    global nodos_explorados, nodos_podados
+    if contexto.toca_pausa():
+        yield
     
-    if time.time() - tiempo_inicio > TIEMPO_MAXIMO:
-        return estado.evaluar()
+    if contexto.sin_presupuesto():
+        return _evaluar(contexto, estado)
     
     if estado.juego_terminado or profundidad == 0:
-        return estado.evaluar()
+        return _evaluar(contexto, estado)
+    
+    # Cota de la raíz publicada por otro proceso (búsqueda paralela)
+    if alfa < contexto.alfa_raiz:
+        alfa = contexto.alfa_raiz
+    
+    # Tabla de transposición: posición ya resuelta con profundidad suficiente
+    movimiento_tabla = None
+    tabla = contexto.tabla
+    if tabla is not None:
+        clave = estado.clave_zobrist()
+        entrada = tabla.buscar(clave)
+        if entrada is not None:
+            movimiento_tabla = entrada[3]  # Aunque sea menos profunda, sirve para ordenar
+        if entrada is not None and entrada[0] >= profundidad:
+            _, valor_tabla, tipo, _ = entrada
+            if tipo == EXACTA:
+                return valor_tabla
+            if tipo == COTA_INFERIOR:
+                alfa = max(alfa, valor_tabla)
+            else:
+                beta = min(beta, valor_tabla)
+            if alfa >= beta:
+                return valor_tabla
+        alfa_original, beta_original = alfa, beta
     
     valor = float('-inf')
+    mejor_movimiento = None
     movimientos_validos = estado.obtener_movimientos_validos_pacman()
     
     if not movimientos_validos:
-        return estado.evaluar()
+        return _evaluar(contexto, estado)
     
-    for movimiento in movimientos_validos:
-        estado_siguiente = estado.clonar()
-        estado_siguiente.mover_pacman(movimiento)
-        nodos_explorados += 1
+    ordenador = contexto.ordenador
+    if ordenador is not None:
+        ply = (estado.movimientos - contexto.movimientos_raiz, -1)
+        movimientos_validos = ordenador.ordenar_pacman(estado, movimientos_validos, ply, movimiento_tabla)
+        linea = ()
+    
+    indice_ply = contexto.profundidad_raiz - profundidad
+    estadisticas = contexto.estadisticas
+    nodos_ply = estadisticas.nodos_por_ply
+    en_sitio = contexto.en_sitio
+    for i, movimiento in enumerate(movimientos_validos):
+        turnos = estado.turnos_totales
+        estado_siguiente = sucesor_pacman(estado, movimiento, en_sitio, contexto.macro)
+        contexto.celdas_pacman += estado_siguiente.turnos_totales - turnos
+        contexto.nodos_explorados += 1
+        nodos_ply[indice_ply] += 1
+        if ordenador is not None:
+            ordenador.ultima_linea = ()
         
         if estado_siguiente.juego_terminado:
-            valor = max(valor, estado_siguiente.evaluar())
+            valor_hijo = _evaluar(contexto, estado_siguiente)
         else:
-            valor = max(valor, valor_min_alfa_beta(estado_siguiente, profundidad - 1, 0, alfa, beta))
+            valor_hijo = yield from valor_min_alfa_beta(contexto, estado_siguiente, profundidad - 1, 0, alfa, beta)
+        volver(estado, en_sitio)
+        
+        if valor_hijo > valor:
+            valor = valor_hijo
+            mejor_movimiento = movimiento
+            if ordenador is not None:
+                linea = ((ply, movimiento),) + ordenador.ultima_linea
         
         # PODA BETA: Si valor >= beta, MIN no elegirá esta rama
         if valor >= beta:
-            nodos_podados += 1
-            return valor
+            contexto.nodos_podados += 1
+            estadisticas.cortes_por_ply[indice_ply] += 1
+            if ordenador is not None:
+                ordenador.registrar_corte(ply, estado.pos_pacman, movimiento, profundidad, i == 0)
+            break
         
         # Actualizar alfa
         alfa = max(alfa, valor)
     
+    if ordenador is not None:
+        ordenador.ultima_linea = linea
+    if tabla is not None:
+        _guardar_en_tabla(contexto, clave, profundidad, valor, alfa_original, beta_original, mejor_movimiento)
     return valor
 
 
-def valor_min_alfa_beta(estado, profundidad, indice_fantasma, alfa, beta):
+def valor_min_alfa_beta(contexto, estado, profundidad, indice_fantasma, alfa, beta):
     """
     Función MIN con Poda Alfa-Beta
     
@@ -132,6 +446,7 @@ def valor_min_alfa_beta(estado, profundidad, indice_fantasma, alfa, beta):
     PODA: Si valor <= alfa, no explorar más (poda alfa).
     
     Args:
+        contexto: ContextoBusqueda de la búsqueda
         estado: Estado actual
         profundidad: Profundidad restante
         indice_fantasma: Índice del fantasma actual
@@ -139,56 +454,120 @@ def valor_min_alfa_beta(estado, profundidad, indice_fantasma, alfa, beta):
         beta: Mejor valor garantizado para MIN
     
     Returns:
-        float: Valor de utilidad
+        float: Valor de utilidad (con return: es un generador que cede el
+        control cada contexto.nodos_por_paso nodos; ver reanudable.py)
     """
-    global nodos_explorados, nodos_podados
+    if contexto.toca_pausa():
+        yield
     
-    if time.time() - tiempo_inicio > TIEMPO_MAXIMO:
-        return estado.evaluar()
+    if contexto.sin_presupuesto():
+        return _evaluar(contexto, estado)
     
     if estado.juego_terminado or profundidad == 0:
-        return estado.evaluar()
+        return _evaluar(contexto, estado)
     
     # Si procesamos todos los fantasmas, vuelve a MAX
     if indice_fantasma >= len(estado.pos_fantasmas):
-        return valor_max_alfa_beta(estado, profundidad, 0, alfa, beta)
+        return (yield from valor_max_alfa_beta(contexto, estado, profundidad, 0, alfa, beta))
     
     valor = float('inf')
     pos_fantasma = estado.pos_fantasmas[indice_fantasma]
     movimientos_validos = estado.obtener_movimientos_validos_fantasma(pos_fantasma)
     
     if not movimientos_validos:
-        return valor_min_alfa_beta(estado, profundidad, indice_fantasma + 1, alfa, beta)
+        return (yield from valor_min_alfa_beta(contexto, estado, profundidad, indice_fantasma + 1, alfa, beta))
     
-    for nueva_pos in movimientos_validos:
-        estado_siguiente = estado.clonar()
-        estado_siguiente.pos_fantasmas[indice_fantasma] = nueva_pos
-        nodos_explorados += 1
-        
-        # Verificar colisión
-        if estado_siguiente.pos_pacman in estado_siguiente.pos_fantasmas:
-            if estado_siguiente.pacman_poderoso:
-                estado_siguiente.pos_fantasmas.remove(estado_siguiente.pos_pacman)
-                estado_siguiente.puntuacion += 200
-                
-                if len(estado_siguiente.pos_fantasmas) == 0:
-                    estado_siguiente.juego_terminado = True
-                    estado_siguiente.mensaje = "¡Pacman ganó! ¡Comió todos los fantasmas!"
-                    estado_siguiente.puntuacion += 500
+    # Fantasma lejos de Pacman: no llega a tocarlo en lo que queda de búsqueda,
+    # así que da su paso previsto en vez de ramificar
+    if contexto.relevancia and not fantasma_relevante(estado, pos_fantasma, profundidad, contexto.macro):
+        contexto.ramas_omitidas += len(movimientos_validos) - 1
+        movimientos_validos = [estado.paso_previsto_fantasma(pos_fantasma)]
+    
+    if alfa < contexto.alfa_raiz:
+        alfa = contexto.alfa_raiz
+    
+    # Tabla de transposición (los fantasmas mueven por turnos: transponen mucho)
+    movimiento_tabla = None
+    tabla = contexto.tabla
+    if tabla is not None:
+        clave = estado.clave_zobrist(indice_fantasma)
+        entrada = tabla.buscar(clave)
+        if entrada is not None:
+            movimiento_tabla = entrada[3]
+        if entrada is not None and entrada[0] >= profundidad:
+            _, valor_tabla, tipo, _ = entrada
+            if tipo == EXACTA:
+                return valor_tabla
+            if tipo == COTA_INFERIOR:
+                alfa = max(alfa, valor_tabla)
             else:
-                estado_siguiente.juego_terminado = True
-                estado_siguiente.mensaje = "¡Pacman fue capturado!"
-                estado_siguiente.puntuacion -= 100
+                beta = min(beta, valor_tabla)
+            if alfa >= beta:
+                return valor_tabla
+        alfa_original, beta_original = alfa, beta
+    
+    mejor_pos = None
+    ordenador = contexto.ordenador
+    if ordenador is not None:
+        ply = (estado.movimientos - contexto.movimientos_raiz, indice_fantasma)
+        movimientos_validos = ordenador.ordenar_fantasma(estado, indice_fantasma, movimientos_validos,
+                                                         ply, movimiento_tabla)
+        linea = ()
+    
+    indice_ply = contexto.profundidad_raiz - profundidad - 1  # Los fantasmas cierran el turno de Pacman
+    estadisticas = contexto.estadisticas
+    nodos_ply = estadisticas.nodos_por_ply
+    en_sitio = contexto.en_sitio
+    for i, nueva_pos in enumerate(movimientos_validos):
+        # Mover el fantasma (resuelve la colisión con Pacman)
+        estado_siguiente = sucesor_fantasma(estado, indice_fantasma, nueva_pos, en_sitio)
+        contexto.nodos_explorados += 1
+        nodos_ply[indice_ply] += 1
+        if ordenador is not None:
+            ordenador.ultima_linea = ()
         
         # Procesar siguiente fantasma
-        valor = min(valor, valor_min_alfa_beta(estado_siguiente, profundidad, indice_fantasma + 1, alfa, beta))
+        valor_hijo = yield from valor_min_alfa_beta(contexto, estado_siguiente, profundidad, indice_fantasma + 1,
+                                                    alfa, beta)
+        volver(estado, en_sitio)
+        
+        if valor_hijo < valor:
+            valor = valor_hijo
+            mejor_pos = nueva_pos
+            if ordenador is not None:
+                linea = ((ply, nueva_pos),) + ordenador.ultima_linea
         
         # PODA ALFA: Si valor <= alfa, MAX no elegirá esta rama
+        if alfa < contexto.alfa_raiz:
+            alfa = contexto.alfa_raiz
         if valor <= alfa:
-            nodos_podados += 1
-            return valor
+            contexto.nodos_podados += 1
+            estadisticas.cortes_por_ply[indice_ply] += 1
+            if ordenador is not None:
+                ordenador.registrar_corte(ply, pos_fantasma, nueva_pos, profundidad, i == 0)
+            break
         
         # Actualizar beta
         beta = min(beta, valor)
     
-    return valor
\ No newline at end of file
+    if ordenador is not None:
+        ordenador.ultima_linea = linea
+    if tabla is not None:
+        _guardar_en_tabla(contexto, clave, profundidad, valor, alfa_original, beta_original, mejor_pos)
+    return valor
+
+
+def _guardar_en_tabla(contexto, clave, profundidad, valor, alfa, beta, mejor_movimiento=None):
+    """Guarda el resultado de un nodo con su tipo de cota respecto a la ventana original"""
+    if contexto.presupuesto_agotado:
+        return
+    
+    # Si alfa_raiz subió durante el subárbol, algún descendiente pudo cortar con ella
+    alfa = max(alfa, contexto.alfa_raiz)
+    if valor <= alfa:
+        tipo = COTA_SUPERIOR
+    elif valor >= beta:
+        tipo = COTA_INFERIOR
+    else:
+        tipo = EXACTA
+    contexto.tabla.guardar(clave, profundidad, valor, tipo, mejor_movimiento)
@@ -0,0 +1,97 @@
+"""
+Presupuesto de cada búsqueda según la carga del servidor.
+
+Cada turno debe terminar en latencia_objetivo desde que se encoló. Con W
+hilos de búsqueda, el trabajo k-ésimo de la cola (que ya lleva esperando
+e_k) empieza después de la búsqueda actual y de las k-1 que tiene delante,
+unas k/W búsquedas, y luego hace la suya. Si todas duran t:
+
+    e_k + (k/W + 1) * t <= latencia_objetivo
+
+La búsqueda que empieza toma el mayor t que cumple esto para ella misma
+(k = 0) y para todos los de la cola; si la CPU está sobrecargada (más de
+un proceso listo por núcleo), cada segundo de reloj rinde menos y se
+divide además por la carga por núcleo.
+El resultado se acota entre tiempo_minimo (suelo) y tiempo_maximo (techo).
+Los presupuestos por nodos se escalan en la misma proporción, con suelo
+nodos_minimos.
+
+Sin carga el presupuesto es el de siempre (el de la partida, o el techo).
+Con el presupuesto reducido la búsqueda pasa a profundización iterativa,
+para devolver siempre la última profundidad completa en lugar de una
+búsqueda cortada a medias.
+"""
+import os
+
+from .poda_alfa_beta import TIEMPO_MAXIMO
+
+# Segundos por turno (cola + búsqueda) que se quieren garantizar: el doble del techo, para
+# que sin cola (o con un turno delante) se busque con el presupuesto entero, como siempre
+LATENCIA_OBJETIVO = 2 * TIEMPO_MAXIMO
+TIEMPO_MINIMO = 0.05  # suelo: por debajo ni la profundidad 1 termina en tableros grandes
+NODOS_MINIMOS = 2000
+
+
+def carga_cpu():
+    """Carga media del último minuto por núcleo (0 si el sistema no la ofrece)"""
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (AttributeError, OSError):
+        return 0.0
+
+
+class PoliticaPresupuesto:
+    """Reparte el tiempo de búsqueda entre los turnos en cola (ver el docstring del módulo)"""
+
+    def __init__(self, latencia_objetivo=LATENCIA_OBJETIVO, tiempo_minimo=TIEMPO_MINIMO,
+                 tiempo_maximo=TIEMPO_MAXIMO, nodos_minimos=NODOS_MINIMOS, medir_carga=carga_cpu):
+        if not 0 < tiempo_minimo <= tiempo_maximo:
+            raise ValueError("Hace falta 0 < tiempo_minimo <= tiempo_maximo")
+        self.latencia_objetivo = latencia_objetivo
+        self.tiempo_minimo = tiempo_minimo
+        self.tiempo_maximo = tiempo_maximo
+        self.nodos_minimos = nodos_minimos
+        self.medir_carga = medir_carga
+
+    def asignar(self, tiempo_por_movimiento, nodos_por_movimiento, espera=0.0, esperas_detras=(),
+                trabajadores=1, degradado=False):
+        """
+        Presupuesto de un movimiento.
+
+        Args:
+            tiempo_por_movimiento, nodos_por_movimiento: Los de la partida (None = sin pedir)
+            espera: Segundos que esperó en cola esta búsqueda
+            esperas_detras: Segundos que llevan esperando los trabajos de la cola, en orden
+            trabajadores: Hilos que ejecutan búsquedas
+            degradado: Cola saturada: directamente el suelo
+
+        Returns:
+            dict: tiempo_maximo, nodos_maximos (None = sin límite), reducido (si
+                es menor que el de la partida), carga_cpu y detras
+        """
+        techo = self.tiempo_maximo
+        if tiempo_por_movimiento is not None:
+            techo = min(tiempo_por_movimiento, techo)
+        # El suelo no sube el presupuesto por encima del que pidió la partida
+        suelo = min(self.tiempo_minimo, techo)
+
+        carga = self.medir_carga()
+        if degradado:
+            tiempo = suelo
+        else:
+            tiempo = self.latencia_objetivo - espera
+            for posicion, espera_detras in enumerate(esperas_detras, 1):
+                tiempo = min(tiempo, (self.latencia_objetivo - espera_detras) / (posicion / trabajadores + 1))
+            tiempo = max(suelo, min(techo, tiempo / max(carga, 1.0)))
+
+        nodos = nodos_por_movimiento
+        if nodos is not None and tiempo < techo:
+            nodos = max(min(self.nodos_minimos, nodos), int(nodos * tiempo / techo))
+
+        return {
+            'tiempo_maximo': tiempo,
+            'nodos_maximos': nodos,
+            'reducido': tiempo < techo,
+            'carga_cpu': carga,
+            'detras': len(esperas_detras)
+        }
@@ -0,0 +1,135 @@
+"""
+Búsquedas reanudables y un planificador que las intercala en un solo hilo.
+
+busqueda_alfa_beta y busqueda_minimax son generadores: hacen lo mismo que
+decision_alfa_beta y decision_minimax (mismo movimiento, mismo valor, mismos
+nodos) pero ceden el control con un yield cada nodos_por_paso nodos, y el
+movimiento es el valor de retorno del generador (StopIteration.value). Así
+un solo hilo (un bucle de eventos, por ejemplo) puede llevar cientos de
+búsquedas a la vez sin repartirse el GIL entre hilos.
+
+No hay una segunda versión de los motores: valor_max_alfa_beta,
+valor_min_alfa_beta y las de minimax son generadores que se llaman entre
+sí con yield from, y cada nodo mira contexto.toca_pausa() al entrar. Sin
+pausas (nodos_por_paso=None) nunca ceden y decision_* las lleva hasta el
+final con completar().
+
+El reloj de la búsqueda sigue corriendo mientras está en pausa: con un
+presupuesto por tiempo, intercalar N búsquedas les deja 1/N del procesador
+a cada una. Con presupuesto por nodos o a profundidad fija el resultado no
+depende de cómo se intercalen.
+
+PlanificadorBusquedas reparte los pasos por peso (planificación por
+zancadas): con el mismo peso es round-robin, y una búsqueda de peso 2
+avanza el doble de pasos que una de peso 1. Cancelar una búsqueda es
+cancelar su ContextoBusqueda: termina en su siguiente paso.
+"""
+import heapq
+import time
+
+NODOS_POR_PASO = 2000  # Unos 10 ms de búsqueda
+
+
+def completar(busqueda):
+    """Ejecuta una búsqueda reanudable hasta el final y devuelve su resultado"""
+    try:
+        while True:
+            next(busqueda)
+    except StopIteration as fin:
+        return fin.value
+
+
+def sin_pausas(funcion):
+    """La función como búsqueda reanudable que termina sin ninguna pausa (para usar con yield from)"""
+    def busqueda(*argumentos):
+        return funcion(*argumentos)
+        yield  # Nunca se llega: solo hace de busqueda un generador
+
+    return busqueda
+
+
+class TareaBusqueda:
+    """Una búsqueda reanudable dentro del planificador"""
+
+    __slots__ = ('busqueda', 'peso', 'al_terminar', 'resultado', 'error', 'terminada', 'pasos',
+                 'segundos', '_virtual')
+
+    def __init__(self, busqueda, peso, al_terminar):
+        self.busqueda = busqueda
+        self.peso = peso
+        self.al_terminar = al_terminar  # al_terminar(tarea) al acabar, bien o con error
+        self.resultado = None
+        self.error = None
+        self.terminada = False
+        self.pasos = 0
+        self.segundos = 0.0  # Tiempo de ejecución, sin contar las pausas
+        self._virtual = 0.0
+
+    def avanzar(self):
+        """Un paso de la búsqueda; True si terminó"""
+        inicio = time.perf_counter()
+        try:
+            next(self.busqueda)
+        except StopIteration as fin:
+            self.resultado = fin.value
+            self.terminada = True
+        except Exception as error:
+            print(f"❌ Búsqueda reanudable fallida: {error!r}")
+            self.error = error
+            self.terminada = True
+        self.segundos += time.perf_counter() - inicio
+        self.pasos += 1
+        if self.terminada and self.al_terminar is not None:
+            self.al_terminar(self)
+        return self.terminada
+
+
+class PlanificadorBusquedas:
+    """
+    Intercala búsquedas reanudables paso a paso (no es seguro entre hilos:
+    se usa desde el hilo que lo lleva).
+    """
+
+    def __init__(self):
+        self._pendientes = []  # Montículo de (tiempo virtual, orden, TareaBusqueda)
+        self._orden = 0
+        self._virtual = 0.0  # Tiempo virtual de la última tarea que avanzó
+
+    def agregar(self, busqueda, peso=1.0, al_terminar=None):
+        """
+        Añade un generador de búsqueda (busqueda_alfa_beta, busqueda_minimax...).
+
+        Entra con el tiempo virtual actual: ni adelanta a las que ya estaban
+        ni se queda esperando a que lo alcancen.
+
+        Returns:
+            TareaBusqueda: Con resultado (el movimiento) cuando terminada
+        """
+        if peso <= 0:
+            raise ValueError("El peso tiene que ser positivo")
+        tarea = TareaBusqueda(busqueda, peso, al_terminar)
+        tarea._virtual = self._virtual
+        self._empujar(tarea)
+        return tarea
+
+    def paso(self):
+        """Avanza un paso la búsqueda con menos tiempo virtual; False si no queda ninguna"""
+        if not self._pendientes:
+            return False
+        self._virtual, _, tarea = heapq.heappop(self._pendientes)
+        if not tarea.avanzar():
+            tarea._virtual += 1.0 / tarea.peso
+            self._empujar(tarea)
+        return bool(self._pendientes)
+
+    def ejecutar(self):
+        """Avanza todas las búsquedas hasta que terminen"""
+        while self.paso():
+            pass
+
+    def __len__(self):
+        return len(self._pendientes)
+
+    def _empujar(self, tarea):
+        heapq.heappush(self._pendientes, (tarea._virtual, self._orden, tarea))
+        self._orden += 1
@@ -0,0 +1,148 @@
+"""
+Control de la reproducción automática por Server-Sent Events.
+
+El servidor juega la partida en un bucle y envía cada turno como un evento
+(/api/stream). Las peticiones de control (/api/stream/control) comparten con
+ese bucle un ControlReproduccion: pausar, reanudar, cancelar, cambiar el
+ritmo y confirmar turnos dibujados.
+
+Contrapresión: el bucle no se adelanta más de `ventana` turnos a los que el
+cliente confirmó haber dibujado (ventana 0 = sin límite; entonces solo
+frena el propio socket cuando el cliente no lee).
+
+El bucle de Flask espera en un hilo con esperar_turno(); el de
+servidor_asgi.py, en el bucle de eventos con esperar_turno_async(), que se
+despierta igual con cada cambio (las peticiones de control pueden llegar
+desde cualquier hilo).
+"""
+import asyncio
+import threading
+import time
+
+RITMO_POR_DEFECTO = 0.3  # segundos mínimos entre el inicio de dos turnos
+VENTANA_POR_DEFECTO = 8  # turnos enviados sin confirmar
+LATIDO = 15.0  # segundos sin eventos tras los que se manda un comentario (detecta desconexiones)
+
+
+class ControlReproduccion:
+    """Estado compartido entre el bucle de una transmisión y las peticiones de control"""
+
+    def __init__(self, ritmo=RITMO_POR_DEFECTO, ventana=VENTANA_POR_DEFECTO):
+        self._condicion = threading.Condition()
+        self.ritmo = ritmo
+        self.ventana = ventana
+        self.pausado = False
+        self.cancelado = False
+        self.turnos_enviados = 0
+        self.turnos_confirmados = 0
+        self._avisos = []  # Una función por cada esperar_turno_async en curso
+
+    def pausar(self):
+        with self._condicion:
+            self.pausado = True
+
+    def reanudar(self):
+        with self._condicion:
+            self.pausado = False
+            self._notificar()
+
+    def cancelar(self):
+        with self._condicion:
+            self.cancelado = True
+            self._notificar()
+
+    def cambiar_ritmo(self, ritmo):
+        with self._condicion:
+            self.ritmo = max(float(ritmo), 0.0)
+            self._notificar()
+
+    def confirmar(self, turnos):
+        """El cliente ya dibujó `turnos` turnos de esta transmisión"""
+        with self._condicion:
+            self.turnos_confirmados = max(self.turnos_confirmados, int(turnos))
+            self._notificar()
+
+    def turno_enviado(self):
+        with self._condicion:
+            self.turnos_enviados += 1
+
+    def esperar_turno(self, inicio_ultimo_turno):
+        """
+        Bloquea hasta que toque jugar el siguiente turno.
+
+        Args:
+            inicio_ultimo_turno: time.monotonic() del inicio del turno anterior
+
+        Returns:
+            True para jugar, False si se canceló, None si pasó LATIDO sin poder jugar
+        """
+        limite_latido = time.monotonic() + LATIDO
+        with self._condicion:
+            while True:
+                resultado, espera = self._decidir(inicio_ultimo_turno, limite_latido)
+                if espera is None:
+                    return resultado
+                self._condicion.wait(espera)
+
+    async def esperar_turno_async(self, inicio_ultimo_turno):
+        """esperar_turno() sin bloquear el hilo: para el bucle de eventos"""
+        bucle = asyncio.get_running_loop()
+        cambio = asyncio.Event()
+
+        def aviso():
+            bucle.call_soon_threadsafe(cambio.set)
+
+        limite_latido = time.monotonic() + LATIDO
+        with self._condicion:
+            self._avisos.append(aviso)
+        try:
+            while True:
+                # clear antes de mirar el estado: un cambio posterior vuelve a despertar
+                cambio.clear()
+                with self._condicion:
+                    resultado, espera = self._decidir(inicio_ultimo_turno, limite_latido)
+                if espera is None:
+                    return resultado
+                try:
+                    await asyncio.wait_for(cambio.wait(), espera)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._condicion:
+                self._avisos.remove(aviso)
+
+    def _decidir(self, inicio_ultimo_turno, limite_latido):
+        """(resultado de esperar_turno, None) si ya se sabe, o (None, segundos que esperar)"""
+        if self.cancelado:
+            return False, None
+        ahora = time.monotonic()
+        if self.pausado or self._ventana_llena():
+            espera = limite_latido - ahora
+        else:
+            espera = inicio_ultimo_turno + self.ritmo - ahora
+            if espera <= 0:
+                return True, None
+            espera = min(espera, limite_latido - ahora)
+        if espera <= 0:
+            return None, None
+        return None, espera
+
+    def _notificar(self):
+        """Con el lock: despierta a los que esperan, en hilos y en bucles de eventos"""
+        self._condicion.notify_all()
+        for aviso in self._avisos:
+            aviso()
+
+    def _ventana_llena(self):
+        return self.ventana and self.turnos_enviados - self.turnos_confirmados >= self.ventana
+
+    def resumen(self):
+        with self._condicion:
+            return {
+                'ritmo': self.ritmo,
+                'ventana': self.ventana,
+                'pausado': self.pausado,
+                'cancelado': self.cancelado,
+                'turnos_enviados': self.turnos_enviados,
+                'turnos_confirmados': self.turnos_confirmados
+            }
@@ -0,0 +1,139 @@
+"""
+Registro de partidas simultáneas del servidor.
+
+Cada partida (EstadoJuego) se guarda con un id aleatorio y un lock propio:
+dos peticiones sobre la misma partida se ejecutan una detrás de otra, las de
+partidas distintas no se esperan entre sí. Las partidas se desalojan por
+inactividad (TTL), por número (LRU) y por memoria estimada.
+"""
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+MAX_SESIONES = 500
+TTL_INACTIVIDAD = 30 * 60  # segundos sin peticiones
+MEMORIA_MAXIMA = 512 * 1024 * 1024  # bytes estimados entre todas las partidas
+
+BYTES_BASE_POR_JUEGO = 16 * 1024  # estado, listas y conjuntos de una partida
+BYTES_POR_ENTRADA_TABLA = 160  # tupla de la tabla de transposición con sus ints
+BYTES_POR_ENTRADA_HISTORIA = 200  # clave ((fila, columna), movimiento) y peso
+BYTES_POR_CELDA = 2  # capas de bits del estado y de la última instantánea enviada (tableros grandes)
+
+
+def estimar_bytes(juego):
+    """Memoria aproximada de una partida; lo que crece es su tabla de transposición"""
+    total = BYTES_BASE_POR_JUEGO + juego.filas * juego.columnas * BYTES_POR_CELDA
+    tabla = juego.tabla_transposicion
+    if tabla is not None:
+        total += sys.getsizeof(tabla._entradas) + len(tabla) * BYTES_POR_ENTRADA_TABLA
+    ordenador = juego.ordenador_movimientos
+    if ordenador is not None:
+        total += len(ordenador.historia) * BYTES_POR_ENTRADA_HISTORIA
+    return total
+
+
+class Sesion:
+    """Una partida registrada con su lock"""
+
+    __slots__ = ('id', 'juego', 'lock', 'ultimo_acceso', 'bytes', 'reproduccion')
+
+    def __init__(self, id_juego, juego):
+        self.id = id_juego
+        self.juego = juego
+        self.lock = threading.Lock()
+        self.ultimo_acceso = time.monotonic()
+        self.bytes = estimar_bytes(juego)
+        self.reproduccion = None  # ControlReproduccion de la transmisión SSE en curso
+
+
+class RegistroSesiones:
+    """
+    Diccionario id -> Sesion seguro entre hilos.
+
+    El OrderedDict se mantiene en orden de último acceso (la menos usada
+    primero), así que tanto el TTL como el LRU desalojan por el principio.
+    """
+
+    def __init__(self, max_sesiones=MAX_SESIONES, ttl=TTL_INACTIVIDAD, memoria_maxima=MEMORIA_MAXIMA):
+        self.max_sesiones = max_sesiones
+        self.ttl = ttl
+        self.memoria_maxima = memoria_maxima
+        self._sesiones = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes_totales = 0
+        self.desalojadas_ttl = 0
+        self.desalojadas_lru = 0
+        self.desalojadas_memoria = 0
+
+    def crear(self, juego):
+        """Registra una partida nueva y devuelve su id"""
+        id_juego = uuid.uuid4().hex
+        sesion = Sesion(id_juego, juego)
+        with self._lock:
+            self._sesiones[id_juego] = sesion
+            self.bytes_totales += sesion.bytes
+            self._desalojar(conservar=id_juego)
+        return id_juego
+
+    def obtener(self, id_juego):
+        """Sesion de un id (y la marca como usada), o None si no existe o expiró"""
+        with self._lock:
+            self._desalojar()
+            sesion = self._sesiones.get(id_juego)
+            if sesion is None:
+                return None
+            sesion.ultimo_acceso = time.monotonic()
+            self._sesiones.move_to_end(id_juego)
+            return sesion
+
+    def actualizar_memoria(self, sesion):
+        """Recalcula la memoria de una partida después de un turno y desaloja si hace falta"""
+        nuevos = estimar_bytes(sesion.juego)
+        with self._lock:
+            if self._sesiones.get(sesion.id) is not sesion:
+                return  # Ya desalojada
+            self.bytes_totales += nuevos - sesion.bytes
+            sesion.bytes = nuevos
+            self._desalojar(conservar=sesion.id)
+
+    def eliminar(self, id_juego):
+        with self._lock:
+            sesion = self._sesiones.pop(id_juego, None)
+            if sesion is not None:
+                self.bytes_totales -= sesion.bytes
+            return sesion is not None
+
+    def _desalojar(self, conservar=None):
+        """Quita las partidas inactivas y, si se supera algún límite, las menos usadas"""
+        ahora = time.monotonic()
+        while self._sesiones:
+            id_juego, sesion = next(iter(self._sesiones.items()))
+            if id_juego == conservar:
+                break
+            if ahora - sesion.ultimo_acceso > self.ttl:
+                self.desalojadas_ttl += 1
+            elif len(self._sesiones) > self.max_sesiones:
+                self.desalojadas_lru += 1
+            elif self.bytes_totales > self.memoria_maxima:
+                self.desalojadas_memoria += 1
+            else:
+                break
+            del self._sesiones[id_juego]
+            self.bytes_totales -= sesion.bytes
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sesiones)
+
+    def resumen(self):
+        """Contadores del registro (para diagnóstico)"""
+        with self._lock:
+            return {
+                'sesiones': len(self._sesiones),
+                'bytes_estimados': self.bytes_totales,
+                'desalojadas_ttl': self.desalojadas_ttl,
+                'desalojadas_lru': self.desalojadas_lru,
+                'desalojadas_memoria': self.desalojadas_memoria
+            }
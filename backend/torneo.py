@@ -0,0 +1,313 @@
+"""
+Torneo sin servidor: juega muchas partidas completas y guarda un resultado
+por partida.
+
+Cada partida es EstadoJuego -> motor -> mover_pacman -> mover_fantasmas
+hasta juego_terminado (o un máximo de turnos), igual que /api/siguiente_turno
+pero sin Flask. Las partidas se reparten entre procesos, cada una con su
+semilla, y los resultados se escriben (JSONL o CSV según la extensión) a
+medida que terminan.
+
+Uso:
+    python -m backend.torneo --partidas 1000 --algoritmos minimax alfa-beta \\
+        --profundidades 2 3 --salida resultados.jsonl --procesos 16
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from . import expectimax, minimax, poda_alfa_beta
+from .estadisticas import EstadisticasBusqueda, sin_log
+from .juego import EstadoJuego, NUM_FANTASMAS
+from .mapas import tablero_de_configuracion
+
+MAX_TURNOS = 1000
+PENDIENTES_POR_PROCESO = 4  # Partidas encoladas por proceso (no se envían las 10k de golpe)
+
+CAMPOS = [
+    'semilla', 'algoritmo', 'profundidad', 'tiempo_por_movimiento', 'nodos_por_movimiento',
+    'transposicion', 'ordenamiento', 'distancia_laberinto', 'macro_movimientos', 'relevancia_fantasmas',
+    'mapa', 'filas', 'columnas', 'num_fantasmas',
+    'puntuacion', 'turnos', 'resultado', 'mensaje', 'capsulas_recogidas', 'fantasmas_comidos',
+    'nodos_totales', 'nodos_por_movimiento_medio', 'ms_por_movimiento_medio',
+    'ms_por_movimiento_max', 'segundos'
+]
+
+
+def jugar_partida(configuracion, semilla, max_turnos=MAX_TURNOS):
+    """
+    Juega una partida completa sin servidor.
+
+    Args:
+        configuracion: dict con algoritmo, profundidad y opcionalmente
+            tiempo_por_movimiento, nodos_por_movimiento, transposicion,
+            ordenamiento, distancia_laberinto, num_fantasmas y el mapa
+            (layout, o filas, columnas y semilla_laberinto; ver mapas.py)
+        semilla: Semilla de random para la partida (fantasmas y velocidades)
+        max_turnos: Turnos tras los que la partida se da por empatada
+
+    Returns:
+        dict: Una fila de resultados (ver CAMPOS)
+    """
+    random.seed(semilla)
+    inicio = time.perf_counter()
+
+    juego = EstadoJuego(tablero_de_configuracion(configuracion),
+                        configuracion.get('num_fantasmas', NUM_FANTASMAS))
+    juego.algoritmo = configuracion.get('algoritmo', 'minimax')
+    juego.usar_distancia_laberinto = bool(configuracion.get('distancia_laberinto', False))
+    juego.usar_transposicion = bool(configuracion.get('transposicion', False))
+    juego.usar_ordenamiento = bool(configuracion.get('ordenamiento', False))
+    juego.poda_star = bool(configuracion.get('poda_star', True))
+    juego.usar_macro_movimientos = bool(configuracion.get('macro_movimientos', False))
+    juego.usar_relevancia_fantasmas = bool(configuracion.get('relevancia_fantasmas', False))
+    tiempo_por_movimiento = configuracion.get('tiempo_por_movimiento')
+    nodos_por_movimiento = configuracion.get('nodos_por_movimiento')
+    iterativo = tiempo_por_movimiento is not None or nodos_por_movimiento is not None
+    profundidad = configuracion.get('profundidad', None if iterativo else 2)
+
+    nodos_totales = 0
+    tiempos = []
+    for _ in range(max_turnos):
+        if juego.juego_terminado:
+            break
+
+        inicio_movimiento = time.perf_counter()
+        estadisticas = EstadisticasBusqueda(juego.algoritmo)
+        # Los motores imprimen cada decisión: en un torneo solo sería ruido
+        with sin_log():
+            if juego.algoritmo == 'minimax':
+                movimiento = minimax.decision_minimax(
+                    juego, profundidad, iterativo=iterativo,
+                    tiempo_maximo=tiempo_por_movimiento, nodos_maximos=nodos_por_movimiento,
+                    macro_movimientos=juego.usar_macro_movimientos,
+                    relevancia_fantasmas=juego.usar_relevancia_fantasmas,
+                    estadisticas_busqueda=estadisticas)
+            elif juego.algoritmo == 'expectimax':
+                movimiento = expectimax.decision_expectimax(
+                    juego, profundidad, poda_star=juego.poda_star, iterativo=iterativo,
+                    tiempo_maximo=tiempo_por_movimiento, nodos_maximos=nodos_por_movimiento,
+                    macro_movimientos=juego.usar_macro_movimientos,
+                    estadisticas_busqueda=estadisticas)
+            else:
+                movimiento = poda_alfa_beta.decision_alfa_beta(
+                    juego, profundidad, usar_transposicion=juego.usar_transposicion,
+                    iterativo=iterativo, tiempo_maximo=tiempo_por_movimiento,
+                    nodos_maximos=nodos_por_movimiento, ordenamiento=juego.usar_ordenamiento,
+                    macro_movimientos=juego.usar_macro_movimientos,
+                    relevancia_fantasmas=juego.usar_relevancia_fantasmas,
+                    estadisticas_busqueda=estadisticas)
+        nodos_totales += estadisticas.nodos_explorados
+        tiempos.append(time.perf_counter() - inicio_movimiento)
+
+        if movimiento is None:
+            juego.juego_terminado = True
+            juego.mensaje = "Sin movimientos válidos"
+            break
+        juego.mover_pacman(movimiento)
+        if not juego.juego_terminado:
+            juego.mover_fantasmas()
+
+    if not juego.juego_terminado:
+        resultado = 'limite_turnos'
+    elif 'ganó' in juego.mensaje:
+        resultado = 'victoria'
+    else:
+        resultado = 'derrota'
+
+    movimientos = len(tiempos) or 1
+    return {
+        'semilla': semilla,
+        'algoritmo': juego.algoritmo,
+        'profundidad': profundidad,
+        'tiempo_por_movimiento': tiempo_por_movimiento,
+        'nodos_por_movimiento': nodos_por_movimiento,
+        'transposicion': juego.usar_transposicion,
+        'ordenamiento': juego.usar_ordenamiento,
+        'distancia_laberinto': juego.usar_distancia_laberinto,
+        'macro_movimientos': juego.usar_macro_movimientos,
+        'relevancia_fantasmas': juego.usar_relevancia_fantasmas,
+        'mapa': _nombre_mapa(configuracion),
+        'filas': juego.filas,
+        'columnas': juego.columnas,
+        'num_fantasmas': juego.num_fantasmas_total,
+        'puntuacion': juego.puntuacion,
+        'turnos': juego.turnos_totales,
+        'resultado': resultado,
+        'mensaje': juego.mensaje,
+        'capsulas_recogidas': juego.capsulas_recogidas,
+        'fantasmas_comidos': juego.num_fantasmas_total - len(juego.pos_fantasmas),
+        'nodos_totales': nodos_totales,
+        'nodos_por_movimiento_medio': nodos_totales / movimientos,
+        'ms_por_movimiento_medio': sum(tiempos) / movimientos * 1000,
+        'ms_por_movimiento_max': max(tiempos, default=0) * 1000,
+        'segundos': time.perf_counter() - inicio
+    }
+
+
+class EscritorResultados:
+    """Escribe filas de resultados en JSONL o CSV (según la extensión) y vacía tras cada una"""
+
+    def __init__(self, ruta):
+        self._archivo = open(ruta, 'w', newline='', encoding='utf-8')
+        self._csv = None
+        if ruta.endswith('.csv'):
+            self._csv = csv.DictWriter(self._archivo, fieldnames=CAMPOS)
+            self._csv.writeheader()
+
+    def escribir(self, fila):
+        if self._csv is not None:
+            self._csv.writerow(fila)
+        else:
+            self._archivo.write(json.dumps(fila, ensure_ascii=False) + '\n')
+        self._archivo.flush()
+
+    def cerrar(self):
+        self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.cerrar()
+
+
+def ejecutar_torneo(configuraciones, semillas, ruta_salida, procesos=None, max_turnos=MAX_TURNOS):
+    """
+    Juega cada configuración con cada semilla y escribe los resultados al terminar cada partida.
+
+    Args:
+        configuraciones: Lista de dicts para jugar_partida
+        semillas: Semillas; todas las configuraciones juegan las mismas partidas
+        ruta_salida: Archivo .jsonl o .csv
+        procesos: Procesos del pool (None = os.cpu_count())
+        max_turnos: Tope de turnos por partida
+
+    Returns:
+        dict: Resumen por configuración (partidas, victorias, puntuación media)
+    """
+    procesos = procesos or os.cpu_count() or 1
+    trabajos = iter(itertools.product(configuraciones, semillas))
+    total = len(configuraciones) * len(semillas)
+    resumen = {}
+    terminadas = 0
+    inicio = time.perf_counter()
+
+    with EscritorResultados(ruta_salida) as escritor, ProcessPoolExecutor(procesos) as pool:
+        pendientes = set()
+        while True:
+            # Mantener la cola llena pero acotada
+            for configuracion, semilla in itertools.islice(
+                    trabajos, procesos * PENDIENTES_POR_PROCESO - len(pendientes)):
+                pendientes.add(pool.submit(jugar_partida, configuracion, semilla, max_turnos))
+            if not pendientes:
+                break
+
+            hechos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+            for futuro in hechos:
+                fila = futuro.result()
+                escritor.escribir(fila)
+                terminadas += 1
+
+                clave = _nombre_configuracion(fila)
+                datos = resumen.setdefault(clave, {'partidas': 0, 'victorias': 0, 'puntuacion': 0})
+                datos['partidas'] += 1
+                datos['victorias'] += fila['resultado'] == 'victoria'
+                datos['puntuacion'] += fila['puntuacion']
+
+            if terminadas % 100 < len(hechos) or terminadas == total:
+                print(f"[TORNEO] {terminadas}/{total} partidas en {time.perf_counter() - inicio:.1f}s")
+
+    for datos in resumen.values():
+        datos['puntuacion_media'] = datos.pop('puntuacion') / datos['partidas']
+    return resumen
+
+
+def _nombre_mapa(configuracion):
+    if configuracion.get('layout'):
+        return configuracion['layout']
+    if configuracion.get('filas') is not None:
+        return f"generado-{configuracion['filas']}x{configuracion['columnas']}-{configuracion.get('semilla_laberinto', 0)}"
+    return 'clasico'
+
+
+def _nombre_configuracion(fila):
+    nombre = f"{fila['algoritmo']} p={fila['profundidad']}"
+    if fila['tiempo_por_movimiento'] is not None:
+        nombre += f" t={fila['tiempo_por_movimiento']}s"
+    if fila['nodos_por_movimiento'] is not None:
+        nombre += f" n={fila['nodos_por_movimiento']}"
+    for opcion in ('transposicion', 'ordenamiento', 'distancia_laberinto', 'macro_movimientos',
+                   'relevancia_fantasmas'):
+        if fila[opcion]:
+            nombre += f" +{opcion}"
+    if fila['mapa'] != 'clasico':
+        nombre += f" mapa={fila['mapa']}"
+    if fila['num_fantasmas'] != NUM_FANTASMAS:
+        nombre += f" fantasmas={fila['num_fantasmas']}"
+    return nombre
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description='Torneo de motores de Pacman sin servidor')
+    parser.add_argument('--partidas', type=int, default=100, help='partidas por configuración')
+    parser.add_argument('--semilla-inicial', type=int, default=0)
+    parser.add_argument('--algoritmos', nargs='+', default=['minimax', 'alfa-beta'],
+                        choices=['minimax', 'alfa-beta', 'expectimax'])
+    parser.add_argument('--profundidades', nargs='+', type=int, default=[2])
+    parser.add_argument('--tiempos', nargs='+', type=float, default=[None],
+                        help='segundos por movimiento (activa la profundización iterativa)')
+    parser.add_argument('--nodos', nargs='+', type=int, default=[None],
+                        help='nodos por movimiento (activa la profundización iterativa)')
+    parser.add_argument('--transposicion', action='store_true')
+    parser.add_argument('--ordenamiento', action='store_true')
+    parser.add_argument('--distancia-laberinto', action='store_true')
+    parser.add_argument('--macro-movimientos', action='store_true',
+                        help='Pacman busca pasillos enteros por nodo')
+    parser.add_argument('--relevancia-fantasmas', action='store_true',
+                        help='no ramificar los fantasmas fuera de alcance (minimax y alfa-beta)')
+    parser.add_argument('--layout', help='layout de layouts/ (nombre) o ruta a un archivo')
+    parser.add_argument('--filas', type=int, help='laberinto generado de filas x columnas')
+    parser.add_argument('--columnas', type=int)
+    parser.add_argument('--semilla-laberinto', type=int, default=0)
+    parser.add_argument('--fantasmas', type=int, default=NUM_FANTASMAS)
+    parser.add_argument('--max-turnos', type=int, default=MAX_TURNOS)
+    parser.add_argument('--procesos', type=int, default=None)
+    parser.add_argument('--salida', default='torneo.jsonl', help='archivo .jsonl o .csv')
+    args = parser.parse_args(argumentos)
+
+    configuraciones = [
+        {
+            'algoritmo': algoritmo,
+            'profundidad': profundidad,
+            'tiempo_por_movimiento': tiempo,
+            'nodos_por_movimiento': nodos,
+            'transposicion': args.transposicion,
+            'ordenamiento': args.ordenamiento,
+            'distancia_laberinto': args.distancia_laberinto,
+            'macro_movimientos': args.macro_movimientos,
+            'relevancia_fantasmas': args.relevancia_fantasmas,
+            'layout': args.layout,
+            'filas': args.filas,
+            'columnas': args.columnas,
+            'semilla_laberinto': args.semilla_laberinto,
+            'num_fantasmas': args.fantasmas
+        }
+        for algoritmo, profundidad, tiempo, nodos in itertools.product(
+            args.algoritmos, args.profundidades, args.tiempos, args.nodos)
+    ]
+    semillas = range(args.semilla_inicial, args.semilla_inicial + args.partidas)
+
+    resumen = ejecutar_torneo(configuraciones, semillas, args.salida, args.procesos, args.max_turnos)
+    for nombre, datos in sorted(resumen.items()):
+        print(f"[TORNEO] {nombre}: {datos['victorias']}/{datos['partidas']} victorias, "
+              f"puntuación media {datos['puntuacion_media']:.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+"""
+Cola de trabajos de búsqueda del servidor.
+
+Los turnos no se juegan en el hilo de la petición: se encolan como
+trabajos y los ejecuta un grupo fijo de hilos trabajadores. La petición
+que encola responde enseguida con el id del trabajo, y el cliente pregunta
+por el resultado (o espera a que esté, con un tiempo máximo). Así una
+búsqueda de TIEMPO_MAXIMO no retiene un hilo de Flask y las peticiones
+baratas (/api/estado, /) no se quedan detrás.
+
+Control de admisión: con `capacidad` trabajos en espera, los nuevos se
+rechazan (ColaLlena); con `umbral_degradacion` o más esperando detrás, el
+trabajo que empieza se marca degradado (la función decide qué significa:
+el servidor busca con el presupuesto mínimo). esperas() da lo que lleva
+esperando cada trabajo de la cola, para repartir el tiempo según la carga
+(presupuesto.py).
+
+Hay un trabajo pendiente como mucho por clave: volver a enviar la misma
+clave (un reintento del cliente) devuelve el trabajo que ya estaba.
+
+Quien no puede bloquear un hilo en esperar() (un bucle de eventos) pide
+con avisar() que lo llamen al terminar el trabajo.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+
+# Hilos que buscan a la vez. Con el GIL no suman CPU, pero se reparten el reloj: un turno
+# corto no espera a que termine uno de TIEMPO_MAXIMO (y la búsqueda paralela sí usa núcleos)
+TRABAJADORES = 4
+CAPACIDAD_COLA = 64  # Trabajos en espera a partir de los que se rechazan los nuevos
+UMBRAL_DEGRADACION = 8  # Trabajos esperando detrás a partir de los que se ejecuta degradado
+TRABAJOS_CONSERVADOS = 1024  # Trabajos terminados cuyo resultado aún se puede consultar
+
+EN_COLA = 'en_cola'
+EJECUTANDO = 'ejecutando'
+TERMINADO = 'terminado'
+FALLIDO = 'fallido'
+
+
+class ColaLlena(Exception):
+    """La cola tiene `capacidad` trabajos esperando"""
+
+
+class Trabajo:
+    """Un trabajo encolado: la función a ejecutar, su estado y su resultado"""
+
+    __slots__ = ('id', 'clave', 'funcion', 'estado', 'resultado', 'error', 'degradado', 'detras',
+                 'encolado', 'inicio', 'fin', '_hecho', '_avisos', '_lock_avisos')
+
+    def __init__(self, clave, funcion):
+        self.id = uuid.uuid4().hex
+        self.clave = clave
+        self.funcion = funcion  # funcion(trabajo) -> resultado
+        self.estado = EN_COLA
+        self.resultado = None
+        self.error = None
+        self.degradado = False
+        self.detras = 0  # Trabajos esperando en la cola cuando este empezó
+        self.encolado = time.monotonic()
+        self.inicio = None
+        self.fin = None
+        self._hecho = threading.Event()
+        self._avisos = []
+        self._lock_avisos = threading.Lock()
+
+    @property
+    def terminado(self):
+        return self.estado in (TERMINADO, FALLIDO)
+
+    def esperar(self, segundos=None):
+        """Espera a que termine (None = sin límite); True si ya terminó"""
+        return self._hecho.wait(segundos)
+
+    def avisar(self, funcion):
+        """
+        Llama a funcion(trabajo) cuando termine: desde el hilo trabajador, o
+        ya mismo si ha terminado.
+        """
+        with self._lock_avisos:
+            if not self._hecho.is_set():
+                self._avisos.append(funcion)
+                return
+        funcion(self)
+
+    def _terminar(self):
+        self._hecho.set()
+        # Tras el set: quien llegue a avisar() a partir de aquí llama él mismo
+        with self._lock_avisos:
+            avisos, self._avisos = self._avisos, []
+        for funcion in avisos:
+            funcion(self)
+
+    def segundos_en_cola(self):
+        return (self.inicio or time.monotonic()) - self.encolado
+
+    def segundos_ejecucion(self):
+        if self.inicio is None:
+            return 0.0
+        return (self.fin or time.monotonic()) - self.inicio
+
+    def a_dict(self):
+        return {
+            'id_trabajo': self.id,
+            'estado': self.estado,
+            'degradado': self.degradado,
+            'detras': self.detras,
+            'segundos_en_cola': self.segundos_en_cola(),
+            'segundos_ejecucion': self.segundos_ejecucion()
+        }
+
+
+class ColaTrabajos:
+    """
+    Cola FIFO de Trabajo con `trabajadores` hilos, segura entre hilos.
+
+    Los hilos arrancan con el primer trabajo (no al importar: el recargador
+    de Flask importa el módulo dos veces). al_terminar(trabajo), si se da,
+    se llama desde el hilo trabajador con cada trabajo terminado o fallido.
+    """
+
+    def __init__(self, trabajadores=TRABAJADORES, capacidad=CAPACIDAD_COLA,
+                 umbral_degradacion=UMBRAL_DEGRADACION, conservados=TRABAJOS_CONSERVADOS,
+                 al_terminar=None):
+        self.trabajadores = trabajadores
+        self.capacidad = capacidad
+        self.umbral_degradacion = umbral_degradacion
+        self.conservados = conservados
+        self.al_terminar = al_terminar
+        self._condicion = threading.Condition()
+        self._pendientes = deque()
+        self._trabajos = OrderedDict()  # id -> Trabajo, en orden de envío
+        self._por_clave = {}  # clave -> Trabajo en cola o ejecutándose
+        self._hilos = []
+        self.en_ejecucion = 0
+        self.rechazados = 0
+        self.degradados = 0
+        self.terminados = 0
+        self.fallidos = 0
+
+    def enviar(self, clave, funcion):
+        """
+        Encola funcion(trabajo) y devuelve su Trabajo (o el pendiente de la misma clave).
+
+        Raises:
+            ColaLlena: Si ya hay `capacidad` trabajos esperando
+        """
+        with self._condicion:
+            pendiente = self._por_clave.get(clave)
+            if pendiente is not None:
+                return pendiente
+            if len(self._pendientes) >= self.capacidad:
+                self.rechazados += 1
+                raise ColaLlena(f"{len(self._pendientes)} trabajos en espera")
+            trabajo = Trabajo(clave, funcion)
+            self._pendientes.append(trabajo)
+            self._trabajos[trabajo.id] = trabajo
+            self._por_clave[clave] = trabajo
+            self._olvidar_terminados()
+            self._arrancar_hilos()
+            self._condicion.notify()
+            return trabajo
+
+    def obtener(self, id_trabajo):
+        """Trabajo de un id, o None si no existe o ya se olvidó"""
+        with self._condicion:
+            return self._trabajos.get(id_trabajo)
+
+    def posicion(self, trabajo):
+        """Trabajos por delante de uno en cola (0 si ya empezó o terminó)"""
+        with self._condicion:
+            for indice, pendiente in enumerate(self._pendientes):
+                if pendiente is trabajo:
+                    return indice
+            return 0
+
+    def esperas(self):
+        """Segundos que lleva esperando cada trabajo de la cola, del primero al último"""
+        ahora = time.monotonic()
+        with self._condicion:
+            return [ahora - trabajo.encolado for trabajo in self._pendientes]
+
+    def __len__(self):
+        """Trabajos esperando (sin contar los que se están ejecutando)"""
+        with self._condicion:
+            return len(self._pendientes)
+
+    def resumen(self):
+        with self._condicion:
+            return {
+                'en_cola': len(self._pendientes),
+                'en_ejecucion': self.en_ejecucion,
+                'trabajadores': self.trabajadores,
+                'capacidad': self.capacidad,
+                'rechazados': self.rechazados,
+                'degradados': self.degradados,
+                'terminados': self.terminados,
+                'fallidos': self.fallidos
+            }
+
+    def _arrancar_hilos(self):
+        while len(self._hilos) < self.trabajadores:
+            hilo = threading.Thread(target=self._bucle, daemon=True,
+                                    name=f'trabajador-{len(self._hilos)}')
+            self._hilos.append(hilo)
+            hilo.start()
+
+    def _olvidar_terminados(self):
+        """Quita los trabajos terminados más antiguos por encima de `conservados`"""
+        sobrantes = len(self._trabajos) - self.conservados
+        for id_trabajo in list(self._trabajos):
+            if sobrantes <= 0:
+                break
+            if self._trabajos[id_trabajo].terminado:
+                del self._trabajos[id_trabajo]
+                sobrantes -= 1
+
+    def _bucle(self):
+        while True:
+            with self._condicion:
+                while not self._pendientes:
+                    self._condicion.wait()
+                trabajo = self._pendientes.popleft()
+                # Se decide al empezar: cuenta lo que queda esperando detrás, no lo que había al encolar
+                trabajo.detras = len(self._pendientes)
+                trabajo.degradado = trabajo.detras >= self.umbral_degradacion
+                if trabajo.degradado:
+                    self.degradados += 1
+                trabajo.estado = EJECUTANDO
+                trabajo.inicio = time.monotonic()
+                self.en_ejecucion += 1
+
+            try:
+                trabajo.resultado = trabajo.funcion(trabajo)
+                estado = TERMINADO
+            except Exception as error:
+                print(f"❌ Trabajo {trabajo.id} fallido: {error!r}")
+                trabajo.error = str(error)
+                estado = FALLIDO
+
+            with self._condicion:
+                trabajo.fin = time.monotonic()
+                trabajo.estado = estado
+                self.en_ejecucion -= 1
+                if estado == TERMINADO:
+                    self.terminados += 1
+                else:
+                    self.fallidos += 1
+                if self._por_clave.get(trabajo.clave) is trabajo:
+                    del self._por_clave[trabajo.clave]
+            trabajo._terminar()
+            if self.al_terminar is not None:
+                self.al_terminar(trabajo)
@@ -0,0 +1,147 @@
+"""
+Hashing Zobrist y tabla de transposición para la poda alfa-beta.
+
+La clave de un nodo combina la posición de Pacman, la de cada fantasma (por
+índice), el fantasma al que le toca mover, las cápsulas, los power-ups aún
+disponibles, los turnos de poder restantes y la puntuación y turnos jugados
+(que también entran en evaluar). Las capas de cápsulas y
+power-ups se mantienen de forma incremental en el estado (clave_capsulas,
+clave_power_ups); el resto son unas pocas lecturas de tabla por nodo.
+"""
+import random
+
+from .laberinto import LABERINTOS_EN_CACHE, CacheAcotada
+
+EXACTA = 0
+COTA_INFERIOR = 1  # el valor real es >= valor guardado (corte beta)
+COTA_SUPERIOR = 2  # el valor real es <= valor guardado (corte alfa)
+
+MAX_TURNOS_PODER = 256
+CAPACIDAD_POR_DEFECTO = 1 << 16
+_MEZCLA = 0x9E3779B97F4A7C15
+_MASCARA_64 = (1 << 64) - 1
+
+
+class ClavesZobrist:
+    """Números aleatorios de 64 bits por celda y componente, fijos por laberinto"""
+
+    def __init__(self, laberinto):
+        self._semilla = laberinto.huella
+        generador = random.Random(f"{self._semilla}:base")
+        num_celdas = len(laberinto.coordenadas)
+
+        self.pacman = [generador.getrandbits(64) for _ in range(num_celdas)]
+        self.capsulas = [generador.getrandbits(64) for _ in range(num_celdas)]
+        self.power_ups = [generador.getrandbits(64) for _ in range(num_celdas)]
+        self.poder = [generador.getrandbits(64) for _ in range(MAX_TURNOS_PODER)]
+        self.turno_pacman = generador.getrandbits(64)
+        self._num_celdas = num_celdas
+        self._fantasmas = []
+        self._turno_fantasma = []
+        self._laberinto = laberinto
+
+    def __reduce__(self):
+        # Entre procesos viaja solo el laberinto; las claves se regeneran iguales
+        return (claves_zobrist, (self._laberinto,))
+
+    def fantasma(self, indice):
+        """Claves por celda del fantasma con ese índice (se generan al primer uso)"""
+        while len(self._fantasmas) <= indice:
+            generador = random.Random(f"{self._semilla}:fantasma:{len(self._fantasmas)}")
+            self._fantasmas.append([generador.getrandbits(64) for _ in range(self._num_celdas)])
+            self._turno_fantasma.append(generador.getrandbits(64))
+        return self._fantasmas[indice]
+
+    def turno_fantasma(self, indice):
+        self.fantasma(indice)
+        return self._turno_fantasma[indice]
+
+    @staticmethod
+    def trayectoria(puntuacion, turnos_totales):
+        """
+        Parte de la clave que depende del camino: evaluar suma la puntuación y
+        resta los turnos, así que dos nodos iguales con distinta historia no
+        valen lo mismo. Determinista (hash de ints), igual en todos los procesos.
+        """
+        return (hash((puntuacion, turnos_totales)) * _MEZCLA) & _MASCARA_64
+
+    @staticmethod
+    def de_mascara(claves, mascara):
+        """XOR de las claves de todos los bits de una máscara"""
+        clave = 0
+        while mascara:
+            bit = mascara & -mascara
+            clave ^= claves[bit.bit_length() - 1]
+            mascara ^= bit
+        return clave
+
+
+_claves_por_laberinto = CacheAcotada(LABERINTOS_EN_CACHE)
+
+
+def claves_zobrist(laberinto):
+    """Claves Zobrist de un laberinto (deterministas: iguales en todos los procesos)"""
+    claves = _claves_por_laberinto.get(laberinto.huella)
+    if claves is None:
+        claves = _claves_por_laberinto.guardar(laberinto.huella, ClavesZobrist(laberinto))
+    return claves
+
+
+class TablaTransposicion:
+    """
+    Tabla de transposición acotada (una entrada por ranura).
+
+    Reemplazo por profundidad: una entrada de una búsqueda anterior se
+    reemplaza siempre; de la búsqueda actual, solo por otra de profundidad
+    igual o mayor. Dura entre turnos de la misma partida.
+    """
+
+    def __init__(self, capacidad=CAPACIDAD_POR_DEFECTO):
+        self.capacidad = capacidad
+        self._entradas = [None] * capacidad
+        self._ocupadas = 0
+        self.generacion = 0
+        self.reiniciar_contadores()
+
+    def reiniciar_contadores(self):
+        self.consultas = 0
+        self.aciertos = 0
+        self.guardados = 0
+        self.colisiones = 0
+
+    def nueva_busqueda(self):
+        """Marca el inicio de una búsqueda (envejece las entradas anteriores)"""
+        self.generacion += 1
+        self.reiniciar_contadores()
+
+    def buscar(self, clave):
+        """
+        Returns:
+            tuple: (profundidad, valor, tipo, mejor_movimiento) o None
+        """
+        self.consultas += 1
+        entrada = self._entradas[clave % self.capacidad]
+        if entrada is None:
+            return None
+        if entrada[0] != clave:
+            # Ranura ocupada por otra posición
+            self.colisiones += 1
+            return None
+        self.aciertos += 1
+        return entrada[1:5]
+
+    def guardar(self, clave, profundidad, valor, tipo, mejor_movimiento=None):
+        ranura = clave % self.capacidad
+        entrada = self._entradas[ranura]
+        if entrada is None:
+            self._ocupadas += 1
+        else:
+            if entrada[0] != clave:
+                self.colisiones += 1
+            if entrada[5] == self.generacion and entrada[1] > profundidad:
+                return
+        self._entradas[ranura] = (clave, profundidad, valor, tipo, mejor_movimiento, self.generacion)
+        self.guardados += 1
+
+    def __len__(self):
+        return self._ocupadas
@@ -0,0 +1 @@
+"""Benchmarks del backend (no son tests: miden tiempos y nodos)."""
@@ -0,0 +1,332 @@
+"""
+Prueba de carga HTTP del servidor, todo en localhost.
+
+Arranca servidor.py (o servidor_asgi.py con --servidor asgi) en un proceso
+aparte, en un puerto libre, y simula --jugadores jugadores a la vez. Cada
+uno crea una partida con /api/iniciar (algoritmo al azar según --algoritmos),
+pide /api/siguiente_turno hasta que termina, consulta /api/estado
+--lecturas veces por turno y piensa --pausa segundos (±50%) entre turnos;
+al terminar empieza otra partida. Se para a los --segundos o cuando cada
+jugador lleva --partidas partidas.
+
+Saca peticiones por segundo, latencia p50/p95/p99 y errores (respuestas que
+no son 2xx, o sin respuesta) por endpoint, las partidas y turnos jugados, y
+la CPU y la memoria máxima del proceso servidor (de /proc; sin /proc no se
+muestran). Los clientes son hilos de este proceso y se llevan su parte de
+CPU: en una máquina con pocos núcleos compiten con el servidor. Todo sale
+de --semilla, aunque los tiempos de cada ejecución cambian el reparto.
+
+Uso:
+    python -m benchmarks.carga
+    python -m benchmarks.carga --jugadores 32 --segundos 60 --pausa 0.5 --algoritmos alfa-beta:3 minimax:1
+    python -m benchmarks.carga --servidor asgi --opciones '{"transposicion": true}' --salida carga.json
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SERVIDORES = {
+    'flask': ['-m', 'flask', '--app', 'servidor', 'run'],
+    'asgi': ['-m', 'uvicorn', 'servidor_asgi:app', '--log-level', 'warning'],
+}
+ARRANQUE_MAXIMO = 30.0  # Segundos esperando a que el servidor responda
+TIEMPO_PETICION = 60.0
+ALGORITMOS = ['minimax:1', 'alfa-beta:2', 'expectimax:1']
+SEMILLA = 1234
+PERCENTILES = (50, 95, 99)
+
+
+def puerto_libre():
+    with socket.socket() as conexion:
+        conexion.bind(('127.0.0.1', 0))
+        return conexion.getsockname()[1]
+
+
+def arrancar_servidor(nombre, puerto):
+    """Proceso del servidor `nombre` escuchando en puerto (ya responde al volver)"""
+    proceso = subprocess.Popen([sys.executable] + SERVIDORES[nombre] + ['--port', str(puerto)], cwd=RAIZ,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    limite = time.monotonic() + ARRANQUE_MAXIMO
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            raise RuntimeError(f"El servidor {nombre} terminó al arrancar (código {proceso.returncode})")
+        try:
+            if peticion(puerto, 'GET', '/api/layouts')[0] == 200:
+                return proceso
+        except OSError:
+            time.sleep(0.2)
+    proceso.kill()
+    raise RuntimeError(f"El servidor {nombre} no respondió en {ARRANQUE_MAXIMO}s")
+
+
+def peticion(puerto, metodo, ruta, cuerpo=None):
+    """(código, JSON de la respuesta o None); una conexión por petición"""
+    conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=TIEMPO_PETICION)
+    try:
+        cabeceras = {}
+        datos = None
+        if cuerpo is not None:
+            datos = json.dumps(cuerpo)
+            cabeceras['Content-Type'] = 'application/json'
+        conexion.request(metodo, ruta, body=datos, headers=cabeceras)
+        respuesta = conexion.getresponse()
+        contenido = respuesta.read()
+        try:
+            return respuesta.status, json.loads(contenido)
+        except ValueError:
+            return respuesta.status, None
+    finally:
+        conexion.close()
+
+
+def percentil(valores, p):
+    """Percentil p (0-100) de valores ya ordenados, por el rango más cercano"""
+    if not valores:
+        return 0.0
+    indice = min(len(valores) - 1, max(0, int(round(p / 100 * len(valores) + 0.5)) - 1))
+    return valores[indice]
+
+
+def cpu_proceso(pid):
+    """Segundos de CPU (usuario + sistema) de un proceso, o None sin /proc"""
+    try:
+        with open(f'/proc/{pid}/stat') as archivo:
+            # El nombre va entre paréntesis y puede tener espacios: se cuenta desde el final
+            campos = archivo.read().rsplit(')', 1)[1].split()
+        return (int(campos[11]) + int(campos[12])) / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def memoria_pico(pid):
+    """Memoria residente máxima de un proceso en MB (VmHWM), o None sin /proc"""
+    try:
+        with open(f'/proc/{pid}/status') as archivo:
+            for linea in archivo:
+                if linea.startswith('VmHWM:'):
+                    return int(linea.split()[1]) / 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+class Registro:
+    """Latencias y códigos de respuesta por endpoint, seguro entre hilos"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencias = {}
+        self.codigos = {}  # endpoint -> Counter de códigos (0 = sin respuesta)
+
+    def medir(self, endpoint, puerto, metodo, ruta, cuerpo=None):
+        """peticion() contada en `endpoint`; sin respuesta devuelve (0, None)"""
+        inicio = time.perf_counter()
+        try:
+            codigo, datos = peticion(puerto, metodo, ruta, cuerpo)
+        except OSError:
+            codigo, datos = 0, None
+        segundos = time.perf_counter() - inicio
+        with self._lock:
+            self.latencias.setdefault(endpoint, []).append(segundos)
+            self.codigos.setdefault(endpoint, Counter())[codigo] += 1
+        return codigo, datos
+
+    def total(self):
+        with self._lock:
+            return sum(len(latencias) for latencias in self.latencias.values())
+
+    def resumen(self, segundos):
+        """Por endpoint: peticiones, por segundo, percentiles (s), errores y códigos"""
+        with self._lock:
+            resultado = {}
+            for endpoint, latencias in sorted(self.latencias.items()):
+                ordenadas = sorted(latencias)
+                codigos = self.codigos[endpoint]
+                errores = sum(cuenta for codigo, cuenta in codigos.items() if not 200 <= codigo < 300)
+                resultado[endpoint] = {
+                    'peticiones': len(ordenadas),
+                    'por_segundo': len(ordenadas) / segundos,
+                    **{f'p{p}': percentil(ordenadas, p) for p in PERCENTILES},
+                    'errores': errores / len(ordenadas),
+                    'codigos': {str(codigo): cuenta for codigo, cuenta in sorted(codigos.items())}
+                }
+            return resultado
+
+
+def imprimir_endpoints(resumen):
+    for endpoint, datos in resumen.items():
+        errores = {codigo: cuenta for codigo, cuenta in datos['codigos'].items()
+                   if not 200 <= int(codigo) < 300}
+        print(f"    {endpoint:22} {datos['por_segundo']:8.1f}/s  " +
+              '  '.join(f"p{p} {datos[f'p{p}'] * 1000:7.1f}ms" for p in PERCENTILES) +
+              f"  errores {datos['errores']:.1%}" + (f" {errores}" if errores else ''))
+
+
+def leer_algoritmos(especificacion):
+    """['alfa-beta:2', 'minimax'] -> (['alfa-beta', 'minimax'], [2.0, 1.0])"""
+    nombres, pesos = [], []
+    for elemento in especificacion:
+        nombre, _, peso = elemento.partition(':')
+        peso = float(peso) if peso else 1.0
+        if peso < 0:
+            raise ValueError(f"Peso negativo en {elemento}")
+        nombres.append(nombre)
+        pesos.append(peso)
+    if not any(pesos):
+        raise ValueError("Hace falta algún algoritmo con peso positivo")
+    return nombres, pesos
+
+
+class Jugador:
+    """Un cliente que juega partidas enteras (ver el docstring del módulo)"""
+
+    def __init__(self, indice, puerto, registro, args, algoritmos, opciones, parar):
+        self.aleatorio = random.Random(args.semilla + indice)
+        self.puerto = puerto
+        self.registro = registro
+        self.args = args
+        self.algoritmos = algoritmos
+        self.opciones = opciones
+        self.parar = parar
+        self.partidas_iniciadas = 0
+        self.partidas_terminadas = 0
+        self.turnos = 0
+        self.por_algoritmo = Counter()
+
+    def jugar(self):
+        while not self.parar.is_set() and (not self.args.partidas or
+                                           self.partidas_iniciadas < self.args.partidas):
+            algoritmo = self.aleatorio.choices(*self.algoritmos)[0]
+            codigo, datos = self.registro.medir(
+                '/api/iniciar', self.puerto, 'POST', '/api/iniciar',
+                {'algoritmo': algoritmo, 'profundidad': self.args.profundidad, **self.opciones})
+            if codigo != 200:
+                self._pensar()
+                continue
+            self.partidas_iniciadas += 1
+            self.por_algoritmo[algoritmo] += 1
+            if self._partida(datos['id_juego'], datos['version']):
+                self.partidas_terminadas += 1
+
+    def _partida(self, id_juego, version):
+        """Turnos hasta el final; True si la partida terminó (no cortada por --segundos)"""
+        while not self.parar.is_set():
+            codigo, datos = self.registro.medir('/api/siguiente_turno', self.puerto, 'POST',
+                                                '/api/siguiente_turno', {'id_juego': id_juego, 'version': version})
+            if codigo == 200:
+                self.turnos += 1
+                version = datos.get('version', version)
+                if datos['terminado']:
+                    return True
+            elif codigo == 404:
+                return False  # Expirada: otra partida
+            for _ in range(self.args.lecturas):
+                self.registro.medir('/api/estado', self.puerto, 'GET', f'/api/estado?id_juego={id_juego}')
+            self._pensar()
+        return False
+
+    def _pensar(self):
+        if self.args.pausa:
+            self.parar.wait(self.args.pausa * self.aleatorio.uniform(0.5, 1.5))
+
+
+def ejecutar(args, algoritmos, opciones):
+    """Arranca el servidor, lanza los jugadores y devuelve el resultado completo"""
+    puerto = puerto_libre()
+    proceso = arrancar_servidor(args.servidor, puerto)
+    registro = Registro()
+    parar = threading.Event()
+    jugadores = [Jugador(indice, puerto, registro, args, algoritmos, opciones, parar)
+                 for indice in range(args.jugadores)]
+    hilos = [threading.Thread(target=jugador.jugar, daemon=True) for jugador in jugadores]
+    try:
+        cpu_inicial = cpu_proceso(proceso.pid)
+        cpu_cliente = time.process_time()
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.start()
+        limite = inicio + args.segundos
+        for hilo in hilos:
+            hilo.join(max(limite - time.perf_counter(), 0))
+        parar.set()
+        for hilo in hilos:
+            hilo.join(TIEMPO_PETICION)
+        segundos = time.perf_counter() - inicio
+        cpu_final = cpu_proceso(proceso.pid)
+        memoria = memoria_pico(proceso.pid)
+        cpu_cliente = time.process_time() - cpu_cliente
+    finally:
+        proceso.terminate()
+        proceso.wait()
+
+    cpu_servidor = cpu_final - cpu_inicial if cpu_inicial is not None and cpu_final is not None else None
+    return {
+        'servidor': args.servidor,
+        'jugadores': args.jugadores,
+        'segundos': segundos,
+        'peticiones': registro.total(),
+        'peticiones_por_segundo': registro.total() / segundos,
+        'partidas_iniciadas': sum(jugador.partidas_iniciadas for jugador in jugadores),
+        'partidas_terminadas': sum(jugador.partidas_terminadas for jugador in jugadores),
+        'turnos': sum(jugador.turnos for jugador in jugadores),
+        'por_algoritmo': dict(sum((jugador.por_algoritmo for jugador in jugadores), Counter())),
+        'cpu_servidor': cpu_servidor,  # Segundos de CPU del proceso servidor
+        'memoria_servidor_mb': memoria,
+        'cpu_cliente': cpu_cliente,
+        'nucleos': os.cpu_count(),
+        'endpoints': registro.resumen(segundos)
+    }
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description='Carga HTTP local con jugadores simulados')
+    parser.add_argument('--servidor', choices=sorted(SERVIDORES), default='flask')
+    parser.add_argument('--jugadores', type=int, default=8)
+    parser.add_argument('--segundos', type=float, default=30.0, help='Duración máxima')
+    parser.add_argument('--partidas', type=int, default=0, help='Partidas por jugador (0 = sin límite)')
+    parser.add_argument('--pausa', type=float, default=0.2, help='Segundos que piensa cada jugador entre turnos')
+    parser.add_argument('--lecturas', type=int, default=1, help='Consultas a /api/estado por turno')
+    parser.add_argument('--algoritmos', nargs='+', default=ALGORITMOS, metavar='ALGORITMO[:PESO]',
+                        help='Reparto de algoritmos entre las partidas')
+    parser.add_argument('--profundidad', type=int, default=2)
+    parser.add_argument('--opciones', default='{}', help='JSON que se añade a cada /api/iniciar')
+    parser.add_argument('--semilla', type=int, default=SEMILLA)
+    parser.add_argument('--salida', help='Archivo JSON de resultados')
+    args = parser.parse_args(argumentos)
+    try:
+        algoritmos = leer_algoritmos(args.algoritmos)
+        opciones = json.loads(args.opciones)
+    except ValueError as error:
+        parser.error(str(error))
+
+    resultado = ejecutar(args, algoritmos, opciones)
+
+    segundos = resultado['segundos']
+    print(f"[BENCH] {resultado['servidor']}, {resultado['jugadores']} jugadores, {segundos:.1f}s: "
+          f"{resultado['peticiones_por_segundo']:.1f} peticiones/s, {resultado['turnos']} turnos, "
+          f"{resultado['partidas_terminadas']}/{resultado['partidas_iniciadas']} partidas terminadas "
+          f"{resultado['por_algoritmo']}")
+    imprimir_endpoints(resultado['endpoints'])
+    if resultado['cpu_servidor'] is not None:
+        print(f"[BENCH] CPU del servidor: {resultado['cpu_servidor']:.1f}s "
+              f"({resultado['cpu_servidor'] / segundos:.0%} de un núcleo, {resultado['nucleos']} núcleos), "
+              f"memoria máxima {resultado['memoria_servidor_mb']:.0f}MB; "
+              f"CPU de los clientes {resultado['cpu_cliente']:.1f}s")
+
+    if args.salida:
+        with open(args.salida, 'w') as archivo:
+            json.dump(resultado, archivo, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
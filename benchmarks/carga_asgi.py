@@ -0,0 +1,146 @@
+"""
+Carga local: servidor.py (Flask) frente a servidor_asgi.py (uvicorn).
+
+Arranca cada servidor en un proceso aparte en un puerto libre de
+localhost y le aplica la misma carga durante --segundos:
+
+- --jugadores hilos que crean una partida de alfa-beta y piden
+  /api/siguiente_turno hasta que termina (y entonces empiezan otra)
+- --lectores hilos que piden /api/estado de una partida al azar sin pausa
+- --transmisiones conexiones abiertas a /api/stream, leyendo eventos
+
+Por servidor saca peticiones por segundo, latencia p50/p95/p99 y errores
+(respuestas que no son 2xx, o sin respuesta) de cada endpoint, y los turnos
+recibidos por las transmisiones. Los clientes son hilos de este proceso: en
+una máquina con pocos núcleos compiten con el servidor por la CPU, así que
+las cifras valen para comparar los dos servidores entre sí, no como
+capacidad absoluta.
+
+Uso:
+    python -m benchmarks.carga_asgi
+    python -m benchmarks.carga_asgi --segundos 30 --jugadores 8 --lectores 32 --transmisiones 64
+"""
+import argparse
+import http.client
+import random
+import sys
+import threading
+import time
+
+from .carga import (SERVIDORES, TIEMPO_PETICION, Registro, arrancar_servidor, imprimir_endpoints,
+                    puerto_libre)
+
+
+class RegistroTransmisiones(Registro):
+    """Registro que además cuenta los turnos recibidos por las transmisiones"""
+
+    def __init__(self):
+        super().__init__()
+        self.turnos_transmitidos = 0
+
+    def turno_transmitido(self):
+        with self._lock:
+            self.turnos_transmitidos += 1
+
+
+def _jugador(puerto, registro, partidas, parar, profundidad):
+    while not parar.is_set():
+        codigo, datos = registro.medir('/api/iniciar', puerto, 'POST', '/api/iniciar',
+                                       {'algoritmo': 'alfa-beta', 'profundidad': profundidad})
+        if codigo != 200:
+            time.sleep(0.1)
+            continue
+        id_juego, version = datos['id_juego'], datos['version']
+        partidas.append(id_juego)
+        while not parar.is_set():
+            codigo, datos = registro.medir('/api/siguiente_turno', puerto, 'POST', '/api/siguiente_turno',
+                                           {'id_juego': id_juego, 'version': version})
+            if codigo != 200:
+                time.sleep(0.1)
+                continue
+            version = datos.get('version', version)
+            if datos['terminado']:
+                break
+
+
+def _lector(puerto, registro, partidas, parar):
+    aleatorio = random.Random(threading.get_ident())
+    while not parar.is_set():
+        if not partidas:
+            time.sleep(0.05)
+            continue
+        registro.medir('/api/estado', puerto, 'GET', f"/api/estado?id_juego={aleatorio.choice(partidas)}")
+
+
+def _transmision(puerto, registro, parar, profundidad, ritmo):
+    """Una partida propia reproducida por /api/stream; cuenta los eventos de turno"""
+    codigo, datos = registro.medir('/api/iniciar', puerto, 'POST', '/api/iniciar',
+                                   {'algoritmo': 'alfa-beta', 'profundidad': profundidad})
+    if codigo != 200:
+        return
+    conexion = http.client.HTTPConnection('127.0.0.1', puerto, timeout=TIEMPO_PETICION)
+    try:
+        conexion.request('GET', f"/api/stream?id_juego={datos['id_juego']}&ritmo={ritmo}&ventana=0")
+        respuesta = conexion.getresponse()
+        for linea in respuesta:
+            if parar.is_set() or linea.startswith(b'event: fin'):
+                break
+            if linea.startswith(b'event: turno'):
+                registro.turno_transmitido()
+    except OSError:
+        pass
+    finally:
+        conexion.close()
+
+
+def medir_servidor(nombre, args):
+    """Arranca el servidor, le aplica la carga y devuelve (Registro, segundos)"""
+    puerto = puerto_libre()
+    proceso = arrancar_servidor(nombre, puerto)
+    registro = RegistroTransmisiones()
+    partidas = []
+    parar = threading.Event()
+    hilos = ([threading.Thread(target=_jugador, args=(puerto, registro, partidas, parar, args.profundidad))
+              for _ in range(args.jugadores)] +
+             [threading.Thread(target=_lector, args=(puerto, registro, partidas, parar))
+              for _ in range(args.lectores)] +
+             [threading.Thread(target=_transmision, args=(puerto, registro, parar, args.profundidad, args.ritmo))
+              for _ in range(args.transmisiones)])
+    try:
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.daemon = True
+            hilo.start()
+        time.sleep(args.segundos)
+        parar.set()
+        segundos = time.perf_counter() - inicio
+        for hilo in hilos:
+            hilo.join(TIEMPO_PETICION)
+    finally:
+        proceso.terminate()
+        proceso.wait()
+    return registro, segundos
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description='Carga local de servidor.py frente a servidor_asgi.py')
+    parser.add_argument('--servidores', nargs='+', choices=sorted(SERVIDORES), default=['flask', 'asgi'])
+    parser.add_argument('--segundos', type=float, default=15.0)
+    parser.add_argument('--jugadores', type=int, default=4)
+    parser.add_argument('--lectores', type=int, default=16)
+    parser.add_argument('--transmisiones', type=int, default=16)
+    parser.add_argument('--profundidad', type=int, default=3)
+    parser.add_argument('--ritmo', type=float, default=0.2, help='Segundos entre turnos de las transmisiones')
+    args = parser.parse_args(argumentos)
+
+    for nombre in args.servidores:
+        registro, segundos = medir_servidor(nombre, args)
+        print(f"[BENCH] {nombre}: {registro.total() / segundos:.1f} peticiones/s, "
+              f"{registro.turnos_transmitidos / segundos:.1f} turnos/s transmitidos "
+              f"({args.jugadores} jugadores, {args.lectores} lectores, {args.transmisiones} transmisiones)")
+        imprimir_endpoints(registro.resumen(segundos))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Búsquedas a la vez en varios hilos del mismo proceso.
+
+Cada decisión lleva su ContextoBusqueda, así que buscar las mismas
+posiciones desde varios hilos a la vez tiene que dar exactamente lo mismo
+que buscarlas una detrás de otra: movimiento, valor y nodos. Se decide cada
+posición en serie y luego todas repartidas entre --hilos hilos; cualquier
+diferencia se lista y el programa sale con código 1.
+
+También mide la cancelación: lanza una búsqueda sin límite en otro hilo, la
+cancela con contexto.cancelar() y cuenta lo que tarda en devolver el
+movimiento (tiene que ser del orden de INTERVALO_RELOJ nodos).
+
+Uso:
+    python -m benchmarks.concurrencia
+    python -m benchmarks.concurrencia --partidas 4 --hilos 8
+"""
+import argparse
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from backend import expectimax, minimax, poda_alfa_beta
+from backend.contexto import INTERVALO_RELOJ, ContextoBusqueda
+from backend.estadisticas import EstadisticasBusqueda, sin_log
+
+from .partidas import posiciones
+
+# (nombre, función de decisión, profundidad, kwargs)
+CONFIGURACIONES = [
+    ('minimax p2', minimax.decision_minimax, 2, {}),
+    ('alfa-beta p4', poda_alfa_beta.decision_alfa_beta, 4, {'modo_en_sitio': True}),
+    ('alfa-beta p3 macro', poda_alfa_beta.decision_alfa_beta, 3, {'macro_movimientos': True}),
+    ('alfa-beta iterativo 5000 nodos', poda_alfa_beta.decision_alfa_beta, None,
+     {'iterativo': True, 'nodos_maximos': 5000}),
+    ('expectimax p2', expectimax.decision_expectimax, 2, {}),
+]
+ESPERA_CANCELACION = 0.2  # Segundos de búsqueda antes de cancelar
+
+
+def _decidir(configuracion, estado):
+    _, decision, profundidad, opciones = configuracion
+    estadisticas = EstadisticasBusqueda()
+    with sin_log():  # Solo vale en su hilo: cada hilo del pool apaga el suyo
+        movimiento = decision(estado, profundidad, estadisticas_busqueda=estadisticas, **opciones)
+    return movimiento, estadisticas.valor, estadisticas.nodos_explorados
+
+
+def comparar(estados, hilos):
+    """
+    Decide cada (configuración, posición) en serie y con `hilos` hilos a la vez.
+
+    Returns:
+        tuple: (diferencias [(configuración, indice, serie, hilos)], segundos en serie, segundos con hilos)
+    """
+    tareas = [(configuracion, indice) for configuracion in CONFIGURACIONES
+              for indice in range(len(estados))]
+
+    inicio = time.perf_counter()
+    en_serie = [_decidir(configuracion, estados[indice]) for configuracion, indice in tareas]
+    segundos_serie = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(hilos) as pool:
+        en_hilos = list(pool.map(lambda tarea: _decidir(tarea[0], estados[tarea[1]]), tareas))
+    segundos_hilos = time.perf_counter() - inicio
+
+    diferencias = [(configuracion[0], indice, serie, paralelo)
+                   for (configuracion, indice), serie, paralelo in zip(tareas, en_serie, en_hilos)
+                   if serie != paralelo]
+    return diferencias, segundos_serie, segundos_hilos
+
+
+def medir_cancelacion(estado):
+    """
+    Cancela desde este hilo una búsqueda sin límite que corre en otro.
+
+    Returns:
+        dict: segundos desde cancelar() hasta que devuelve, nodos, movimiento y estadísticas
+    """
+    contexto = ContextoBusqueda()
+    estadisticas = EstadisticasBusqueda('alfa-beta')
+    resultado = {}
+
+    def buscar():
+        with sin_log():
+            resultado['movimiento'] = poda_alfa_beta.decision_alfa_beta(
+                estado, None, iterativo=True, tiempo_maximo=float('inf'),
+                estadisticas_busqueda=estadisticas, contexto=contexto)
+        resultado['fin'] = time.perf_counter()
+
+    hilo = threading.Thread(target=buscar)
+    hilo.start()
+    time.sleep(ESPERA_CANCELACION)
+    cancelado = time.perf_counter()
+    contexto.cancelar()
+    hilo.join()
+    return {
+        'segundos': resultado['fin'] - cancelado,
+        'nodos': estadisticas.nodos_explorados,
+        'movimiento': resultado['movimiento'],
+        'cancelada': estadisticas.cancelada,
+        'profundidad_alcanzada': estadisticas.profundidad_alcanzada
+    }
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description='Búsquedas concurrentes en hilos y cancelación')
+    parser.add_argument('--partidas', type=int, default=2)
+    parser.add_argument('--turnos', type=int, default=20, help='Posiciones por partida')
+    parser.add_argument('--hilos', type=int, default=4)
+    args = parser.parse_args(argumentos)
+
+    # Sin límite de tiempo: un corte por reloj daría nodos distintos en cada ejecución
+    modulos = (minimax, poda_alfa_beta, expectimax)
+    tiempos_originales = [modulo.TIEMPO_MAXIMO for modulo in modulos]
+    for modulo in modulos:
+        modulo.TIEMPO_MAXIMO = float('inf')
+    try:
+        with sin_log():
+            estados = posiciones(args.partidas, args.turnos)
+            diferencias, segundos_serie, segundos_hilos = comparar(estados, args.hilos)
+            cancelacion = medir_cancelacion(estados[0])
+    finally:
+        for modulo, tiempo in zip(modulos, tiempos_originales):
+            modulo.TIEMPO_MAXIMO = tiempo
+
+    decisiones = len(estados) * len(CONFIGURACIONES)
+    print(f"[BENCH] {decisiones} decisiones: {segundos_serie:.2f}s en serie, "
+          f"{segundos_hilos:.2f}s con {args.hilos} hilos, {len(diferencias)} distintas")
+    for nombre, indice, serie, hilos in diferencias:
+        print(f"    {nombre}, posición {indice}: en serie {serie}, con hilos {hilos}")
+    print(f"[BENCH] Cancelación tras {ESPERA_CANCELACION}s: devuelve en "
+          f"{cancelacion['segundos'] * 1000:.1f}ms ({cancelacion['nodos']} nodos, profundidad "
+          f"{cancelacion['profundidad_alcanzada']}, movimiento {cancelacion['movimiento']}, "
+          f"cancelada={cancelacion['cancelada']}; reloj cada {INTERVALO_RELOJ} nodos)")
+    return 1 if diferencias or not cancelacion['cancelada'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Escalado con el tamaño del tablero y el número de fantasmas.
+
+Para cada laberinto (el clásico y generados con semilla de lado creciente)
+y cada número de fantasmas mide, desde la posición inicial:
+
+- mover_fantasmas: microsegundos por llamada (mejor de varias rondas)
+- alfa-beta a profundidad fija con un tope de nodos (con muchos fantasmas
+  el árbol crece como 4^(profundidad * fantasmas)): nodos, segundos y
+  nodos por segundo
+- expectimax a profundidad fija con tiempo por movimiento: segundos hasta
+  decidir (solo ramifican los FANTASMAS_RAMIFICADOS más cercanos, así que
+  no debería pasar del tiempo aunque haya muchos fantasmas)
+- el laberinto: celdas, si usa la tabla densa o filas bajo demanda, y
+  cuántas filas de distancias hay en caché después de jugar
+
+Todo sale de semillas fijas. La tabla densa se carga del disco si ya
+existe; la primera ejecución con un tablero nuevo incluye su compilación
+en el arranque, no en las medidas.
+
+Uso:
+    python -m benchmarks.escalado
+    python -m benchmarks.escalado --lados 31 61 101 --fantasmas 1 3 8 16 --profundidad 3 --nodos 50000
+    python -m benchmarks.escalado --lados 41 --fantasmas 8 14 18 22 32 --profundidad-expectimax 2 --tiempo 1.0
+"""
+import argparse
+import random
+import time
+
+from backend import expectimax, poda_alfa_beta
+from backend.estadisticas import EstadisticasBusqueda, sin_log
+from backend.juego import EstadoJuego
+from backend.mapas import generar_laberinto
+
+SEMILLA = 1234
+RONDAS = 5
+MOVIMIENTOS_FANTASMAS = 50
+NODOS_MAXIMOS = 20000
+TIEMPO_EXPECTIMAX = 1.0
+
+
+def _partida(tablero, num_fantasmas):
+    random.seed(SEMILLA)
+    return EstadoJuego(tablero, num_fantasmas)
+
+
+def medir_fantasmas(tablero, num_fantasmas):
+    """Microsegundos por mover_fantasmas (mejor ronda de RONDAS)"""
+    mejor = float('inf')
+    for _ in range(RONDAS):
+        estado = _partida(tablero, num_fantasmas)
+        inicio = time.perf_counter()
+        for _ in range(MOVIMIENTOS_FANTASMAS):
+            estado.mover_fantasmas()
+        mejor = min(mejor, (time.perf_counter() - inicio) / MOVIMIENTOS_FANTASMAS)
+    return mejor * 1e6
+
+
+def medir_busqueda(tablero, num_fantasmas, profundidad, nodos_maximos=NODOS_MAXIMOS):
+    """Nodos y segundos de decision_alfa_beta desde la posición inicial"""
+    estado = _partida(tablero, num_fantasmas)
+    estadisticas = EstadisticasBusqueda('alfa-beta')
+    with sin_log():
+        inicio = time.perf_counter()
+        poda_alfa_beta.decision_alfa_beta(estado, profundidad, tiempo_maximo=float('inf'),
+                                          nodos_maximos=nodos_maximos, estadisticas_busqueda=estadisticas)
+        segundos = time.perf_counter() - inicio
+    return estadisticas.nodos_explorados, segundos, estado.laberinto
+
+
+def medir_expectimax(tablero, num_fantasmas, profundidad, tiempo_maximo=TIEMPO_EXPECTIMAX):
+    """Nodos, segundos y si se agotó el tiempo de decision_expectimax desde la posición inicial"""
+    estado = _partida(tablero, num_fantasmas)
+    estadisticas = EstadisticasBusqueda('expectimax')
+    with sin_log():
+        inicio = time.perf_counter()
+        expectimax.decision_expectimax(estado, profundidad, tiempo_maximo=tiempo_maximo,
+                                       estadisticas_busqueda=estadisticas)
+        segundos = time.perf_counter() - inicio
+    return estadisticas.nodos_explorados, segundos, estadisticas.timeout
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description='Coste por tamaño de tablero y número de fantasmas')
+    parser.add_argument('--lados', nargs='+', type=int, default=[31, 61, 101, 151],
+                        help='lados de los laberintos generados (además del clásico)')
+    parser.add_argument('--fantasmas', nargs='+', type=int, default=[1, 3, 8, 16])
+    parser.add_argument('--profundidad', type=int, default=3)
+    parser.add_argument('--nodos', type=int, default=NODOS_MAXIMOS, help='tope de nodos por búsqueda')
+    parser.add_argument('--profundidad-expectimax', type=int, default=2)
+    parser.add_argument('--tiempo', type=float, default=TIEMPO_EXPECTIMAX,
+                        help='segundos por movimiento de expectimax')
+    args = parser.parse_args(argumentos)
+
+    tableros = [('clasico', None)] + [(f"{lado}x{lado}", generar_laberinto(lado, lado, SEMILLA))
+                                       for lado in args.lados]
+    for nombre, tablero in tableros:
+        for num_fantasmas in args.fantasmas:
+            try:
+                _partida(tablero, num_fantasmas)
+            except ValueError as error:
+                print(f"[BENCH] {nombre} fantasmas={num_fantasmas}: {error}")
+                continue
+            microsegundos = medir_fantasmas(tablero, num_fantasmas)
+            nodos, segundos, laberinto = medir_busqueda(tablero, num_fantasmas, args.profundidad, args.nodos)
+            modo = (f"filas bajo demanda ({len(laberinto._filas_distancias)} en caché)"
+                    if laberinto.distancias_por_fila else "tabla densa")
+            print(f"[BENCH] {nombre} ({len(laberinto.indices_libres)} celdas, {modo}) fantasmas={num_fantasmas}: "
+                  f"mover_fantasmas {microsegundos:.1f}us, alfa-beta p={args.profundidad} "
+                  f"{nodos} nodos en {segundos:.3f}s ({nodos / segundos:.0f} nodos/s)")
+            nodos, segundos, timeout = medir_expectimax(tablero, num_fantasmas, args.profundidad_expectimax,
+                                                        args.tiempo)
+            print(f"[BENCH] {nombre} fantasmas={num_fantasmas}: expectimax p={args.profundidad_expectimax} "
+                  f"{nodos} nodos en {segundos:.3f}s (límite {args.tiempo:.1f}s"
+                  f"{', agotado' if timeout else ''})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+"""
+Posiciones de partidas con semillas fijas para los benchmarks que comparan
+dos formas de decidir la misma posición (reanudable.py, concurrencia.py).
+"""
+import random
+
+from backend import poda_alfa_beta
+from backend.estadisticas import sin_log
+from backend.juego import EstadoJuego
+
+SEMILLA = 1234
+TURNOS_POR_PARTIDA = 60
+
+
+def posiciones(partidas, turnos=TURNOS_POR_PARTIDA):
+    """Posiciones de partidas jugadas por alfa-beta a profundidad 2 (semillas SEMILLA, SEMILLA+1...)"""
+    resultado = []
+    for semilla in range(SEMILLA, SEMILLA + partidas):
+        random.seed(semilla)
+        juego = EstadoJuego()
+        for _ in range(turnos):
+            if juego.juego_terminado:
+                break
+            resultado.append(juego.clonar())
+            with sin_log():
+                movimiento = poda_alfa_beta.decision_alfa_beta(juego, 2)
+            juego.mover_pacman(movimiento)
+            if not juego.juego_terminado:
+                juego.mover_fantasmas()
+    return resultado
@@ -0,0 +1,158 @@
+"""
+Búsquedas reanudables (reanudable.py) con pausas frente a sin ellas.
+
+Tres medidas sobre posiciones de partidas con semillas fijas:
+
+- Equivalencia: cada posición se decide con decision_* (sin pausas) y con
+  busqueda_* intercalando todas las posiciones en un PlanificadorBusquedas. Movimiento,
+  valor y nodos tienen que coincidir; cualquier diferencia se lista y el
+  programa sale con código 1.
+- Coste: nodos por segundo de decision_* y de busqueda_* con
+  --nodos-por-paso (completar, sin otras búsquedas): lo que cuestan las pausas.
+- Reparto: búsquedas largas y una corta en el mismo planificador. Con
+  round-robin la corta termina tras unos pocos pasos de cada larga, no
+  detrás de todas ellas.
+
+Uso:
+    python -m benchmarks.reanudable
+    python -m benchmarks.reanudable --partidas 3 --nodos-por-paso 500
+"""
+import argparse
+import sys
+import time
+
+from backend import minimax, poda_alfa_beta
+from backend.estadisticas import EstadisticasBusqueda, sin_log
+from backend.reanudable import NODOS_POR_PASO, PlanificadorBusquedas, completar
+
+from .partidas import posiciones
+
+# (nombre, decision, busqueda, profundidad, kwargs)
+CONFIGURACIONES = [
+    ('minimax p3', minimax.decision_minimax, minimax.busqueda_minimax, 3, {}),
+    ('alfa-beta p4', poda_alfa_beta.decision_alfa_beta, poda_alfa_beta.busqueda_alfa_beta, 4,
+     {'modo_en_sitio': True}),
+    ('alfa-beta p5 tt+orden', poda_alfa_beta.decision_alfa_beta, poda_alfa_beta.busqueda_alfa_beta, 5,
+     {'usar_transposicion': True, 'ordenamiento': True, 'iterativo': True}),
+    ('alfa-beta iterativo 20000 nodos', poda_alfa_beta.decision_alfa_beta, poda_alfa_beta.busqueda_alfa_beta,
+     None, {'iterativo': True, 'nodos_maximos': 20000, 'macro_movimientos': True}),
+]
+BUSQUEDAS_LARGAS = 8
+
+
+def _resultado(movimiento, estadisticas):
+    return movimiento, estadisticas.valor, estadisticas.nodos_explorados
+
+
+def comparar(estados, configuracion, nodos_por_paso):
+    """
+    Decide cada posición sin pausas y todas intercaladas con pausas.
+
+    Las posiciones se clonan para cada modo: la tabla de transposición y el
+    ordenador duran toda la partida y cada modo tiene que empezar con los suyos vacíos.
+
+    Returns:
+        tuple: (diferencias [(indice, sin pausas, con pausas)], pausas)
+    """
+    _, decision, busqueda, profundidad, opciones = configuracion
+    sin_pausas = []
+    for estado in estados:
+        estadisticas = EstadisticasBusqueda()
+        movimiento = decision(estado.clonar(), profundidad, estadisticas_busqueda=estadisticas, **opciones)
+        sin_pausas.append(_resultado(movimiento, estadisticas))
+
+    planificador = PlanificadorBusquedas()
+    tareas = []
+    for estado in estados:
+        estadisticas = EstadisticasBusqueda()
+        tarea = planificador.agregar(busqueda(estado.clonar(), profundidad, estadisticas_busqueda=estadisticas,
+                                              nodos_por_paso=nodos_por_paso, **opciones))
+        tareas.append((tarea, estadisticas))
+    planificador.ejecutar()
+
+    diferencias = []
+    pausas = 0
+    for indice, (directa, (tarea, estadisticas)) in enumerate(zip(sin_pausas, tareas)):
+        reanudada = _resultado(tarea.resultado, estadisticas)
+        pausas += tarea.pasos - 1
+        if directa != reanudada:
+            diferencias.append((indice, directa, reanudada))
+    return diferencias, pausas
+
+
+def medir_coste(estados, configuracion, nodos_por_paso):
+    """Nodos por segundo (sin pausas, con pausas) decidiendo todas las posiciones una tras otra"""
+    _, decision, busqueda, profundidad, opciones = configuracion
+    velocidades = []
+    for reanudable in (False, True):
+        nodos = 0
+        inicio = time.perf_counter()
+        for estado in estados:
+            estadisticas = EstadisticasBusqueda()
+            if reanudable:
+                completar(busqueda(estado.clonar(), profundidad, estadisticas_busqueda=estadisticas,
+                                   nodos_por_paso=nodos_por_paso, **opciones))
+            else:
+                decision(estado.clonar(), profundidad, estadisticas_busqueda=estadisticas, **opciones)
+            nodos += estadisticas.nodos_explorados
+        velocidades.append(nodos / (time.perf_counter() - inicio))
+    return velocidades
+
+
+def medir_reparto(estado, nodos_por_paso):
+    """
+    BUSQUEDAS_LARGAS búsquedas de alfa-beta a profundidad 5 y una a
+    profundidad 3 que llega la última al planificador.
+
+    Returns:
+        dict: segundos hasta que termina la corta, segundos hasta que terminan todas
+    """
+    planificador = PlanificadorBusquedas()
+    fines = {}
+    inicio = time.perf_counter()
+    for indice in range(BUSQUEDAS_LARGAS):
+        planificador.agregar(poda_alfa_beta.busqueda_alfa_beta(estado.clonar(), 5, modo_en_sitio=True,
+                                                               nodos_por_paso=nodos_por_paso),
+                             al_terminar=lambda tarea, indice=indice: fines.setdefault(
+                                 indice, time.perf_counter() - inicio))
+    planificador.agregar(poda_alfa_beta.busqueda_alfa_beta(estado.clonar(), 3, modo_en_sitio=True,
+                                                           nodos_por_paso=nodos_por_paso),
+                         al_terminar=lambda tarea: fines.setdefault('corta', time.perf_counter() - inicio))
+    planificador.ejecutar()
+    return {'corta': fines['corta'], 'todas': time.perf_counter() - inicio}
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description='Búsquedas reanudables con pausas frente a sin ellas')
+    parser.add_argument('--partidas', type=int, default=2)
+    parser.add_argument('--turnos', type=int, default=20, help='Posiciones por partida')
+    parser.add_argument('--nodos-por-paso', type=int, default=NODOS_POR_PASO)
+    args = parser.parse_args(argumentos)
+
+    # Sin límite de tiempo: el reloj sigue corriendo en las pausas y cortaría distinto
+    tiempos_originales = minimax.TIEMPO_MAXIMO, poda_alfa_beta.TIEMPO_MAXIMO
+    minimax.TIEMPO_MAXIMO = poda_alfa_beta.TIEMPO_MAXIMO = float('inf')
+    diferencias = 0
+    try:
+        with sin_log():
+            estados = posiciones(args.partidas, args.turnos)
+            for configuracion in CONFIGURACIONES:
+                resultado, pausas = comparar(estados, configuracion, args.nodos_por_paso)
+                directa, reanudable = medir_coste(estados, configuracion, args.nodos_por_paso)
+                print(f"[BENCH] {configuracion[0]}: {len(estados)} posiciones intercaladas con {pausas} pausas, "
+                      f"{len(resultado)} distintas; {directa:.0f} nodos/s sin pausas, "
+                      f"{reanudable:.0f} con pausas ({reanudable / directa - 1:+.1%})")
+                for indice, directa_, reanudada in resultado:
+                    print(f"    posición {indice}: sin pausas {directa_}, con pausas {reanudada}")
+                diferencias += len(resultado)
+            reparto = medir_reparto(estados[0], args.nodos_por_paso)
+    finally:
+        minimax.TIEMPO_MAXIMO, poda_alfa_beta.TIEMPO_MAXIMO = tiempos_originales
+
+    print(f"[BENCH] Reparto: la búsqueda corta entre {BUSQUEDAS_LARGAS} largas termina en "
+          f"{reparto['corta'] * 1000:.0f}ms, todas en {reparto['todas'] * 1000:.0f}ms")
+    return 1 if diferencias else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,301 @@
+"""
+Benchmarks reproducibles de los puntos calientes del backend.
+
+Micro: EstadoJuego.clonar, mover_pacman, mover_fantasmas, evaluar,
+obtener_estado_json y obtener_delta por separado, en posiciones canónicas.
+Macro: nodos por segundo y tiempo hasta cada profundidad de
+decision_minimax, decision_alfa_beta y decision_expectimax, y las celdas
+de horizonte de Pacman por nodo (alfa-beta+macro usa macro-movimientos;
+alfa-beta+relevancia no ramifica los fantasmas fuera de alcance).
+
+Todas las posiciones y movimientos salen de semillas fijas. Los resultados
+se guardan en JSON (métrica -> valor); con --comparar se contrastan con una
+línea base y se marcan las regresiones (solo tiene sentido entre
+ejecuciones de la misma máquina, sin otra carga).
+
+Uso:
+    python -m benchmarks.suite --salida base.json
+    python -m benchmarks.suite --salida nuevo.json --comparar base.json
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+
+from backend import expectimax, minimax, poda_alfa_beta
+from backend.estadisticas import EstadisticasBusqueda, sin_log
+from backend.estado_busqueda import EstadoBusqueda
+from backend.juego import EstadoJuego, DIRECCIONES
+
+SEMILLA = 1234
+RONDAS = 5  # Se toma la mejor ronda (la menos perturbada por el sistema)
+RONDAS_MACRO = 3
+TOLERANCIA = 0.10
+MINIMO_SEGUNDOS_MACRO = 0.01  # Decisiones más rápidas son puro ruido: se muestran pero no cuentan
+
+PROFUNDIDADES = {
+    'minimax': (1, 2, 3),
+    'alfa-beta': (1, 2, 3, 4, 5),
+    'expectimax': (1, 2, 3, 4),
+    'alfa-beta+macro': (1, 2, 3, 4),
+    'alfa-beta+relevancia': (1, 2, 3, 4, 5)
+}
+
+
+# --- Posiciones canónicas ---
+
+def _apertura():
+    random.seed(SEMILLA)
+    return EstadoJuego()
+
+
+def _poder_activo():
+    estado = _apertura()
+    estado.pacman_poderoso = True
+    estado.turnos_poder_restantes = 15
+    return estado
+
+
+def _un_fantasma():
+    estado = _apertura()
+    estado.pos_fantasmas = estado.pos_fantasmas[:1]
+    estado.bits_fantasmas = estado.laberinto.mascara(estado.pos_fantasmas)
+    estado.num_fantasmas = 1
+    return estado
+
+
+def _casi_final():
+    estado = _apertura()
+    capsulas = sorted(estado.capsulas)
+    estado.capsulas = capsulas[:5]
+    estado.capsulas_recogidas = len(capsulas) - 5
+    estado.power_ups_consumidos = estado.power_ups
+    return estado
+
+
+POSICIONES = {
+    'apertura': _apertura,
+    'poder_activo': _poder_activo,
+    'un_fantasma': _un_fantasma,
+    'casi_final': _casi_final
+}
+
+
+# --- Medición ---
+
+def _mejor_ronda(funcion, repeticiones, preparar=None):
+    """Microsegundos por llamada de la mejor de RONDAS rondas"""
+    mejor = float('inf')
+    for _ in range(RONDAS):
+        argumentos = preparar() if preparar else None
+        inicio = time.perf_counter()
+        funcion(argumentos)
+        mejor = min(mejor, time.perf_counter() - inicio)
+    return mejor / repeticiones * 1e6
+
+
+def medir_micro(estado, repeticiones):
+    """Microsegundos por llamada de cada operación sobre un estado"""
+    resultados = {}
+
+    def clonar(_):
+        for _ in range(repeticiones):
+            estado.clonar()
+    resultados['clonar'] = _mejor_ronda(clonar, repeticiones)
+
+    raiz = EstadoBusqueda.desde_estado(estado)
+
+    def clonar_busqueda(_):
+        for _ in range(repeticiones):
+            raiz.clonar()
+    resultados['clonar_busqueda'] = _mejor_ronda(clonar_busqueda, repeticiones)
+
+    # Los movimientos mutan el estado: cada llamada usa un clon preparado fuera del cronómetro
+    direcciones = estado.obtener_movimientos_validos_pacman() or list(DIRECCIONES)
+
+    def preparar_clones():
+        random.seed(SEMILLA)
+        return [estado.clonar() for _ in range(repeticiones)]
+
+    def mover_pacman(clones):
+        for i, clon in enumerate(clones):
+            clon.mover_pacman(direcciones[i % len(direcciones)])
+    resultados['mover_pacman'] = _mejor_ronda(mover_pacman, repeticiones, preparar_clones)
+
+    def mover_fantasmas(clones):
+        for clon in clones:
+            clon.mover_fantasmas()
+    resultados['mover_fantasmas'] = _mejor_ronda(mover_fantasmas, repeticiones, preparar_clones)
+
+    def evaluar(_):
+        for _ in range(repeticiones):
+            estado.evaluar()
+    resultados['evaluar'] = _mejor_ronda(evaluar, repeticiones)
+
+    def obtener_estado_json(_):
+        for _ in range(max(repeticiones // 4, 1)):
+            estado.obtener_estado_json()
+    resultados['obtener_estado_json'] = _mejor_ronda(obtener_estado_json, max(repeticiones // 4, 1))
+
+    def preparar_turnos():
+        # Un turno jugado después del último estado enviado
+        clones = preparar_clones()
+        for i, clon in enumerate(clones):
+            clon.obtener_estado_versionado()
+            clon.mover_pacman(direcciones[i % len(direcciones)])
+            clon.mover_fantasmas()
+        return clones
+
+    def obtener_delta(clones):
+        for clon in clones:
+            clon.obtener_delta()
+    resultados['obtener_delta'] = _mejor_ronda(obtener_delta, repeticiones, preparar_turnos)
+
+    return resultados
+
+
+def medir_macro(estado, algoritmo, profundidades):
+    """Segundos, nodos por segundo y celdas por nodo de una decisión a cada profundidad"""
+    algoritmo, _, variante = algoritmo.partition('+')
+    macro_movimientos = variante == 'macro'
+    relevancia_fantasmas = variante == 'relevancia'
+    resultados = {}
+    for profundidad in profundidades:
+        segundos = float('inf')
+        for _ in range(RONDAS_MACRO):
+            estadisticas = EstadisticasBusqueda(algoritmo)
+            with sin_log():
+                inicio = time.perf_counter()
+                if algoritmo == 'minimax':
+                    minimax.decision_minimax(estado, profundidad, macro_movimientos=macro_movimientos,
+                                             relevancia_fantasmas=relevancia_fantasmas,
+                                             estadisticas_busqueda=estadisticas)
+                elif algoritmo == 'expectimax':
+                    expectimax.decision_expectimax(estado, profundidad, macro_movimientos=macro_movimientos,
+                                                   estadisticas_busqueda=estadisticas)
+                else:
+                    poda_alfa_beta.decision_alfa_beta(estado, profundidad, macro_movimientos=macro_movimientos,
+                                                      relevancia_fantasmas=relevancia_fantasmas,
+                                                      estadisticas_busqueda=estadisticas)
+                segundos = min(segundos, time.perf_counter() - inicio)
+        resultados[f'p{profundidad}.segundos'] = segundos
+        nodos = estadisticas.nodos_explorados
+        resultados[f'p{profundidad}.nodos'] = nodos
+        resultados[f'p{profundidad}.nodos_por_segundo'] = nodos / segundos if segundos else 0.0
+        resultados[f'p{profundidad}.celdas_por_nodo'] = estadisticas.celdas_pacman / nodos if nodos else 0.0
+    return resultados
+
+
+def ejecutar(repeticiones=2000, macro=True):
+    """
+    Corre toda la suite.
+
+    Returns:
+        dict: {'meta': {...}, 'metricas': {nombre: valor}}
+    """
+    metricas = {}
+    for nombre, crear in POSICIONES.items():
+        for operacion, valor in medir_micro(crear(), repeticiones).items():
+            metricas[f'micro.{nombre}.{operacion}.us'] = valor
+
+    if macro:
+        # Sin límite de tiempo: el tiempo hasta la profundidad es lo que se mide
+        tiempos_originales = minimax.TIEMPO_MAXIMO, poda_alfa_beta.TIEMPO_MAXIMO, expectimax.TIEMPO_MAXIMO
+        minimax.TIEMPO_MAXIMO = poda_alfa_beta.TIEMPO_MAXIMO = expectimax.TIEMPO_MAXIMO = float('inf')
+        try:
+            for algoritmo, profundidades in PROFUNDIDADES.items():
+                for nombre, crear in POSICIONES.items():
+                    for metrica, valor in medir_macro(crear(), algoritmo, profundidades).items():
+                        metricas[f'macro.{algoritmo}.{nombre}.{metrica}'] = valor
+        finally:
+            minimax.TIEMPO_MAXIMO, poda_alfa_beta.TIEMPO_MAXIMO, expectimax.TIEMPO_MAXIMO = tiempos_originales
+
+    return {'meta': _meta(repeticiones), 'metricas': metricas}
+
+
+def _meta(repeticiones):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'semilla': SEMILLA,
+        'repeticiones': repeticiones
+    }
+
+
+# --- Comparación ---
+
+def _mayor_es_mejor(metrica):
+    return metrica.endswith(('nodos_por_segundo', 'celdas_por_nodo'))
+
+
+def comparar(base, nuevo, tolerancia=TOLERANCIA):
+    """
+    Compara dos resultados de ejecutar().
+
+    Los nodos deben coincidir exactamente (mismo árbol); los tiempos pueden
+    empeorar hasta la tolerancia relativa. Los tiempos de decisiones que en
+    la base tardan menos de MINIMO_SEGUNDOS_MACRO no se marcan.
+
+    Returns:
+        list: (metrica, valor_base, valor_nuevo, cambio_relativo, regresion)
+    """
+    filas = []
+    for metrica, valor_base in sorted(base['metricas'].items()):
+        valor_nuevo = nuevo['metricas'].get(metrica)
+        if valor_nuevo is None:
+            continue
+        cambio = (valor_nuevo - valor_base) / valor_base if valor_base else 0.0
+        if metrica.endswith('.nodos'):
+            regresion = valor_nuevo != valor_base
+        elif (metrica.startswith('macro.') and
+              base['metricas'].get(metrica.rsplit('.', 1)[0] + '.segundos', 0) < MINIMO_SEGUNDOS_MACRO):
+            regresion = False
+        elif _mayor_es_mejor(metrica):
+            regresion = cambio < -tolerancia
+        else:
+            regresion = cambio > tolerancia
+        filas.append((metrica, valor_base, valor_nuevo, cambio, regresion))
+    return filas
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description='Benchmarks del backend de Pacman')
+    parser.add_argument('--salida', default='benchmark.json', help='archivo JSON de resultados')
+    parser.add_argument('--comparar', metavar='BASE', help='JSON de una ejecución anterior')
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA,
+                        help='empeoramiento relativo permitido en tiempos (0.10 = 10%%)')
+    parser.add_argument('--repeticiones', type=int, default=2000)
+    parser.add_argument('--sin-macro', action='store_true', help='solo micro-benchmarks')
+    args = parser.parse_args(argumentos)
+
+    resultado = ejecutar(args.repeticiones, macro=not args.sin_macro)
+    with open(args.salida, 'w', encoding='utf-8') as archivo:
+        json.dump(resultado, archivo, indent=2, sort_keys=True)
+    print(f"[BENCH] {len(resultado['metricas'])} métricas en {args.salida}")
+
+    if not args.comparar:
+        return 0
+
+    with open(args.comparar, encoding='utf-8') as archivo:
+        base = json.load(archivo)
+    regresiones = 0
+    for metrica, valor_base, valor_nuevo, cambio, regresion in comparar(base, resultado, args.tolerancia):
+        marca = 'REGRESIÓN' if regresion else ''
+        print(f"{metrica:60s} {valor_base:14.3f} {valor_nuevo:14.3f} {cambio:+8.1%} {marca}")
+        regresiones += regresion
+    print(f"[BENCH] {regresiones} regresiones (tolerancia {args.tolerancia:.0%})")
+    return 1 if regresiones else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,14 +1,90 @@
-from flask import Flask, render_template, jsonify, request
+import json
+import os
+import time
+
+from flask import Flask, Response, g, render_template, jsonify, request
 from flask_cors import CORS
 
-from backend.juego import EstadoJuego
+from backend.estadisticas import EstadisticasBusqueda
+from backend.expectimax import decision_expectimax
+from backend.juego import EstadoJuego, NUM_FANTASMAS
+from backend.mapas import listar_layouts, tablero_de_configuracion
+from backend.metricas import MetricasServidor
+from backend.paralelo import iniciar_pool
+from backend.presupuesto import LATENCIA_OBJETIVO, TIEMPO_MINIMO, PoliticaPresupuesto
+from backend.reproduccion import ControlReproduccion, RITMO_POR_DEFECTO, VENTANA_POR_DEFECTO
+from backend.sesiones import RegistroSesiones
+from backend.trabajos import ColaLlena, ColaTrabajos, FALLIDO, TRABAJADORES
 from backend.minimax import decision_minimax
-from backend.poda_alfa_beta import decision_alfa_beta
+from backend.poda_alfa_beta import TIEMPO_MAXIMO, decision_alfa_beta
 
 app = Flask(__name__)
 CORS(app)
 
-juego_actual = None
+# Partidas en curso, por id
+registro = RegistroSesiones()
+
+# Contadores e histogramas de latencia para /api/metricas
+metricas = MetricasServidor()
+
+# Tope de los tableros generados y de fantasmas que se aceptan por petición
+LADO_MAXIMO = 200
+FANTASMAS_MAXIMOS = 32
+PROFUNDIDAD_MAXIMA = 12  # Tope de profundidad de búsqueda (con o sin presupuesto)
+
+# Cola de trabajos: espera máxima de una consulta con ?esperar= y Retry-After al rechazar
+ESPERA_MAXIMA = 25.0
+REINTENTAR_EN = 1
+
+CABECERAS_SSE = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+
+def _registrar_trabajo(trabajo):
+    metricas.registrar_trabajo(trabajo.estado, trabajo.degradado,
+                               trabajo.segundos_en_cola(), trabajo.segundos_ejecucion())
+
+# Los turnos se juegan en los hilos de la cola, no en los de Flask; cada búsqueda
+# lleva su ContextoBusqueda, así que partidas distintas buscan a la vez
+cola_trabajos = ColaTrabajos(trabajadores=int(os.environ.get('PACMAN_TRABAJADORES', TRABAJADORES)),
+                             al_terminar=_registrar_trabajo)
+
+# Segundos por movimiento según la carga, entre el suelo y el techo (ver presupuesto.py)
+politica_presupuesto = PoliticaPresupuesto(
+    latencia_objetivo=float(os.environ.get('PACMAN_LATENCIA_OBJETIVO', LATENCIA_OBJETIVO)),
+    tiempo_minimo=float(os.environ.get('PACMAN_TIEMPO_MINIMO', TIEMPO_MINIMO)),
+    tiempo_maximo=float(os.environ.get('PACMAN_TIEMPO_MAXIMO', TIEMPO_MAXIMO)))
+
+@app.before_request
+def _iniciar_cronometro():
+    g.inicio_peticion = time.perf_counter()
+
+@app.after_request
+def _registrar_peticion(respuesta):
+    # La regla ('/api/estado') y no la URL, para no crear una serie por partida
+    endpoint = request.url_rule.rule if request.url_rule is not None else 'sin_ruta'
+    metricas.registrar_peticion(endpoint, respuesta.status_code,
+                                time.perf_counter() - g.inicio_peticion)
+    return respuesta
+
+# Las funciones con _ que no usan request ni jsonify devuelven diccionarios y códigos de
+# estado: las comparten estas rutas y las de servidor_asgi.py
+
+def _obtener_sesion():
+    """Sesion de la petición (id_juego en el cuerpo JSON o en la query) o una respuesta de error"""
+    datos = request.get_json(silent=True) or {}
+    sesion, error = _buscar_sesion(datos.get('id_juego') or request.args.get('id_juego'))
+    if error:
+        cuerpo, codigo = error
+        return None, (jsonify(cuerpo), codigo)
+    return sesion, None
+
+def _buscar_sesion(id_juego):
+    """(Sesion, None), o (None, (cuerpo, código)) si no hay id o la partida no existe"""
+    if not id_juego:
+        return None, ({'error': 'No hay juego iniciado'}, 400)
+    sesion = registro.obtener(id_juego)
+    if sesion is None:
+        return None, ({'error': 'Juego no encontrado o expirado'}, 404)
+    return sesion, None
 
 @app.route('/')
 def index():
@@ -16,73 +92,404 @@ def index():
 
 @app.route('/api/iniciar', methods=['POST'])
 def iniciar_juego():
-    global juego_actual
-    datos = request.json
+    datos = request.get_json(silent=True)
+    if not isinstance(datos, dict):
+        return jsonify({'error': 'Se esperaba un objeto JSON'}), 400
+    cuerpo, codigo = _iniciar_partida(datos)
+    return jsonify(cuerpo), codigo
+
+def _iniciar_partida(datos):
+    """Crea la partida que piden los datos de /api/iniciar; (cuerpo, código)"""
     algoritmo = datos.get('algoritmo', 'minimax')
     
-    juego_actual = EstadoJuego()
-    juego_actual.algoritmo = algoritmo
-    juego_actual.profundidad_maxima = 2  # Fija en 2
+    # Mapa: layout de layouts/, laberinto generado (filas, columnas, semilla_laberinto) o el clásico
+    if datos.get('layout') and datos['layout'] not in listar_layouts():
+        return {'error': f"Layout desconocido: {datos['layout']}"}, 400
+    try:
+        # Presupuesto y profundidad: números positivos (None = sin pedir), antes de crear el mapa
+        tiempo_por_movimiento = _positivo(datos.get('tiempo_por_movimiento'), float)
+        nodos_por_movimiento = _positivo(datos.get('nodos_por_movimiento'), int)
+        if tiempo_por_movimiento is not None or nodos_por_movimiento is not None:
+            # Con presupuesto: profundización iterativa hasta donde alcance
+            profundidad = _positivo(datos.get('profundidad'), int)
+        else:
+            profundidad = _positivo(datos.get('profundidad', 2), int)  # 2 por defecto
+            if profundidad is None:
+                raise ValueError("sin presupuesto hace falta una profundidad")
+        if profundidad is not None and profundidad > PROFUNDIDAD_MAXIMA:
+            return {'error': f'La profundidad no puede pasar de {PROFUNDIDAD_MAXIMA}'}, 400
+    except (TypeError, ValueError) as error:
+        return {'error': f'Parámetros inválidos: {error}'}, 400
+    try:
+        if max(int(datos.get('filas') or 0), int(datos.get('columnas') or 0)) > LADO_MAXIMO:
+            return {'error': f'El tablero no puede pasar de {LADO_MAXIMO} de lado'}, 400
+        num_fantasmas = int(datos.get('num_fantasmas', NUM_FANTASMAS))
+        if num_fantasmas > FANTASMAS_MAXIMOS:
+            return {'error': f'Como mucho {FANTASMAS_MAXIMOS} fantasmas'}, 400
+        juego = EstadoJuego(tablero_de_configuracion(datos), num_fantasmas)
+    except (KeyError, TypeError, ValueError) as error:
+        return {'error': f'Mapa inválido: {error}'}, 400
+    juego.algoritmo = algoritmo
+    juego.tiempo_por_movimiento = tiempo_por_movimiento
+    juego.nodos_por_movimiento = nodos_por_movimiento
+    juego.profundidad_maxima = profundidad
+    juego.usar_distancia_laberinto = bool(datos.get('distancia_laberinto', False))
+    juego.usar_transposicion = bool(datos.get('transposicion', False))
+    juego.usar_ordenamiento = bool(datos.get('ordenamiento', False))
+    juego.usar_paralelo = bool(datos.get('paralelo', False))
+    juego.poda_star = bool(datos.get('poda_star', True))
+    juego.usar_macro_movimientos = bool(datos.get('macro_movimientos', False))
+    juego.usar_relevancia_fantasmas = bool(datos.get('relevancia_fantasmas', False))
+    if juego.usar_paralelo:
+        iniciar_pool()  # Solo arranca procesos la primera vez
+    estado, version = juego.obtener_estado_versionado()
+    id_juego = registro.crear(juego)
     
-    print(f"🎮 Juego iniciado: {algoritmo}")
-    print(f"📍 Pacman en: {juego_actual.pos_pacman}")
-    print(f"👻 Fantasmas en: {juego_actual.pos_fantasmas}")
-    print(f"💊 Cápsulas totales: {len(juego_actual.capsulas)}")
+    print(f"🎮 Juego iniciado: {algoritmo} ({id_juego}, {len(registro)} en curso, "
+          f"{juego.filas}x{juego.columnas})")
+    print(f"📍 Pacman en: {juego.pos_pacman}")
+    print(f"👻 Fantasmas en: {juego.pos_fantasmas}")
+    print(f"💊 Cápsulas totales: {len(juego.capsulas)}")
     
-    return jsonify({
-        'estado': juego_actual.obtener_estado_json(),
+    return {
+        'id_juego': id_juego,
+        'estado': estado,
+        'version': version,
         'mensaje': f'Juego iniciado con {algoritmo}'
-    })
+    }, 200
+
+def _positivo(valor, tipo):
+    """valor convertido a tipo (int o float), None si es None; ValueError si no es mayor que 0"""
+    if valor is None:
+        return None
+    if isinstance(valor, bool) or (tipo is int and isinstance(valor, float) and not valor.is_integer()):
+        raise ValueError(f"{valor!r} no es un {'entero' if tipo is int else 'número'}")
+    numero = tipo(valor)
+    if not numero > 0:
+        raise ValueError(f"{valor!r} tiene que ser mayor que 0")
+    return numero
 
 @app.route('/api/siguiente_turno', methods=['POST'])
 def siguiente_turno():
-    global juego_actual
+    """Juega un turno y responde con él (encola y espera; /api/turnos no espera)"""
+    sesion, error = _obtener_sesion()
+    if error:
+        return error
+    
+    # Versión del estado que tiene el cliente (sin ella: estado completo, como antes)
+    version_cliente = (request.get_json(silent=True) or {}).get('version')
+    try:
+        trabajo = _encolar_turno(sesion, version_cliente)
+    except ColaLlena:
+        return _respuesta_cola_llena()
+    trabajo.esperar()
+    return _respuesta_trabajo(trabajo)
+
+@app.route('/api/turnos', methods=['POST'])
+def encolar_turno():
+    """
+    Encola el siguiente turno de la partida y responde enseguida (202) con
+    el id del trabajo; el resultado se pide a /api/turnos/<id_trabajo>.
+    Reenviar con la misma versión mientras está pendiente devuelve el mismo trabajo.
+    """
+    sesion, error = _obtener_sesion()
+    if error:
+        return error
+    version_cliente = (request.get_json(silent=True) or {}).get('version')
+    try:
+        trabajo = _encolar_turno(sesion, version_cliente)
+    except ColaLlena:
+        return _respuesta_cola_llena()
+    return jsonify({**trabajo.a_dict(), 'posicion': cola_trabajos.posicion(trabajo)}), 202
+
+@app.route('/api/turnos/<id_trabajo>', methods=['GET'])
+def consultar_turno(id_trabajo):
+    """
+    Resultado de un turno encolado: 200 con la misma respuesta que
+    /api/siguiente_turno si terminó, 202 con su estado si no. Con
+    ?esperar=segundos (hasta ESPERA_MAXIMA) espera a que termine antes de responder.
+    """
+    trabajo = cola_trabajos.obtener(id_trabajo)
+    if trabajo is None:
+        return jsonify({'error': 'Trabajo no encontrado o expirado'}), 404
+    try:
+        espera = min(max(float(request.args.get('esperar', 0)), 0.0), ESPERA_MAXIMA)
+    except ValueError:
+        return jsonify({'error': 'esperar debe ser un número'}), 400
+    if espera:
+        trabajo.esperar(espera)
+    return _respuesta_trabajo(trabajo)
+
+def _encolar_turno(sesion, version_cliente):
+    """Trabajo que juega el siguiente turno de la sesión (ColaLlena si no se admite)"""
+    def jugar(trabajo):
+        # Turnos de la misma partida, uno detrás de otro
+        with sesion.lock:
+            respuesta = _jugar_turno(sesion.juego, trabajo)
+            respuesta.update(_estado_para_cliente(sesion.juego, version_cliente))
+        registro.actualizar_memoria(sesion)
+        return respuesta
     
-    if juego_actual is None:
-        return jsonify({'error': 'No hay juego iniciado'}), 400
+    try:
+        return cola_trabajos.enviar((sesion.id, version_cliente), jugar)
+    except ColaLlena:
+        metricas.registrar_rechazo()
+        raise
+
+def _respuesta_trabajo(trabajo):
+    cuerpo, codigo = _cuerpo_trabajo(trabajo)
+    return jsonify(cuerpo), codigo
+
+def _cuerpo_trabajo(trabajo):
+    """(cuerpo, código) de un trabajo: 200 con el turno, 202 si sigue pendiente, 500 si falló"""
+    if trabajo.estado == FALLIDO:
+        return {'error': f'Error en la búsqueda: {trabajo.error}', 'trabajo': trabajo.a_dict()}, 500
+    if not trabajo.terminado:
+        return {**trabajo.a_dict(), 'posicion': cola_trabajos.posicion(trabajo)}, 202
+    return {**trabajo.resultado, 'trabajo': trabajo.a_dict()}, 200
+
+def _respuesta_cola_llena():
+    cuerpo, codigo, cabeceras = _cuerpo_cola_llena()
+    return jsonify(cuerpo), codigo, cabeceras
+
+def _cuerpo_cola_llena():
+    return ({'error': 'Servidor saturado, reintenta en unos segundos'}, 503,
+            {'Retry-After': str(REINTENTAR_EN)})
+
+def _estado_para_cliente(juego, version_cliente):
+    """
+    Delta desde la versión del cliente si coincide con la última enviada;
+    si no (respuesta perdida, cliente viejo), el estado completo para resincronizar.
+    """
+    if version_cliente is not None and version_cliente == juego.version_estado:
+        resultado = juego.obtener_delta()
+        if resultado is not None:
+            delta, version = resultado
+            return {'delta': delta, 'version': version}
+    estado, version = juego.obtener_estado_versionado()
+    return {'estado': estado, 'version': version}
+
+def _jugar_turno(juego, trabajo=None):
+    if juego.juego_terminado:
+        return {'terminado': True}
     
-    if juego_actual.juego_terminado:
-        return jsonify({
-            'estado': juego_actual.obtener_estado_json(),
-            'terminado': True
-        })
+    # Presupuesto según lo que esperaron este turno y los de la cola, y la carga de CPU
+    if trabajo is not None:
+        asignado = politica_presupuesto.asignar(
+            juego.tiempo_por_movimiento, juego.nodos_por_movimiento,
+            espera=trabajo.segundos_en_cola(), esperas_detras=cola_trabajos.esperas(),
+            trabajadores=cola_trabajos.trabajadores, degradado=trabajo.degradado)
+    else:
+        asignado = politica_presupuesto.asignar(juego.tiempo_por_movimiento, juego.nodos_por_movimiento)
+    metricas.registrar_presupuesto(asignado)
+    presupuesto = {
+        # Recortado: profundización iterativa, para quedarse con la última profundidad completa
+        'iterativo': (juego.tiempo_por_movimiento is not None or
+                      juego.nodos_por_movimiento is not None or asignado['reducido']),
+        'tiempo_maximo': asignado['tiempo_maximo'],
+        'nodos_maximos': asignado['nodos_maximos'],
+        'paralelo': juego.usar_paralelo,
+        'macro_movimientos': juego.usar_macro_movimientos
+    }
     
     # Turno de Pacman (MAX)
-    if juego_actual.algoritmo == 'minimax':
-        mejor_movimiento = decision_minimax(juego_actual, juego_actual.profundidad_maxima)
+    estadisticas = EstadisticasBusqueda(juego.algoritmo)
+    if juego.algoritmo == 'minimax':
+        mejor_movimiento = decision_minimax(juego, juego.profundidad_maxima,
+                                            relevancia_fantasmas=juego.usar_relevancia_fantasmas,
+                                            estadisticas_busqueda=estadisticas, **presupuesto)
+    elif juego.algoritmo == 'expectimax':
+        mejor_movimiento = decision_expectimax(juego, juego.profundidad_maxima,
+                                               poda_star=juego.poda_star,
+                                               estadisticas_busqueda=estadisticas, **presupuesto)
     else:
-        mejor_movimiento = decision_alfa_beta(juego_actual, juego_actual.profundidad_maxima)
+        mejor_movimiento = decision_alfa_beta(juego, juego.profundidad_maxima,
+                                              usar_transposicion=juego.usar_transposicion,
+                                              ordenamiento=juego.usar_ordenamiento,
+                                              relevancia_fantasmas=juego.usar_relevancia_fantasmas,
+                                              estadisticas_busqueda=estadisticas,
+                                              **presupuesto)
+    metricas.registrar_busqueda(estadisticas)
     
     if mejor_movimiento is None:
-        juego_actual.juego_terminado = True
-        juego_actual.mensaje = "Sin movimientos válidos"
-        return jsonify({
-            'estado': juego_actual.obtener_estado_json(),
-            'terminado': True
-        })
+        juego.juego_terminado = True
+        juego.mensaje = "Sin movimientos válidos"
+        return {'terminado': True}
     
-    juego_actual.mover_pacman(mejor_movimiento)
+    juego.mover_pacman(mejor_movimiento)
     
     # Turno de fantasmas (MIN)
-    if not juego_actual.juego_terminado:
-        juego_actual.mover_fantasmas()
+    if not juego.juego_terminado:
+        juego.mover_fantasmas()
     
-    return jsonify({
-        'estado': juego_actual.obtener_estado_json(),
-        'terminado': juego_actual.juego_terminado,
-        'movimiento_pacman': mejor_movimiento
-    })
+    return {
+        'terminado': juego.juego_terminado,
+        'movimiento_pacman': mejor_movimiento,
+        'profundidad_alcanzada': estadisticas.profundidad_alcanzada,
+        'degradado': trabajo is not None and trabajo.degradado,
+        'presupuesto': asignado,
+        'estadisticas': estadisticas.a_dict()
+    }
+
+@app.route('/api/stream', methods=['GET'])
+def transmitir_partida():
+    """
+    Reproducción automática por Server-Sent Events: el servidor juega la
+    partida y envía cada turno como un evento 'turno' (mismo contenido que
+    /api/siguiente_turno). El primero trae el estado completo. Termina con
+    un evento 'fin'. Query: id_juego, ritmo (segundos entre turnos), ventana.
+    """
+    sesion, error = _obtener_sesion()
+    if error:
+        return error
+    try:
+        control = _nueva_reproduccion(request.args)
+    except ValueError:
+        return jsonify({'error': 'ritmo y ventana deben ser números'}), 400
+    with sesion.lock:
+        _reemplazar_reproduccion(sesion, control)
+    
+    return Response(_bucle_transmision(sesion, control), mimetype='text/event-stream',
+                    headers=CABECERAS_SSE)
+
+def _nueva_reproduccion(argumentos):
+    """ControlReproduccion con el ritmo y la ventana de la query (ValueError si no son números)"""
+    ritmo = max(float(argumentos.get('ritmo', RITMO_POR_DEFECTO)), 0.0)
+    ventana = max(int(argumentos.get('ventana', VENTANA_POR_DEFECTO)), 0)
+    return ControlReproduccion(ritmo, ventana)
+
+def _reemplazar_reproduccion(sesion, control):
+    # Con el lock de la sesión. Una transmisión por partida: la nueva (p. ej. una
+    # reconexión) reemplaza a la anterior
+    if sesion.reproduccion is not None:
+        sesion.reproduccion.cancelar()
+    sesion.reproduccion = control
+
+def _soltar_reproduccion(sesion, control):
+    # Con el lock de la sesión
+    if sesion.reproduccion is control:
+        sesion.reproduccion = None
+
+def _bucle_transmision(sesion, control):
+    # Generador: si el cliente no lee, el yield se bloquea en el socket y no se juegan más turnos
+    try:
+        with sesion.lock:
+            estado, version, terminado = _estado_inicial(sesion.juego)
+        yield _evento_sse('turno', {'estado': estado, 'version': version, 'terminado': terminado}, version)
+        
+        inicio_turno = time.monotonic()
+        while not terminado:
+            jugar = control.esperar_turno(inicio_turno)
+            if jugar is None:
+                yield ': latido\n\n'
+                continue
+            if not jugar:
+                yield _evento_sse('fin', {'motivo': 'cancelada'})
+                return
+            if registro.obtener(sesion.id) is not sesion:
+                yield _evento_sse('fin', {'motivo': 'expirada'})
+                return
+            
+            inicio_turno = time.monotonic()
+            try:
+                trabajo = _encolar_turno(sesion, version)
+            except ColaLlena:
+                yield ': cola llena\n\n'
+                time.sleep(REINTENTAR_EN)
+                continue
+            trabajo.esperar()
+            if trabajo.estado == FALLIDO:
+                yield _evento_sse('fin', {'motivo': 'error', 'mensaje': trabajo.error})
+                return
+            respuesta = trabajo.resultado
+            version = respuesta['version']
+            terminado = respuesta['terminado']
+            control.turno_enviado()
+            yield _evento_sse('turno', respuesta, version)
+        
+        yield _evento_sse('fin', {'motivo': 'terminada', 'mensaje': sesion.juego.mensaje})
+    finally:
+        # Fin normal, cancelación o cliente desconectado (GeneratorExit)
+        with sesion.lock:
+            _soltar_reproduccion(sesion, control)
+
+def _estado_inicial(juego):
+    # Con el lock de la sesión: primer evento de una transmisión
+    estado, version = juego.obtener_estado_versionado()
+    return estado, version, juego.juego_terminado
+
+def _evento_sse(evento, datos, id_evento=None):
+    lineas = f'event: {evento}\n'
+    if id_evento is not None:
+        lineas += f'id: {id_evento}\n'
+    return lineas + f'data: {json.dumps(datos, ensure_ascii=False)}\n\n'
+
+@app.route('/api/stream/control', methods=['POST'])
+def controlar_transmision():
+    """accion: pausar, reanudar, cancelar, ritmo (con 'ritmo') o confirmar (con 'turnos')"""
+    sesion, error = _obtener_sesion()
+    if error:
+        return error
+    cuerpo, codigo = _controlar(sesion, request.get_json(silent=True) or {})
+    return jsonify(cuerpo), codigo
+
+def _controlar(sesion, datos):
+    control = sesion.reproduccion
+    if control is None:
+        return {'error': 'No hay transmisión en curso'}, 409
+    
+    accion = datos.get('accion')
+    try:
+        if accion == 'pausar':
+            control.pausar()
+        elif accion == 'reanudar':
+            control.reanudar()
+        elif accion == 'cancelar':
+            control.cancelar()
+        elif accion == 'ritmo':
+            control.cambiar_ritmo(datos['ritmo'])
+        elif accion == 'confirmar':
+            control.confirmar(datos['turnos'])
+        else:
+            return {'error': f'Acción desconocida: {accion}'}, 400
+    except (KeyError, TypeError, ValueError):
+        return {'error': f'Parámetros inválidos para {accion}'}, 400
+    return control.resumen(), 200
 
 @app.route('/api/estado', methods=['GET'])
 def obtener_estado():
-    global juego_actual
+    sesion, error = _obtener_sesion()
+    if error:
+        return error
     
-    if juego_actual is None:
-        return jsonify({'error': 'No hay juego iniciado'}), 400
-    
-    return jsonify({
-        'estado': juego_actual.obtener_estado_json()
-    })
+    with sesion.lock:
+        return jsonify(_estado_completo(sesion.juego))
+
+def _estado_completo(juego):
+    # Con el lock de la sesión. También sirve para resincronizar: reinicia la base de los deltas
+    estado, version = juego.obtener_estado_versionado()
+    return {
+        'estado': estado,
+        'version': version
+    }
+
+@app.route('/api/layouts', methods=['GET'])
+def obtener_layouts():
+    return jsonify({'layouts': listar_layouts()})
+
+@app.route('/api/metricas', methods=['GET'])
+def obtener_metricas():
+    """Métricas acumuladas; ?formato=prometheus para el formato de texto de Prometheus"""
+    medidores = _medidores()
+    if request.args.get('formato') == 'prometheus':
+        return Response(metricas.a_prometheus(medidores),
+                        mimetype='text/plain; version=0.0.4; charset=utf-8')
+    return jsonify(metricas.a_dict(medidores))
+
+def _medidores():
+    cola = cola_trabajos.resumen()
+    return {'sesiones': len(registro), 'bytes_sesiones': registro.resumen()['bytes_estimados'],
+            'cola_trabajos': cola['en_cola'], 'trabajos_en_ejecucion': cola['en_ejecucion']}
 
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
\ No newline at end of file
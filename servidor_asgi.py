@@ -0,0 +1,311 @@
+"""
+La API de servidor.py sobre ASGI (Starlette), para servir con uvicorn.
+
+Mismas rutas, mismos cuerpos y mismos códigos que la versión Flask: las
+dos usan el registro de sesiones, la cola de trabajos, la política de
+presupuesto y las métricas de servidor.py (cada proceso tiene los suyos).
+Cambia quién espera:
+
+- Las búsquedas se siguen ejecutando en los hilos de la cola de trabajos;
+  la petición que espera un turno (/api/siguiente_turno, el long-poll de
+  /api/turnos/<id> y /api/stream) no ocupa un hilo: el trabajador la
+  despierta en el bucle de eventos con Trabajo.avisar().
+- Crear una partida (que puede compilar las distancias de un tablero
+  grande) se hace en el ejecutor por defecto del bucle.
+- Lo que necesita el lock de una sesión se hace en el bucle si el lock está
+  libre y en el ejecutor si lo tiene un turno en curso: /api/estado de una
+  partida que está buscando espera a que termine el turno (como en Flask),
+  sin parar a las demás.
+
+Así un solo proceso atiende muchas lecturas de estado y transmisiones
+abiertas a la vez, sin un hilo por conexión.
+
+Uso:
+    uvicorn servidor_asgi:app --port 5000
+    python servidor_asgi.py
+"""
+import asyncio
+import json
+import os
+import time
+
+from jinja2 import pass_context
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Mount, Route
+from starlette.staticfiles import StaticFiles
+from starlette.templating import Jinja2Templates
+
+from backend.mapas import listar_layouts
+from backend.trabajos import ColaLlena, FALLIDO
+from servidor import (CABECERAS_SSE, ESPERA_MAXIMA, REINTENTAR_EN, _buscar_sesion, _controlar,
+                      _cuerpo_cola_llena, _cuerpo_trabajo, _encolar_turno, _estado_completo,
+                      _estado_inicial, _evento_sse, _iniciar_partida, _medidores, _nueva_reproduccion,
+                      _reemplazar_reproduccion, _soltar_reproduccion, cola_trabajos, metricas, registro)
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+
+class RespuestaJSON(JSONResponse):
+    """JSON como el de jsonify (compacto, admite Infinity)"""
+
+    def render(self, contenido):
+        return json.dumps(contenido, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class MedirPeticiones:
+    """
+    Middleware ASGI: registra cada petición en las métricas por su ruta
+    ('/api/turnos/{id_trabajo}', no la URL), como los hooks de servidor.py.
+    Cuenta hasta que salen las cabeceras: una transmisión no suma lo que dura.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        inicio = time.perf_counter()
+
+        async def enviar(mensaje):
+            if mensaje['type'] == 'http.response.start':
+                ruta = scope.get('route')
+                metricas.registrar_peticion(ruta.path if ruta is not None else 'sin_ruta',
+                                            mensaje['status'], time.perf_counter() - inicio)
+            await send(mensaje)
+
+        await self.app(scope, receive, enviar)
+
+
+def _respuesta(cuerpo, codigo=200, cabeceras=None):
+    return RespuestaJSON(cuerpo, status_code=codigo, headers=cabeceras)
+
+
+async def _datos(peticion):
+    """Cuerpo JSON de la petición, o {} (como get_json(silent=True) or {})"""
+    try:
+        return await peticion.json() or {}
+    except ValueError:
+        return {}
+
+
+def _obtener_sesion(peticion, datos):
+    """Sesion de la petición (id_juego en el cuerpo JSON o en la query) o una respuesta de error"""
+    sesion, error = _buscar_sesion(datos.get('id_juego') or peticion.query_params.get('id_juego'))
+    if error:
+        return None, _respuesta(*error)
+    return sesion, None
+
+
+async def _con_sesion(sesion, funcion, *argumentos):
+    """
+    funcion(*argumentos) con el lock de la sesión: aquí mismo si está libre;
+    si no (un turno buscando), esperándolo en un hilo del ejecutor.
+    """
+    if sesion.lock.acquire(blocking=False):
+        try:
+            return funcion(*argumentos)
+        finally:
+            sesion.lock.release()
+    return await asyncio.to_thread(_con_lock, sesion, funcion, *argumentos)
+
+
+def _con_lock(sesion, funcion, *argumentos):
+    with sesion.lock:
+        return funcion(*argumentos)
+
+
+async def _esperar_trabajo(trabajo, segundos=None):
+    """trabajo.esperar(segundos) sin bloquear el bucle: el hilo trabajador avisa al terminar"""
+    bucle = asyncio.get_running_loop()
+    terminado = bucle.create_future()
+
+    def resolver():
+        if not terminado.done():  # wait_for lo cancela si se agota la espera
+            terminado.set_result(None)
+
+    trabajo.avisar(lambda _: bucle.call_soon_threadsafe(resolver))
+    try:
+        await asyncio.wait_for(terminado, segundos)
+    except asyncio.TimeoutError:
+        pass
+
+
+async def index(peticion):
+    return plantillas.TemplateResponse(peticion, 'index.html')
+
+
+async def iniciar_juego(peticion):
+    try:
+        datos = await peticion.json()
+    except ValueError:
+        datos = None
+    if not isinstance(datos, dict):
+        return _respuesta({'error': 'Se esperaba un objeto JSON'}, 400)
+    return _respuesta(*await asyncio.to_thread(_iniciar_partida, datos))
+
+
+async def siguiente_turno(peticion):
+    """Juega un turno y responde con él (encola y espera; /api/turnos no espera)"""
+    datos = await _datos(peticion)
+    sesion, error = _obtener_sesion(peticion, datos)
+    if error:
+        return error
+    try:
+        trabajo = _encolar_turno(sesion, datos.get('version'))
+    except ColaLlena:
+        return _respuesta(*_cuerpo_cola_llena())
+    await _esperar_trabajo(trabajo)
+    return _respuesta(*_cuerpo_trabajo(trabajo))
+
+
+async def encolar_turno(peticion):
+    """Encola el siguiente turno y responde enseguida (202); ver servidor.encolar_turno"""
+    datos = await _datos(peticion)
+    sesion, error = _obtener_sesion(peticion, datos)
+    if error:
+        return error
+    try:
+        trabajo = _encolar_turno(sesion, datos.get('version'))
+    except ColaLlena:
+        return _respuesta(*_cuerpo_cola_llena())
+    return _respuesta({**trabajo.a_dict(), 'posicion': cola_trabajos.posicion(trabajo)}, 202)
+
+
+async def consultar_turno(peticion):
+    """Resultado de un turno encolado, con ?esperar= (long-poll); ver servidor.consultar_turno"""
+    trabajo = cola_trabajos.obtener(peticion.path_params['id_trabajo'])
+    if trabajo is None:
+        return _respuesta({'error': 'Trabajo no encontrado o expirado'}, 404)
+    try:
+        espera = min(max(float(peticion.query_params.get('esperar', 0)), 0.0), ESPERA_MAXIMA)
+    except ValueError:
+        return _respuesta({'error': 'esperar debe ser un número'}, 400)
+    if espera and not trabajo.terminado:
+        await _esperar_trabajo(trabajo, espera)
+    return _respuesta(*_cuerpo_trabajo(trabajo))
+
+
+async def obtener_estado(peticion):
+    sesion, error = _obtener_sesion(peticion, {})
+    if error:
+        return error
+    return _respuesta(await _con_sesion(sesion, _estado_completo, sesion.juego))
+
+
+async def transmitir_partida(peticion):
+    """Reproducción automática por Server-Sent Events; ver servidor.transmitir_partida"""
+    sesion, error = _obtener_sesion(peticion, {})
+    if error:
+        return error
+    try:
+        control = _nueva_reproduccion(peticion.query_params)
+    except ValueError:
+        return _respuesta({'error': 'ritmo y ventana deben ser números'}, 400)
+    await _con_sesion(sesion, _reemplazar_reproduccion, sesion, control)
+    return StreamingResponse(_bucle_transmision(sesion, control), media_type='text/event-stream',
+                             headers=CABECERAS_SSE)
+
+
+async def _bucle_transmision(sesion, control):
+    # El de servidor.py, esperando en el bucle de eventos en lugar de en un hilo
+    try:
+        estado, version, terminado = await _con_sesion(sesion, _estado_inicial, sesion.juego)
+        yield _evento_sse('turno', {'estado': estado, 'version': version, 'terminado': terminado}, version)
+
+        inicio_turno = time.monotonic()
+        while not terminado:
+            jugar = await control.esperar_turno_async(inicio_turno)
+            if jugar is None:
+                yield ': latido\n\n'
+                continue
+            if not jugar:
+                yield _evento_sse('fin', {'motivo': 'cancelada'})
+                return
+            if registro.obtener(sesion.id) is not sesion:
+                yield _evento_sse('fin', {'motivo': 'expirada'})
+                return
+
+            inicio_turno = time.monotonic()
+            try:
+                trabajo = _encolar_turno(sesion, version)
+            except ColaLlena:
+                yield ': cola llena\n\n'
+                await asyncio.sleep(REINTENTAR_EN)
+                continue
+            await _esperar_trabajo(trabajo)
+            if trabajo.estado == FALLIDO:
+                yield _evento_sse('fin', {'motivo': 'error', 'mensaje': trabajo.error})
+                return
+            respuesta = trabajo.resultado
+            version = respuesta['version']
+            terminado = respuesta['terminado']
+            control.turno_enviado()
+            yield _evento_sse('turno', respuesta, version)
+
+        yield _evento_sse('fin', {'motivo': 'terminada', 'mensaje': sesion.juego.mensaje})
+    finally:
+        # Fin normal, cancelación o cliente desconectado (la tarea se cancela)
+        await _con_sesion(sesion, _soltar_reproduccion, sesion, control)
+
+
+async def controlar_transmision(peticion):
+    """accion: pausar, reanudar, cancelar, ritmo (con 'ritmo') o confirmar (con 'turnos')"""
+    datos = await _datos(peticion)
+    sesion, error = _obtener_sesion(peticion, datos)
+    if error:
+        return error
+    return _respuesta(*_controlar(sesion, datos))
+
+
+async def obtener_layouts(peticion):
+    return _respuesta({'layouts': listar_layouts()})
+
+
+async def obtener_metricas(peticion):
+    """Métricas acumuladas; ?formato=prometheus para el formato de texto de Prometheus"""
+    medidores = _medidores()
+    if peticion.query_params.get('formato') == 'prometheus':
+        return Response(metricas.a_prometheus(medidores),
+                        media_type='text/plain; version=0.0.4; charset=utf-8')
+    return _respuesta(metricas.a_dict(medidores))
+
+
+@pass_context
+def _url_for(contexto, nombre, **parametros):
+    """url_for de las plantillas de Flask: url_for('static', filename=...) da la misma ruta"""
+    if 'filename' in parametros:
+        parametros['path'] = parametros.pop('filename')
+    return str(contexto['request'].app.url_path_for(nombre, **parametros))
+
+
+plantillas = Jinja2Templates(directory=os.path.join(DIRECTORIO, 'templates'))
+plantillas.env.globals['url_for'] = _url_for
+
+app = Starlette(
+    routes=[
+        Route('/', index),
+        Route('/api/iniciar', iniciar_juego, methods=['POST']),
+        Route('/api/siguiente_turno', siguiente_turno, methods=['POST']),
+        Route('/api/turnos', encolar_turno, methods=['POST']),
+        Route('/api/turnos/{id_trabajo}', consultar_turno, methods=['GET']),
+        Route('/api/stream', transmitir_partida, methods=['GET']),
+        Route('/api/stream/control', controlar_transmision, methods=['POST']),
+        Route('/api/estado', obtener_estado, methods=['GET']),
+        Route('/api/layouts', obtener_layouts, methods=['GET']),
+        Route('/api/metricas', obtener_metricas, methods=['GET']),
+        Mount('/static', StaticFiles(directory=os.path.join(DIRECTORIO, 'static')), name='static'),
+    ],
+    middleware=[
+        Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*']),
+        Middleware(MedirPeticiones),
+    ])
+
+if __name__ == '__main__':
+    import uvicorn
+
+    uvicorn.run(app, port=5000)
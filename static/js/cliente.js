@@ -1,6 +1,19 @@
 let juegoActivo = false;
-let autoPlayInterval = null;
+let idJuego = null;
+let estadoActual = null;   // Estado completo reconstruido a partir de los deltas
+let versionEstado = null;  // Versión de estadoActual en el servidor
+let celdas = [];           // celdas[fila][columna] del tablero dibujado
+let capsulasSet = new Set();
+let powerUpsSet = new Set();
+let fuenteEventos = null;   // EventSource de la reproducción automática (/api/stream)
+let turnosTransmision = 0;  // Turnos recibidos en la transmisión actual
 const API_URL = 'http://localhost:5000/api';
+const RITMO_AUTO_PLAY = 0.3;  // segundos entre turnos
+const CONFIRMAR_CADA = 4;     // turnos dibujados entre confirmaciones (el servidor admite 8 sin confirmar)
+const NOMBRES_ALGORITMO = {'minimax': 'MINIMAX', 'alfa-beta': 'ALFA-BETA', 'expectimax': 'EXPECTIMAX'};
+const LADO_CELDA = 30;        // px por celda en el tablero clásico
+const LADO_TABLERO_MAXIMO = 900;  // px: en tableros grandes las celdas se achican hasta caber
+const ESPERA_TURNO = 20;      // segundos que el servidor retiene cada consulta de un turno encolado
 
 const btnIniciar = document.getElementById('btn-iniciar');
 const btnPaso = document.getElementById('btn-paso');
@@ -19,6 +32,8 @@ autoPlayCheckbox.addEventListener('change', toggleAutoPlay);
 
 async function iniciarJuego() {
     const algoritmo = document.getElementById('algoritmo').value;
+    detenerAutoPlay();
+    autoPlayCheckbox.checked = false;
     
     try {
         const response = await fetch(`${API_URL}/iniciar`, {
@@ -30,9 +45,10 @@ async function iniciarJuego() {
         });
         
         const data = await response.json();
+        idJuego = data.id_juego;
         juegoActivo = true;
         btnPaso.disabled = false;
-        actualizarUI(data.estado);
+        cargarEstadoCompleto(data.estado, data.version);
         mostrarMensaje('¡Juego iniciado! Usa Auto-Play o Siguiente Turno', 2000);
         
     } catch (error) {
@@ -47,18 +63,46 @@ async function siguienteTurno() {
     btnPaso.disabled = true;
     
     try {
-        const response = await fetch(`${API_URL}/siguiente_turno`, {
-            method: 'POST'
+        // El turno se encola y se espera su resultado (long-poll) sin retener un hilo del servidor
+        let response = await fetch(`${API_URL}/turnos`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ id_juego: idJuego, version: versionEstado })
         });
+        let data = await response.json();
+        while (response.status === 202) {
+            response = await fetch(`${API_URL}/turnos/${data.id_trabajo}?esperar=${ESPERA_TURNO}`);
+            data = await response.json();
+        }
         
-        const data = await response.json();
-        actualizarUI(data.estado);
+        if (response.status === 503) {
+            // Servidor saturado: el turno no se jugó, se puede reintentar
+            mostrarMensaje(data.error, 2000);
+            btnPaso.disabled = false;
+            return;
+        }
+        if (!response.ok) {
+            // Partida expirada en el servidor
+            juegoActivo = false;
+            autoPlayCheckbox.checked = false;
+            detenerAutoPlay();
+            mostrarMensaje(data.error, 0);
+            return;
+        }
+        if (data.delta) {
+            aplicarDelta(data.delta, data.version);
+        } else {
+            // Versiones desfasadas: el servidor manda el estado completo
+            cargarEstadoCompleto(data.estado, data.version);
+        }
         
         if (data.terminado) {
             juegoActivo = false;
             autoPlayCheckbox.checked = false;
             detenerAutoPlay();
-            mostrarMensaje(data.estado.mensaje, 0);
+            mostrarMensaje(estadoActual.mensaje, 0);
         } else {
             btnPaso.disabled = false;
         }
@@ -69,8 +113,44 @@ async function siguienteTurno() {
     }
 }
 
-function actualizarUI(estado) {
-    statAlgoritmo.textContent = estado.algoritmo === 'minimax' ? 'MINIMAX' : 'ALFA-BETA';
+function clavePos(pos) {
+    return `${pos[0]}-${pos[1]}`;
+}
+
+function cargarEstadoCompleto(estado, version) {
+    estadoActual = estado;
+    versionEstado = version;
+    capsulasSet = new Set(estado.capsulas.map(clavePos));
+    powerUpsSet = new Set(estado.power_ups.map(clavePos));
+    actualizarEstadisticas(estado);
+    dibujarTablero(estado);
+}
+
+function aplicarDelta(delta, version) {
+    // Celdas a repintar: donde estaban y donde están Pacman y los fantasmas
+    const tocadas = [estadoActual.pos_pacman, ...estadoActual.pos_fantasmas];
+    
+    for (const [campo, valor] of Object.entries(delta)) {
+        if (campo === 'capsulas_comidas') {
+            valor.forEach(pos => capsulasSet.delete(clavePos(pos)));
+            tocadas.push(...valor);
+        } else if (campo === 'power_ups_consumidos') {
+            valor.forEach(pos => powerUpsSet.delete(clavePos(pos)));
+            tocadas.push(...valor);
+        } else {
+            estadoActual[campo] = valor;
+        }
+    }
+    versionEstado = version;
+    
+    tocadas.push(estadoActual.pos_pacman, ...estadoActual.pos_fantasmas);
+    actualizarEstadisticas(estadoActual);
+    const fantasmasSet = new Set(estadoActual.pos_fantasmas.map(clavePos));
+    tocadas.forEach(pos => pintarCelda(pos[0], pos[1], estadoActual, fantasmasSet));
+}
+
+function actualizarEstadisticas(estado) {
+    statAlgoritmo.textContent = NOMBRES_ALGORITMO[estado.algoritmo] || 'ALFA-BETA';
     statPuntuacion.textContent = estado.puntuacion;
     statCapsulas.textContent = `${estado.capsulas_recogidas}/${estado.total_capsulas}`;
     
@@ -88,52 +168,61 @@ function actualizarUI(estado) {
     }
     
     statMovimientos.textContent = estado.movimientos;
-    
-    dibujarTablero(estado);
 }
 
 function dibujarTablero(estado) {
+    // Se construye una sola vez por partida (o al resincronizar); después solo se repintan celdas
     tablero.innerHTML = '';
-    tablero.style.gridTemplateColumns = `repeat(${estado.columnas}, 30px)`;
-    tablero.style.gridTemplateRows = `repeat(${estado.filas}, 30px)`;
+    const lado = Math.max(4, Math.min(LADO_CELDA,
+        Math.floor(LADO_TABLERO_MAXIMO / Math.max(estado.filas, estado.columnas))));
+    tablero.style.setProperty('--lado-celda', `${lado}px`);
+    tablero.style.fontSize = `${lado / LADO_CELDA}em`;
+    tablero.style.gridTemplateColumns = `repeat(${estado.columnas}, auto)`;
+    tablero.style.gridTemplateRows = `repeat(${estado.filas}, auto)`;
     
-    const capsulasSet = new Set(estado.capsulas.map(c => `${c[0]}-${c[1]}`));
-    const powerUpsSet = new Set(estado.power_ups.map(p => `${p[0]}-${p[1]}`));
-    const fantasmasSet = new Set(estado.pos_fantasmas.map(f => `${f[0]}-${f[1]}`));
+    const fantasmasSet = new Set(estado.pos_fantasmas.map(clavePos));
+    celdas = [];
     
     for (let i = 0; i < estado.filas; i++) {
+        celdas.push([]);
         for (let j = 0; j < estado.columnas; j++) {
             const celda = document.createElement('div');
-            celda.className = 'celda';
-            
-            const posKey = `${i}-${j}`;
-            const esPared = estado.tablero[i][j] === 0;
-            
-            if (esPared) {
-                celda.classList.add('pared');
-            } else if (i === estado.pos_pacman[0] && j === estado.pos_pacman[1]) {
-                celda.classList.add('pacman');
-                if (estado.pacman_poderoso) {
-                    celda.classList.add('poderoso');
-                }
-                celda.textContent = '◐';
-            } else if (fantasmasSet.has(posKey)) {
-                celda.classList.add('fantasma');
-                if (estado.pacman_poderoso) {
-                    celda.classList.add('asustado');
-                }
-                celda.textContent = '👻';
-            } else if (powerUpsSet.has(posKey)) {
-                celda.classList.add('power-up');
-            } else if (capsulasSet.has(posKey)) {
-                celda.classList.add('capsula');
-            }
-            
+            celdas[i].push(celda);
             tablero.appendChild(celda);
+            pintarCelda(i, j, estado, fantasmasSet);
         }
     }
 }
 
+function pintarCelda(i, j, estado, fantasmasSet) {
+    const celda = celdas[i][j];
+    celda.className = 'celda';
+    celda.textContent = '';
+    
+    const posKey = `${i}-${j}`;
+    const esPared = estado.tablero[i][j] === 0;
+    
+    if (esPared) {
+        celda.classList.add('pared');
+    } else if (i === estado.pos_pacman[0] && j === estado.pos_pacman[1]) {
+        celda.classList.add('pacman');
+        if (estado.pacman_poderoso) {
+            celda.classList.add('poderoso');
+        }
+        celda.textContent = '◐';
+    } else if (fantasmasSet.has(posKey)) {
+        celda.classList.add('fantasma');
+        if (estado.pacman_poderoso) {
+            celda.classList.add('asustado');
+        }
+        celda.textContent = '👻';
+    } else if (powerUpsSet.has(posKey)) {
+        celda.classList.add('power-up');
+    } else if (capsulasSet.has(posKey)) {
+        celda.classList.add('capsula');
+    }
+}
+
 function mostrarMensaje(texto, duracion) {
     mensaje.textContent = texto;
     mensaje.classList.add('mostrar');
@@ -147,33 +236,98 @@ function mostrarMensaje(texto, duracion) {
 
 function toggleAutoPlay() {
     if (autoPlayCheckbox.checked) {
-        if (juegoActivo) {
-            iniciarAutoPlay();
-        } else {
+        if (!juegoActivo) {
             autoPlayCheckbox.checked = false;
             mostrarMensaje('Inicia un juego primero', 2000);
+        } else if (fuenteEventos) {
+            controlarTransmision({ accion: 'reanudar' });
+        } else {
+            iniciarAutoPlay();
         }
-    } else {
-        detenerAutoPlay();
+    } else if (fuenteEventos) {
+        // Pausa sin cerrar la conexión: al reanudar sigue la misma transmisión
+        controlarTransmision({ accion: 'pausar' });
+        btnPaso.disabled = !juegoActivo;
     }
 }
 
 function iniciarAutoPlay() {
-    if (autoPlayInterval) return;
+    if (fuenteEventos) return;
+    
+    // El servidor juega la partida y empuja cada turno (Server-Sent Events)
+    fuenteEventos = new EventSource(
+        `${API_URL}/stream?id_juego=${idJuego}&ritmo=${RITMO_AUTO_PLAY}`);
+    btnPaso.disabled = true;
     
-    autoPlayInterval = setInterval(() => {
-        if (juegoActivo) {
-            siguienteTurno();
+    fuenteEventos.addEventListener('open', () => {
+        // El primer evento de cada transmisión (también tras reconectar) es el estado completo
+        turnosTransmision = -1;
+    });
+    
+    fuenteEventos.addEventListener('turno', (evento) => {
+        const data = JSON.parse(evento.data);
+        if (data.delta) {
+            aplicarDelta(data.delta, data.version);
         } else {
-            detenerAutoPlay();
+            cargarEstadoCompleto(data.estado, data.version);
+        }
+        
+        turnosTransmision++;
+        if (turnosTransmision > 0 && turnosTransmision % CONFIRMAR_CADA === 0) {
+            controlarTransmision({ accion: 'confirmar', turnos: turnosTransmision });
+        }
+    });
+    
+    fuenteEventos.addEventListener('fin', (evento) => {
+        const data = JSON.parse(evento.data);
+        cerrarTransmision();
+        autoPlayCheckbox.checked = false;
+        if (data.motivo === 'terminada') {
+            juegoActivo = false;
+            mostrarMensaje(data.mensaje, 0);
+        } else {
+            btnPaso.disabled = !juegoActivo;
+            if (data.motivo === 'expirada') {
+                juegoActivo = false;
+                mostrarMensaje('Juego no encontrado o expirado', 0);
+            }
+        }
+    });
+    
+    fuenteEventos.addEventListener('error', () => {
+        // EventSource reconecta solo; si se rindió (p. ej. partida expirada), parar
+        if (fuenteEventos && fuenteEventos.readyState === EventSource.CLOSED) {
+            cerrarTransmision();
             autoPlayCheckbox.checked = false;
+            btnPaso.disabled = !juegoActivo;
         }
-    }, 300);  // 800ms entre movimientos
+    });
+}
+
+function cerrarTransmision() {
+    if (fuenteEventos) {
+        fuenteEventos.close();
+        fuenteEventos = null;
+    }
 }
 
 function detenerAutoPlay() {
-    if (autoPlayInterval) {
-        clearInterval(autoPlayInterval);
-        autoPlayInterval = null;
+    if (fuenteEventos) {
+        controlarTransmision({ accion: 'cancelar' });
+        cerrarTransmision();
+    }
+}
+
+async function controlarTransmision(cuerpo) {
+    try {
+        await fetch(`${API_URL}/stream/control`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+            },
+            body: JSON.stringify({ id_juego: idJuego, ...cuerpo })
+        });
+    } catch (error) {
+        console.error('Error al controlar la transmisión:', error);
     }
 }
\ No newline at end of file
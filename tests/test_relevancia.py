@@ -0,0 +1,156 @@
+"""
+Poda por relevancia de fantasmas (relevancia_fantasmas): en una posición
+donde un fantasma está demostrablemente fuera de alcance, la búsqueda que no
+lo ramifica tiene que dar el mismo movimiento y el mismo valor que la completa.
+
+Uso:
+    python -m pytest tests
+    python -m unittest discover tests
+"""
+import random
+import unittest
+
+from backend import minimax, poda_alfa_beta
+from backend.estadisticas import EstadisticasBusqueda, sin_log
+from backend.estado_busqueda import (DISTANCIA_FANTASMA_LEJANO, PROMEDIO_ZONA_MUY_SEGURA, EstadoBusqueda,
+                                     fantasma_relevante)
+from backend.juego import EstadoJuego
+from backend.laberinto import LARGO_MAXIMO_PASILLO
+
+FILAS = 7
+COLUMNAS = 60
+PACMAN = (3, 3)
+FANTASMA_CERCANO = (3, 7)
+FANTASMA_LEJANO = (3, 56)
+FANTASMA_CAZABLE = (3, 18)  # Lejos, pero a tiro del modo cazador si Pacman toma POWER_UP_CERCANO
+CAPSULAS = {(1, 1), (2, 5), (5, 6), (4, 9), (1, 12), (5, 54)}
+POWER_UP_LEJANO = (5, 57)
+POWER_UP_CERCANO = (3, 1)
+# Lejos para la distancia mínima, pero con dos fantasmas encima el promedio de
+# evaluar (sin tope) depende de él
+FANTASMAS_PROMEDIO = ((3, 5), (3, 6), (3, 23))
+
+
+def _posicion(power_up=POWER_UP_LEJANO, fantasmas=(FANTASMA_CERCANO, FANTASMA_LEJANO)):
+    """Sala abierta con Pacman, un fantasma al lado y otro en la otra punta"""
+    tablero = [[0] * COLUMNAS] + [[0] + [1] * (COLUMNAS - 2) + [0] for _ in range(FILAS - 2)] + [[0] * COLUMNAS]
+    random.seed(0)
+    juego = EstadoJuego(tablero, num_fantasmas=len(fantasmas))
+    juego.pos_pacman = PACMAN
+    juego.pos_fantasmas = list(fantasmas)
+    juego.bits_fantasmas = juego.laberinto.mascara(juego.pos_fantasmas)
+    juego.capsulas = CAPSULAS
+    juego.power_ups = {power_up}
+    return juego
+
+
+def _pasos(profundidad, macro):
+    return profundidad * (LARGO_MAXIMO_PASILLO if macro else 1)
+
+
+def _manhattan(a, b):
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+
+def _fuera_de_alcance(juego, pos_fantasma, profundidad, macro=False):
+    """
+    Cota independiente de fantasma_relevante: Pacman y cada fantasma dan a lo
+    sumo _pasos pasos y evaluar usa Manhattan, que cambia como mucho uno por
+    paso; ni la distancia mínima ni el promedio pueden cruzar sus umbrales, y
+    sin power-up al alcance Pacman no puede ponerse en modo cazador.
+    """
+    pasos = _pasos(profundidad, macro)
+    cotas = [max(_manhattan(juego.pos_pacman, f) - 2 * pasos, 0) for f in juego.pos_fantasmas]
+    power_up = juego.laberinto.distancia_minima(juego.pos_pacman, juego.bits_power_ups)
+    return (_manhattan(juego.pos_pacman, pos_fantasma) - 2 * pasos >= DISTANCIA_FANTASMA_LEJANO
+            and sum(cotas) >= PROMEDIO_ZONA_MUY_SEGURA * len(cotas) and power_up > pasos)
+
+
+def _decidir(decision, juego, profundidad, relevancia, **opciones):
+    estadisticas = EstadisticasBusqueda()
+    with sin_log():
+        movimiento = decision(juego.clonar(), profundidad, tiempo_maximo=float('inf'),
+                              estadisticas_busqueda=estadisticas, relevancia_fantasmas=relevancia, **opciones)
+    return movimiento, estadisticas
+
+
+class TestFantasmaRelevante(unittest.TestCase):
+
+    def test_fantasma_lejano_no_es_relevante(self):
+        juego = _posicion()
+        estado = EstadoBusqueda.desde_estado(juego)
+        for profundidad, macro in ((2, False), (4, False), (2, True)):
+            self.assertTrue(_fuera_de_alcance(juego, FANTASMA_LEJANO, profundidad, macro))
+            self.assertFalse(fantasma_relevante(estado, FANTASMA_LEJANO, profundidad, macro))
+            self.assertTrue(fantasma_relevante(estado, FANTASMA_CERCANO, profundidad, macro))
+
+    def test_promedio_de_evaluar_hace_relevante_al_lejano(self):
+        juego = _posicion(fantasmas=FANTASMAS_PROMEDIO)
+        estado = EstadoBusqueda.desde_estado(juego)
+        lejano = FANTASMAS_PROMEDIO[-1]
+        self.assertGreaterEqual(_manhattan(PACMAN, lejano) - 2 * _pasos(2, False), DISTANCIA_FANTASMA_LEJANO)
+        self.assertFalse(_fuera_de_alcance(juego, lejano, 2))
+        self.assertTrue(fantasma_relevante(estado, lejano, 2))
+
+    def test_power_up_al_alcance_hace_relevantes_a_todos(self):
+        estado = EstadoBusqueda.desde_estado(_posicion(POWER_UP_CERCANO))
+        self.assertTrue(fantasma_relevante(estado, FANTASMA_LEJANO, 2))
+
+    def test_pacman_poderoso_hace_relevantes_a_todos(self):
+        juego = _posicion()
+        juego.pacman_poderoso = True
+        juego.turnos_poder_restantes = 5
+        self.assertTrue(fantasma_relevante(EstadoBusqueda.desde_estado(juego), FANTASMA_LEJANO, 2))
+
+
+class TestMismaDecision(unittest.TestCase):
+    """Con el fantasma lejano fuera de alcance, omitir sus ramas no cambia nada"""
+
+    def _comparar(self, decision, profundidad, juego=None, omite=True, **opciones):
+        juego = juego or _posicion()
+        completo, estadisticas_completo = _decidir(decision, juego, profundidad, False, **opciones)
+        podado, estadisticas_podado = _decidir(decision, juego, profundidad, True, **opciones)
+        self.assertEqual(completo, podado)
+        self.assertEqual(estadisticas_completo.valor, estadisticas_podado.valor)
+        if omite:
+            self.assertGreater(estadisticas_podado.ramas_omitidas, 0)
+            self.assertLess(estadisticas_podado.nodos_explorados, estadisticas_completo.nodos_explorados)
+
+    def test_alfa_beta(self):
+        for profundidad in (2, 3, 4):
+            with self.subTest(profundidad=profundidad):
+                self._comparar(poda_alfa_beta.decision_alfa_beta, profundidad)
+
+    def test_alfa_beta_en_sitio_con_transposicion(self):
+        self._comparar(poda_alfa_beta.decision_alfa_beta, 4, modo_en_sitio=True, usar_transposicion=True,
+                       ordenamiento=True)
+
+    def test_alfa_beta_macro(self):
+        self._comparar(poda_alfa_beta.decision_alfa_beta, 2, macro_movimientos=True)
+
+    def test_minimax(self):
+        for profundidad in (2, 3):
+            with self.subTest(profundidad=profundidad):
+                self._comparar(minimax.decision_minimax, profundidad)
+
+    def test_evaluacion_con_promedio(self):
+        # La evaluación de siempre: el fantasma lejano cuenta en el promedio
+        juego = _posicion(fantasmas=FANTASMAS_PROMEDIO)
+        for profundidad in (2, 3):
+            with self.subTest(profundidad=profundidad):
+                self._comparar(poda_alfa_beta.decision_alfa_beta, profundidad, juego=juego, omite=False)
+                self._comparar(minimax.decision_minimax, profundidad, juego=juego, omite=False)
+
+    def test_power_up_al_alcance(self):
+        # Un solo fantasma: si Pacman toma el power-up pasa a cazarlo y a MIN le
+        # conviene alejarlo desde antes, no dar su paso previsto hacia Pacman.
+        # Solo se omite en las ramas donde el power-up ya no está al alcance.
+        juego = _posicion(POWER_UP_CERCANO, fantasmas=(FANTASMA_CAZABLE,))
+        for profundidad in (3, 4):
+            with self.subTest(profundidad=profundidad):
+                self._comparar(poda_alfa_beta.decision_alfa_beta, profundidad, juego=juego, omite=False)
+                self._comparar(minimax.decision_minimax, profundidad, juego=juego, omite=False)
+
+
+if __name__ == '__main__':
+    unittest.main()